@@ -1,5 +1,19 @@
 #!/usr/bin/env python
 
-__all__ = [ 'matching' ]
+__all__ = [ 'matching', 'selector', 'closed_form', 'implicit', 'geometric', 'weighted',
+            'streaming', 'window', 'decomposition',
+            'enumeration', 'algebraic', 'estimation', 'cache', 'offload' ]
 
-from matching import max_cardinality_matching
\ No newline at end of file
+from matching import max_cardinality_matching, VALIDATION_LEVELS, MatchingCancelled
+from selector import maximum_matching, closed_form_matching, graph_statistics, THRESHOLDS
+from implicit import implicit_matching
+from geometric import match_points, close_pairs
+from weighted import max_weight_matching, approximate_weight_matching
+from streaming import stream_matching
+from window import WindowMatching
+from decomposition import matching_decomposition, MatchingDecomposition
+from enumeration import iter_max_matchings
+from algebraic import matching_number, has_perfect_matching, algebraic_matching
+from estimation import estimate_matching_size
+from cache import MatchingCache, EdgeFingerprint, graph_fingerprint
+from offload import amatch, MatchingExecutor, MatchingFuture
\ No newline at end of file
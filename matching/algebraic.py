@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+
+"""
+Algebraic matching size by the rank of a random Tutte matrix.
+
+This module implements matching_number and has_perfect_matching, which
+find the size of a maximum matching without searching for augmenting
+paths, and algebraic_matching, which recovers a maximum matching as well.
+
+The Tutte matrix of G has T[u, v] = x_uv and T[v, u] = -x_uv for every
+edge (u, v), with independent variables x_uv, and zeros elsewhere. Its
+rank is twice the size of a maximum matching. The variables are replaced
+by random elements of the field of PRIME elements and the rank is found by
+row reduction. Random values can only lower the rank, and do so with
+probability at most n / PRIME, so the rank is taken over as many trials as
+the error probability asked for requires. A rank reaching 2 floor(n / 2)
+is exact, which makes dense graphs with a perfect matching take a single
+trial.
+
+The row reduction works on blocks of BLOCK columns. Field elements are
+kept in float64 arrays, in which the products of two elements and the sums
+of BLOCK such products are exact, so the updates of the rows below a block
+are matrix products by NumPy and one reduction modulo PRIME per block.
+
+algebraic_matching follows Rabin and Vazirani: the rows of a basis of the
+Tutte matrix span a nonsingular submatrix, whose vertices have a perfect
+matching. With N the inverse of that submatrix, an edge (u, v) with a
+nonzero N[u, v] lies in a perfect matching of it, and removing u and v
+leaves a nonsingular submatrix whose inverse is a rank two update of N.
+
+:filename algebraic.py
+"""
+
+__all__ = [ 'matching_number', 'has_perfect_matching', 'algebraic_matching',
+            'ERROR', 'PRIME' ]
+
+# Necessary imports
+import math
+
+import structures
+from matching import max_cardinality_matching
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Default probability of returning a size that is too small
+ERROR = 1e-6
+
+# The field of the Tutte matrix, the largest prime below 2 ** 23
+PRIME = 8388593
+
+# Number of columns reduced per block, BLOCK * PRIME ** 2 < 2 ** 53
+BLOCK = 64
+
+def matching_number( G, error=ERROR, exact=False, seed=None, report=None ):
+    """Compute the size of a maximum matching of G from Tutte matrix ranks.
+
+    :param G - the NetworkX graph given
+        A structures.CompactGraph is accepted as well.
+
+    :param error - the largest probability of a wrong size (default ERROR)
+        The size returned is never too large, and too small with at most
+        this probability. The number of trials grows with log(1 / error).
+
+    :param exact - make the size certain (default False)
+        If the rank does not show a perfect or near-perfect matching, the
+        matching recovered from it is completed by max_cardinality_matching.
+
+    :param seed - the seed of the random field elements (default None)
+
+    :param report - a dictionary to fill in (default None)
+        If given, report['trials'] is set to the number of ranks computed
+        and report['certain'] to whether the size is known to be exact.
+
+    :return size - the number of edges of a maximum matching
+    """
+
+    return algebraicMatch( G, error, exact, seed, report, False )[0]
+
+def has_perfect_matching( G, error=ERROR, exact=False, seed=None ):
+    """Decide whether G has a perfect matching from Tutte matrix ranks.
+
+    :param G - the NetworkX graph given, or a structures.CompactGraph
+    :param error - the largest probability of a wrong False (default ERROR)
+        A True answer is always right.
+    :param exact - make a False answer certain as well (default False)
+    :param seed - the seed of the random field elements (default None)
+    :return bool - True if G has a perfect matching
+    """
+
+    if len( G ) % 2:
+        return False
+    return 2 * matching_number(G, error, exact, seed) == len( G )
+
+def algebraic_matching( G, error=ERROR, exact=False, seed=None, output='dict', report=None ):
+    """Compute a maximum matching of G by the algorithm of Rabin and Vazirani.
+
+    :param G - the NetworkX graph given, or a structures.CompactGraph
+    :param error - the largest probability of a matching that is not
+        maximum (default ERROR)
+    :param exact - complete the matching by max_cardinality_matching
+        unless its size is already certain (default False)
+    :param seed - the seed of the random field elements (default None)
+    :param output - the form of the result (default 'dict')
+        Either 'dict', 'array' or 'compact', as for
+        max_cardinality_matching.
+    :param report - a dictionary to fill in as for matching_number
+    :return mate - the matching, in the requested output form
+
+    :notes
+    The rank takes time O(n ** 3 / BLOCK) in Python plus the matrix
+    products, and the recovery n / 2 rank two updates of O(n ** 2) each.
+    """
+
+    if output not in ('dict', 'array', 'compact'):
+        raise ValueError("unknown output %r" % (output,))
+    if not isinstance(G, structures.CompactGraph):
+        G = structures.CompactGraph.from_networkx( G )
+    mate = algebraicMatch( G, error, exact, seed, report, True )[1]
+    if output == 'dict':
+        if G.labels is not None:
+            mate = dict( (G.labels[v], G.labels[w]) for v, w in mate.iteritems() )
+        return mate
+    result = structures.MateArray.from_dict( mate, len( G ), G.labels )
+    return result.mate if output == 'array' else result
+
+def algebraicMatch( G, error, exact, seed, report, recover ):
+    """ Find the rank of random Tutte matrices of G and recover a matching.
+
+    :param G - the graph given
+    :param error - the largest probability of a rank too small
+    :param exact - complete the matching by max_cardinality_matching
+    :param seed - the seed of the random field elements
+    :param report - a dictionary to fill in, or None
+    :param recover - whether the matching is needed, or only its size
+    :return (size, mate) - the size of the matching, and its mate
+        dictionary of vertex IDs if it was recovered, otherwise None
+    """
+
+    if numpy is None:
+        raise ImportError("the algebraic engine requires NumPy")
+    if not 0 < error < 1:
+        raise ValueError("error must lie between 0 and 1")
+    if not isinstance(G, structures.CompactGraph):
+        G = structures.CompactGraph.from_networkx( G )
+    n = len( G )
+    rnd = numpy.random.RandomState( seed )
+
+    # Each trial misses the rank with probability at most n / PRIME
+    trials = 1
+    if n > 1:
+        trials = max( 1, int( math.ceil( math.log( error ) / math.log( float( n ) / PRIME ) ) ) )
+    best, basis, tutte = -1, None, None
+    trial = 0
+    while trial < trials and best < n - n % 2:
+        trial += 1
+        T = tutteMatrix( G, rnd )
+        rank, order = echelon( T.copy(), n )
+        if rank > best:
+            best, basis, tutte = rank, order[:rank], T
+    certain = best == n - n % 2
+
+    size, mate = best / 2, None
+    if recover or (exact and not certain):
+        mate = recoverMatching( tutte, numpy.sort( basis ) )
+    if exact and not certain:
+        mate = max_cardinality_matching(G, output='array', initial=mate)
+        mate = dict( (v, int( w )) for v, w in enumerate( mate ) if w >= 0 )
+        size, certain = len( mate ) / 2, True
+
+    if report is not None:
+        report['trials'] = trial
+        report['certain'] = certain
+    return size, mate
+
+def tutteMatrix( G, rnd ):
+    """ Return a Tutte matrix of G with random elements of the field.
+
+    :param G - the compact graph given
+    :param rnd - the NumPy RandomState drawing the elements
+    :return T - n x n float64 array, skew-symmetric modulo PRIME
+    """
+
+    n = len( G )
+    offsets = numpy.asarray( G.offsets, numpy.int64 )
+    rows = numpy.repeat( numpy.arange( n ), numpy.diff( offsets ) )
+    columns = numpy.asarray( G.targets, numpy.int64 )[ : len( rows ) ]
+    upper = rows < columns
+    rows, columns = rows[upper], columns[upper]
+    values = rnd.randint( 1, PRIME, size=len( rows ) ).astype( numpy.float64 )
+    T = numpy.zeros( (n, n), numpy.float64 )
+    T[rows, columns] = values
+    T[columns, rows] = PRIME - values
+    return T
+
+def product( A, B ):
+    """ Return the product of two matrices of field elements, reduced.
+
+    The inner dimension is split into slices of BLOCK, so that every
+    partial sum stays exact in float64.
+    """
+
+    result = numpy.zeros( (A.shape[0], B.shape[1]), numpy.float64 )
+    for s in xrange( 0, A.shape[1], BLOCK ):
+        result += numpy.dot( A[:, s : s + BLOCK], B[s : s + BLOCK] )
+        numpy.remainder( result, PRIME, out=result )
+    return result
+
+def echelon( A, limit ):
+    """ Reduce the rows of A modulo PRIME to echelon form, in place.
+
+    The pivots are chosen among the first limit columns, and the other
+    columns are reduced along. Below each pivot the multiplier of its row
+    is kept in place of the zero, so A holds L and U of the pivot rows.
+
+    :param A - the float64 matrix of field elements
+    :param limit - the number of columns pivots are chosen from
+    :return (rank, order) - the number of pivots, and the original row of
+        each row of A
+    """
+
+    n = A.shape[0]
+    order = numpy.arange( n )
+    k = 0
+    for c in xrange( 0, limit, BLOCK ):
+        if k == n:
+            break
+        end = min( c + BLOCK, limit )
+        first = k
+        pivots = [ ]
+
+        # Reduce the block of columns, one pivot at a time. The block is
+        # reduced modulo PRIME at its end, up to then its entries only
+        # gather at most BLOCK products
+        for j in xrange( c, end ):
+            if k == n:
+                break
+            column = A[k:, j]
+            numpy.remainder( column, PRIME, out=column )
+            nonzero = numpy.flatnonzero( column )
+            if not len( nonzero ):
+                continue
+            r = k + nonzero[0]
+            if r != k:
+                A[[k, r]] = A[[r, k]]
+                order[[k, r]] = order[[r, k]]
+            pivotRow = A[k, j + 1 : end]
+            numpy.remainder( pivotRow, PRIME, out=pivotRow )
+            multipliers = A[k + 1:, j] * pow( int( A[k, j] ), PRIME - 2, PRIME )
+            numpy.remainder( multipliers, PRIME, out=multipliers )
+            A[k + 1:, j + 1 : end] -= numpy.outer( multipliers, pivotRow )
+            A[k + 1:, j] = multipliers
+            pivots.append( j )
+            k += 1
+        block = A[first:, c:end]
+        numpy.remainder( block, PRIME, out=block )
+        if not pivots or end == A.shape[1]:
+            continue
+
+        # Reduce the pivot rows, then the rows below, past the block
+        for t in xrange( 1, len( pivots ) ):
+            row = A[first + t, end:]
+            row -= numpy.dot( A[first + t, pivots[:t]], A[first : first + t, end:] )
+            numpy.remainder( row, PRIME, out=row )
+        if k < n:
+            rest = A[k:, end:]
+            rest -= numpy.dot( A[k:, pivots], A[first : k, end:] )
+            numpy.remainder( rest, PRIME, out=rest )
+    return k, order
+
+def inverse( A ):
+    """ Return the inverse of a nonsingular matrix of field elements. """
+
+    n = A.shape[0]
+    augmented = numpy.hstack( (A, numpy.eye( n )) )
+    rank, order = echelon( augmented, n )
+    U, Y = augmented[:, :n], augmented[:, n:]
+
+    # Solve U X = Y by blocks of rows from the bottom up
+    X = numpy.zeros( (n, n), numpy.float64 )
+    for start in xrange( ((n - 1) / BLOCK) * BLOCK, -1, -BLOCK ):
+        end = min( start + BLOCK, n )
+        right = Y[start:end].copy()
+        if end < n:
+            right -= product( U[start:end, end:], X[end:] )
+            numpy.remainder( right, PRIME, out=right )
+        for i in xrange( end - 1, start - 1, -1 ):
+            row = right[i - start]
+            row -= numpy.dot( U[i, i + 1 : end], X[i + 1 : end] )
+            numpy.remainder( row, PRIME, out=row )
+            row *= pow( int( U[i, i] ), PRIME - 2, PRIME )
+            numpy.remainder( row, PRIME, out=row )
+            X[i] = row
+    return X
+
+def recoverMatching( T, basis ):
+    """ Recover a perfect matching of the vertices of a basis of T.
+
+    The rank two updates of the inverse are applied lazily: they are kept
+    as the factors U and V of N0 - U V and folded into N0 by one matrix
+    product every BLOCK / 2 edges. Only the rows and columns of the two
+    vertices of each edge are formed in between.
+
+    :param T - the Tutte matrix
+    :param basis - the sorted vertices whose rows form a basis of T
+    :return mate - mate dictionary of vertex IDs
+    """
+
+    tutte = T[numpy.ix_( basis, basis )]
+    N = inverse( tutte )
+    r = len( basis )
+    active = numpy.ones( r, bool )
+    U = numpy.zeros( (r, BLOCK), numpy.float64 )
+    V = numpy.zeros( (BLOCK, r), numpy.float64 )
+    t = 0
+
+    def row(i):
+        """ Return row i of the current inverse. """
+        return numpy.remainder( N[i] - numpy.dot( U[i, :t], V[:t] ), PRIME )
+
+    def column(j):
+        """ Return column j of the current inverse. """
+        return numpy.remainder( N[:, j] - numpy.dot( U[:, :t], V[:t, j] ), PRIME )
+
+    mate = { }
+    for i in xrange( r ):
+        if not active[i]:
+            continue
+
+        # An edge (i, j) with a nonzero entry N[i, j] of the inverse
+        rowI = row( i )
+        j = numpy.flatnonzero( active & (tutte[i] != 0) & (rowI != 0) )[0]
+        mate[basis[i]] = basis[j]
+        mate[basis[j]] = basis[i]
+        active[i] = active[j] = False
+
+        # Removing i and j updates the inverse by rank two
+        a = pow( int( PRIME - rowI[j] ), PRIME - 2, PRIME )
+        b = pow( int( rowI[j] ), PRIME - 2, PRIME )
+        left = numpy.remainder( column( j ) * b, PRIME ), numpy.remainder( column( i ) * a, PRIME )
+        right = rowI, row( j )
+        U[:, t], U[:, t + 1] = left
+        V[t], V[t + 1] = right
+        t += 2
+        if t == BLOCK:
+            N -= numpy.dot( U, V )
+            numpy.remainder( N, PRIME, out=N )
+            t = 0
+    return mate
+
+#end
\ No newline at end of file
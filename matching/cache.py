@@ -0,0 +1,487 @@
+#!/usr/bin/env python
+
+"""
+Fingerprint-keyed cache of maximum matchings.
+
+This module implements MatchingCache, a cache in front of
+max_cardinality_matching for services that are asked to match the same
+graphs again and again. Each graph is keyed by a fingerprint of its vertex
+and edge sets, and its matching is kept in two tiers: a bounded in-memory
+LRU of compact mate arrays, and optionally a directory of mate array files
+bounded by their total size in bytes.
+
+The fingerprint is a multiset hash. Every vertex and every edge, its end
+points taken in a canonical order, is hashed to 64 bits with the splitmix64
+finalizer, and the hashes are summed modulo 2**64 in two independent lanes.
+Sums do not depend on the order of the terms, so two graphs with the same
+vertices and edges get the same fingerprint however they were built, and
+EdgeFingerprint computes it one vertex or edge at a time, for example while
+an edge file streams by. A compiled graph is hashed with vectorized NumPy
+operations instead.
+
+A fingerprint is not a proof, so a matching served from the cache is
+checked against the graph before it is returned, in time O(n + m): the
+mate array must be symmetric and every matched pair an edge of the graph.
+A matching failing the check is dropped and the graph matched again.
+
+:filename cache.py
+"""
+
+__all__ = [ 'MatchingCache', 'EdgeFingerprint', 'graph_fingerprint', 'is_matching',
+            'CACHE_SIZE', 'DISK_SIZE' ]
+
+# Necessary imports
+import array
+import collections
+import cPickle as pickle
+import hashlib
+import os
+import struct
+import threading
+
+import structures
+from structures.compact_graph import writeArray, readArray
+from matching import max_cardinality_matching
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Default number of matchings kept in memory and bytes kept on disk
+CACHE_SIZE = 128
+DISK_SIZE = 256 * 2**20
+
+# File format information
+MAGIC = '\x93MVMATES'
+VERSION = 1
+HEADER = struct.Struct('<8sIIqq') # magic, version, itemsize, n, labels
+SUFFIX = '.mate'
+
+# Hashing constants: the splitmix64 increment and multipliers, and the
+# offsets separating the vertex, edge and second lane hashes
+MASK = 2**64 - 1
+GOLDEN = 0x9E3779B97F4A7C15
+MIX1 = 0xBF58476D1CE4E5B9
+MIX2 = 0x94D049BB133111EB
+EDGE = 0xD6E8FEB86659FD93
+LANE = 0xA0761D6478BD642F
+
+def mix(x):
+    """ Return the splitmix64 hash of the 64-bit integer x. """
+    x = (x + GOLDEN) & MASK
+    x = ((x ^ (x >> 30)) * MIX1) & MASK
+    x = ((x ^ (x >> 27)) * MIX2) & MASK
+    return x ^ (x >> 31)
+
+def mixArray(x):
+    """ Return the splitmix64 hashes of a NumPy uint64 array, as mix. """
+    x = x + numpy.uint64( GOLDEN )
+    x = (x ^ (x >> numpy.uint64( 30 ))) * numpy.uint64( MIX1 )
+    x = (x ^ (x >> numpy.uint64( 27 ))) * numpy.uint64( MIX2 )
+    return x ^ (x >> numpy.uint64( 31 ))
+
+def labelHash(label):
+    """ Return a 64-bit hash of a vertex that is stable across processes.
+
+    Integers hash by value, so vertex v of a graph without labels and the
+    node v of a NetworkX graph agree. Other labels hash by their repr.
+    """
+
+    if isinstance(label, (int, long)):
+        return mix( label & MASK )
+    return mix( int( hashlib.md5( repr( label ) ).hexdigest()[:16], 16 ) )
+
+class EdgeFingerprint(object):
+    """ Order-independent fingerprint of a graph, built incrementally.
+
+    The vertices and edges may be added in any order, each exactly once.
+    The edge (u, v) and the edge (v, u) are the same edge.
+    """
+
+    __slots__ = [ 'n', 'm', 'lanes' ]
+
+    def __init__(self):
+        self.n = 0
+        self.m = 0
+        self.lanes = [0, 0, 0, 0] # vertex and edge sums of both lanes
+
+    def add_node(self, v):
+        """ Add the vertex v. """
+        self.addHashes( [ labelHash( v ) ], [ ] )
+
+    def add_edge(self, u, v):
+        """ Add the edge (u, v). """
+        self.addHashes( [ ], [ (labelHash( u ), labelHash( v )) ] )
+
+    def addHashes(self, vertices, edges):
+        """ Add vertices and edges given by the hashes of their vertices. """
+        lanes = self.lanes
+        for h in vertices:
+            first = mix( h )
+            lanes[0] = (lanes[0] + first) & MASK
+            lanes[1] = (lanes[1] + mix( first ^ LANE )) & MASK
+            self.n += 1
+        for a, b in edges:
+            if a > b:
+                a, b = b, a
+            first = mix( (a * EDGE + b) & MASK )
+            lanes[2] = (lanes[2] + first) & MASK
+            lanes[3] = (lanes[3] + mix( first ^ LANE )) & MASK
+            self.m += 1
+
+    def hexdigest(self):
+        """ Return the fingerprint as a string of hexadecimal digits. """
+        return '%016x%016x%016x%016x-%x-%x' % tuple( self.lanes + [self.n, self.m] )
+
+def graph_fingerprint(G):
+    """ Return the fingerprint of the vertices and edges of G.
+
+    :param G - the NetworkX or compact graph given
+    :return fingerprint - the string EdgeFingerprint.hexdigest returns for
+        the vertices and edges of G
+    """
+
+    if not isinstance(G, structures.CompactGraph):
+        G = structures.CompactGraph.from_networkx( G )
+    n = len( G )
+    fingerprint = EdgeFingerprint()
+    if numpy is None:
+        labels = G.labels if G.labels is not None else xrange( n )
+        hashes = [ labelHash( v ) for v in labels ]
+        fingerprint.addHashes( hashes, ( (hashes[v], hashes[w]) for v in xrange( n )
+                                         for w in G.neighbors( v ) if v <= w ) )
+        return fingerprint.hexdigest()
+
+    # Each edge appears once in the row of its lower end point
+    offsets = structures.compact_graph.numpyArray( G.offsets )
+    targets = structures.compact_graph.numpyArray( G.targets )
+    rows = numpy.repeat( numpy.arange( n ), numpy.diff( offsets ) )
+    keep = rows <= targets
+
+    with numpy.errstate(over='ignore'):
+        if G.labels is None:
+            H = mixArray( numpy.arange( n, dtype=numpy.uint64 ) )
+        else:
+            H = numpy.array( [ labelHash( v ) for v in G.labels ], numpy.uint64 )
+        a, b = H[ rows[keep] ], H[ targets[keep] ]
+        a, b = numpy.minimum(a, b), numpy.maximum(a, b)
+        sums = [ ]
+        for first in [ mixArray( H ), mixArray( a * numpy.uint64( EDGE ) + b ) ]:
+            second = mixArray( first ^ numpy.uint64( LANE ) )
+            sums.extend( [ int( first.sum( dtype=numpy.uint64 ) ),
+                           int( second.sum( dtype=numpy.uint64 ) ) ] )
+    fingerprint.lanes = sums
+    fingerprint.n = n
+    fingerprint.m = int( numpy.count_nonzero( keep ) )
+    return fingerprint.hexdigest()
+
+def is_matching(G, mate):
+    """ Check that a mate array is a matching of the compact graph G.
+
+    :param G - the compact graph given
+    :param mate - the mate array, indexed by the vertex IDs of G
+    :return valid - True if mate has one entry per vertex, is symmetric and
+        matches every matched vertex along an edge of G
+
+    :notes
+    This function takes time O(number_of_nodes + number_of_edges).
+    """
+
+    n = len( G )
+    if len( mate ) != n:
+        return False
+
+    if numpy is None:
+        for v in xrange( n ):
+            w = mate[v]
+            if w == -1:
+                continue
+            if not 0 <= w < n or w == v or mate[w] != v or w not in G.neighbors( v ):
+                return False
+        return True
+
+    mate = numpy.asarray( mate, numpy.int64 )
+    matched = mate >= 0
+    if numpy.any( mate < -1 ) or numpy.any( mate >= n ):
+        return False
+    v = numpy.flatnonzero( matched )
+    if numpy.any( mate[ mate[v] ] != v ) or numpy.any( mate[v] == v ):
+        return False
+
+    # Every matched vertex finds its mate in its own row
+    offsets = structures.compact_graph.numpyArray( G.offsets )
+    targets = structures.compact_graph.numpyArray( G.targets )
+    rows = numpy.repeat( numpy.arange( n ), numpy.diff( offsets ) )
+    found = numpy.zeros(n, bool)
+    found[ rows[ targets == mate[rows] ] ] = True
+    return bool( numpy.all( found[matched] ) )
+
+class MatchingCache(object):
+    """ Cache of maximum matchings keyed by graph fingerprint.
+
+    The matchings are kept as compact mate arrays, indexed by the vertex
+    IDs of the graph they were computed for, together with its label
+    table. A graph with the same vertices numbered in a different order
+    gets the cached matching renumbered through the labels. The cache may
+    be shared between threads, and its directory between processes. The
+    directory is listed once, when the cache is created, and the files are
+    tracked from then on; the files other processes write later are not
+    counted against disk_size until they are read.
+    """
+
+    __slots__ = [ 'size', 'directory', 'disk_size', 'memory', 'files', 'disk_used',
+                  'lock', 'hits', 'disk_hits', 'misses', 'rejected' ]
+
+    def __init__(self, size=CACHE_SIZE, directory=None, disk_size=DISK_SIZE):
+        """ Create a matching cache.
+
+        :param size - the number of matchings kept in memory (default
+            CACHE_SIZE), 0 to keep none
+        :param directory - the directory of the mate array files (default
+            None, no disk tier); it is created if missing
+        :param disk_size - the bytes the files may take (default DISK_SIZE)
+        """
+
+        if size < 0 or disk_size < 0:
+            raise ValueError("cache sizes must not be negative")
+        if directory is not None and not os.path.isdir( directory ):
+            os.makedirs( directory )
+        self.size = size
+        self.directory = directory
+        self.disk_size = disk_size
+        self.memory = collections.OrderedDict()
+        self.files = scanFiles( directory ) if directory is not None else None
+        self.disk_used = sum( self.files.itervalues() ) if directory is not None else 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def __len__(self):
+        return len( self.memory )
+
+    def match(self, G, output='dict', report=None):
+        """ Return a maximum matching of G, from the cache if kept.
+
+        :param G - the NetworkX or compact graph given
+        :param output - the form of the result (default 'dict')
+            Either 'dict', 'array' or 'compact', as for
+            max_cardinality_matching.
+        :param report - a dictionary to fill in (default None)
+            If given, report['fingerprint'] is set to the fingerprint of G
+            and report['source'] to 'memory', 'disk' or 'matcher', the
+            tier that served the matching.
+        :return mate - the maximum matching, in the requested output form,
+            a copy the caller may modify without affecting the cache
+        """
+
+        if output not in ('dict', 'array', 'compact'):
+            raise ValueError("unknown output %r" % (output,))
+        if output == 'array' and not isinstance(G, structures.CompactGraph):
+            raise ValueError("array output requires a CompactGraph, "
+                             "use output='compact' for NetworkX graphs")
+        if not isinstance(G, structures.CompactGraph):
+            G = structures.CompactGraph.from_networkx( G )
+
+        key = graph_fingerprint( G )
+        source = 'memory'
+        result = self.lookup( G, key, self.memoryEntry )
+        if result is None and self.directory is not None:
+            source = 'disk'
+            result = self.lookup( G, key, self.readFile )
+        if result is None:
+            source = 'matcher'
+            result = max_cardinality_matching(G, output='compact')
+            self.writeFile( key, result )
+
+        with self.lock:
+            if source == 'memory':
+                self.hits += 1
+            elif source == 'disk':
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+            if self.size:
+                self.memory.pop( key, None )
+                self.memory[key] = result
+                while len( self.memory ) > self.size:
+                    self.memory.popitem( last=False )
+
+        if report is not None:
+            report['fingerprint'] = key
+            report['source'] = source
+        if output == 'dict':
+            return result.to_dict()
+        mate = copyArray( result.mate ) # The cached entry must not be aliased
+        return mate if output == 'array' else structures.MateArray(mate, result.labels)
+
+    def memoryEntry(self, key):
+        """ Return the mate array kept in memory for a key, or None. """
+        with self.lock:
+            return self.memory.get( key )
+
+    def lookup(self, G, key, fetch):
+        """ Return the cached matching of G from one tier, if valid.
+
+        :param G - the compact graph given
+        :param key - the fingerprint of G
+        :param fetch - function returning the mate array stored for a key,
+            or None
+        :return mate - the checked structures.MateArray renumbered for G,
+            or None
+        """
+
+        stored = fetch( key )
+        if stored is None:
+            return None
+
+        mate = stored.mate
+        if stored.labels != G.labels:
+            mate = renumber( stored, G )
+        if mate is None or not is_matching( G, mate ):
+            with self.lock:
+                self.rejected += 1
+                self.memory.pop( key, None )
+            self.removeFile( key )
+            return None
+        return structures.MateArray(mate, G.labels)
+
+    def path(self, key):
+        """ Return the name of the file of a fingerprint. """
+        return os.path.join( self.directory, key + SUFFIX )
+
+    def readFile(self, key):
+        """ Return the mate array stored on disk for a key, or None. """
+
+        path = self.path( key )
+        try:
+            with open(path, 'rb') as f:
+                magic, version, itemsize, n, labelsOffset = HEADER.unpack( f.read( HEADER.size ) )
+                if magic != MAGIC or version != VERSION:
+                    return None
+                mate = readArray(f, n, itemsize)
+                labels = None
+                if labelsOffset:
+                    f.seek( labelsOffset )
+                    labels = pickle.load( f )
+            os.utime( path, None ) # Mark the file as recently used
+            self.useFile( key, os.path.getsize( path ) )
+        except (IOError, OSError, struct.error, EOFError, pickle.UnpicklingError):
+            return None
+        if len( mate ) != n:
+            return None
+        if numpy is not None:
+            mate = numpy.asarray( mate, numpy.int64 )
+        else:
+            mate = array.array( 'l', mate )
+        return structures.MateArray(mate, labels)
+
+    def writeFile(self, key, result):
+        """ Store a mate array on disk and evict the files used least recently.
+
+        :param key - the fingerprint of the graph matched
+        :param result - the structures.MateArray to store
+        """
+
+        if self.directory is None:
+            return
+        n = len( result )
+        itemsize = 4 if n < 2**31 else 8
+        temporary = '%s.%d.%d' % (self.path( key ), os.getpid(), threading.current_thread().ident)
+        with open(temporary, 'wb') as f:
+            f.write( '\0' * HEADER.size )
+            writeArray(f, result.mate, itemsize)
+            labelsOffset = 0
+            if result.labels is not None:
+                labelsOffset = f.tell()
+                pickle.dump( result.labels, f, pickle.HIGHEST_PROTOCOL )
+            size = f.tell()
+            f.seek( 0 )
+            f.write( HEADER.pack( MAGIC, VERSION, itemsize, n, labelsOffset ) )
+        os.rename( temporary, self.path( key ) )
+        self.useFile( key, size )
+        self.evictFiles()
+
+    def useFile(self, key, size):
+        """ Track the file of a key as the most recently used one. """
+        name = key + SUFFIX
+        with self.lock:
+            self.disk_used += size - self.files.pop( name, 0 )
+            self.files[name] = size
+
+    def removeFile(self, key):
+        """ Remove the file of a key, if any. """
+        if self.directory is not None:
+            with self.lock:
+                self.disk_used -= self.files.pop( key + SUFFIX, 0 )
+            try:
+                os.remove( self.path( key ) )
+            except OSError:
+                pass
+
+    def evictFiles(self):
+        """ Remove the least recently used files until they fit disk_size. """
+
+        while True:
+            with self.lock:
+                if self.disk_used <= self.disk_size or not self.files:
+                    return
+                name, size = self.files.popitem( last=False )
+                self.disk_used -= size
+            try:
+                os.remove( os.path.join( self.directory, name ) )
+            except OSError:
+                pass
+
+def scanFiles(directory):
+    """ Return the sizes of the mate array files of a directory.
+
+    :param directory - the directory of the files
+    :return files - collections.OrderedDict of the size of each file name,
+        from the least to the most recently used
+    """
+
+    files = [ ]
+    for name in os.listdir( directory ):
+        if name.endswith( SUFFIX ):
+            try:
+                stat = os.stat( os.path.join( directory, name ) )
+            except OSError:
+                continue
+            files.append( (stat.st_mtime, name, stat.st_size) )
+    return collections.OrderedDict( (name, size) for used, name, size in sorted( files ) )
+
+def copyArray(mate):
+    """ Return a copy of a NumPy or array.array mate array. """
+    if isinstance(mate, array.array):
+        return array.array( mate.typecode, mate )
+    return mate.copy()
+
+def renumber(stored, G):
+    """ Translate a mate array to the vertex IDs of G through the labels.
+
+    :param stored - the structures.MateArray with the labels of its graph
+    :param G - the compact graph given
+    :return mate - the mate array indexed by the vertex IDs of G, or None
+        if the labels of the two graphs differ
+    """
+
+    n = len( G )
+    if len( stored ) != n:
+        return None
+    labels = G.labels if G.labels is not None else xrange( n )
+    index = dict( (v, i) for i, v in enumerate( labels ) )
+    mate = array.array( 'l', [-1] ) * n
+    for v, w in enumerate( stored.mate ):
+        if w >= 0:
+            i, j = index.get( stored.label( v ) ), index.get( stored.label( int( w ) ) )
+            if i is None or j is None:
+                return None
+            mate[i] = j
+    if numpy is not None:
+        mate = numpy.array( mate, numpy.int64 )
+    return mate
+
+#end
\ No newline at end of file
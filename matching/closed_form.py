@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+
+"""
+Closed-form matchings of structured graphs.
+
+This module recognizes connected graphs whose maximum matchings can be
+built directly in linear time: trees (among them paths and stars), cycles,
+complete graphs, complete bipartite graphs, wheels, ladders and hypercubes.
+A component is keyed on its number of vertices, its number of edges and its
+degree sequence, and the construction of its family then walks the
+component. Every construction must produce a matching of the maximum size
+for its family, otherwise the component is not recognized, so a graph that
+only resembles a family is never matched wrongly.
+
+:filename closed_form.py
+"""
+
+__all__ = [ 'recognize', 'FAMILIES' ]
+
+# Necessary imports
+import collections
+
+# The families recognized, in the order they are tried
+FAMILIES = [ 'tree', 'complete', 'complete_bipartite', 'cycle', 'wheel',
+             'ladder', 'hypercube' ]
+
+def recognize( G, vertices, bipartite, color ):
+    """ Recognize a component and build its maximum matching.
+
+    :param G - the compact graph given
+    :param vertices - the vertices of a connected component of G
+    :param bipartite - True if the component is bipartite
+    :param color - a two-coloring of G, valid on bipartite components
+    :return (family, pairs) - the name of the family and the list of matched
+        vertex pairs, or (None, None) if the component is not recognized
+    """
+
+    k = len( vertices )
+    degrees = [ G.degree( v ) for v in vertices ]
+    loops = sum( 1 for v in vertices if v in G.neighbors( v ) )
+    m = ( sum( degrees ) + loops ) / 2
+
+    if m == k - 1:
+        return 'tree', treeMatching(G, vertices) # A tree cannot have loops
+    if loops:
+        return None, None
+
+    # Try the families matching the edge count and the degree sequence
+    counts = collections.Counter( degrees )
+    candidates = [ ]
+    if m == k * (k - 1) / 2:
+        candidates.append( ('complete', completeMatching, k / 2) )
+    if bipartite:
+        left = [ v for v in vertices if color[v] == 0 ]
+        right = [ v for v in vertices if color[v] != 0 ]
+        if m == len( left ) * len( right ):
+            candidates.append( ('complete_bipartite', lambda G, vertices:
+                                zip( left, right ), min( len( left ), len( right ) )) )
+    if counts[2] == k:
+        candidates.append( ('cycle', cycleMatching, k / 2) )
+    if k >= 5 and counts[k - 1] == 1 and counts[3] == k - 1:
+        candidates.append( ('wheel', wheelMatching, k / 2) )
+    if k >= 6 and counts[2] == 4 and counts[3] == k - 4:
+        candidates.append( ('ladder', ladderMatching, k / 2) )
+    d = k.bit_length() - 1
+    if bipartite and d >= 3 and k == 1 << d and counts[d] == k:
+        candidates.append( ('hypercube', hypercubeMatching, k / 2) )
+
+    for family, construct, size in candidates:
+        pairs = construct(G, vertices)
+        if pairs is not None and isMatching(G, pairs, size):
+            return family, pairs
+    return None, None
+
+def isMatching( G, pairs, size ):
+    """ Check that pairs is a matching of G with size edges. """
+
+    if len( pairs ) != size:
+        return False
+    matched = set( )
+    for v, w in pairs:
+        if v == w or v in matched or w in matched or w not in G.neighbors( v ):
+            return False
+        matched.add( v )
+        matched.add( w )
+    return True
+
+def treeMatching( G, vertices ):
+    """ Match a tree, pairing each leaf with its parent bottom up. """
+
+    # Order the vertices breadth first from an arbitrary root
+    root = vertices[0]
+    parent = { root : None }
+    order = [ root ]
+    for v in order:
+        for u in G.neighbors( v ):
+            if u not in parent:
+                parent[u] = v
+                order.append( u )
+
+    # A vertex still exposed after its children is matched to its parent
+    matched = set( )
+    pairs = [ ]
+    for v in reversed( order ):
+        p = parent[v]
+        if p is not None and v not in matched and p not in matched:
+            matched.add( v )
+            matched.add( p )
+            pairs.append( (v, p) )
+    return pairs
+
+def completeMatching( G, vertices ):
+    """ Match a complete graph, pairing the vertices in order. """
+    return zip( vertices[0::2], vertices[1::2] )
+
+def walkCycle( G, start, first, avoid=None ):
+    """ Walk a cycle of degree two vertices.
+
+    :param G - the compact graph given
+    :param start - the vertex to start from
+    :param first - the neighbor of start to walk to first
+    :param avoid - a vertex adjacent to the whole cycle, or None
+    :return order - the vertices in the order walked, ending before the
+        walk returns to start or when it cannot continue
+    """
+
+    order = [ start ]
+    previous, v = start, first
+    while v != start and len( order ) < len( G ):
+        order.append( v )
+        following = [ u for u in G.neighbors( v ) if u != previous and u != avoid ]
+        if len( following ) != 1:
+            break
+        previous, v = v, following[0]
+    return order
+
+def cycleMatching( G, vertices ):
+    """ Match a cycle, pairing consecutive vertices. """
+
+    start = vertices[0]
+    order = walkCycle(G, start, G.neighbors( start )[0])
+    return zip( order[0::2], order[1::2] )
+
+def wheelMatching( G, vertices ):
+    """ Match a wheel, pairing consecutive rim vertices.
+
+    If the rim is odd, its first vertex is matched to the hub instead.
+    """
+
+    hub = max( vertices, key=G.degree )
+    start = G.neighbors( hub )[0]
+    first = [ u for u in G.neighbors( start ) if u != hub ][0]
+    rim = walkCycle(G, start, first, hub)
+    pairs = [ ]
+    if len( rim ) % 2 == 1:
+        pairs.append( (hub, rim[0]) )
+        rim = rim[1:]
+    pairs.extend( zip( rim[0::2], rim[1::2] ) )
+    return pairs
+
+def ladderMatching( G, vertices ):
+    """ Match a ladder, pairing the two ends of each rung.
+
+    The walk starts at a rung between two corners of degree two and moves
+    along both rails, one rung at a time.
+    """
+
+    corners = set( v for v in vertices if G.degree( v ) == 2 )
+    for v in corners:
+        ends = [ u for u in G.neighbors( v ) if u in corners ]
+        if ends:
+            break
+    else:
+        return None
+
+    rail1, rail2 = [ v ], [ ends[0] ]
+    while len( rail1 ) < len( vertices ) / 2:
+        steps = [ ]
+        for rail, other in ((rail1, rail2), (rail2, rail1)):
+            back = rail[-2] if len( rail ) > 1 else None
+            step = [ u for u in G.neighbors( rail[-1] ) if u != other[-1] and u != back ]
+            if len( step ) != 1:
+                return None
+            steps.append( step[0] )
+        rail1.append( steps[0] )
+        rail2.append( steps[1] )
+    return zip( rail1, rail2 )
+
+def hypercubeMatching( G, vertices ):
+    """ Match a hypercube, pairing the vertices that differ in one coordinate.
+
+    The neighbors of a root vertex give the coordinates. Every other vertex
+    at distance t from the root has t neighbors at distance t - 1, and its
+    coordinates are the union of theirs.
+    """
+
+    root = vertices[0]
+    code = { root : 0 }
+    distance = { root : 0 }
+    for i, u in enumerate( G.neighbors( root ) ):
+        code[u] = 1 << i
+        distance[u] = 1
+
+    order = list( G.neighbors( root ) )
+    for v in order:
+        for u in G.neighbors( v ):
+            if u not in distance:
+                distance[u] = distance[v] + 1
+                code[u] = 0
+                order.append( u )
+            if distance[u] == distance[v] + 1:
+                code[u] |= code[v]
+
+    vertex = dict( (c, v) for v, c in code.iteritems() )
+    if len( vertex ) != len( vertices ):
+        return None
+    return [ (v, vertex[c | 1]) for c, v in vertex.iteritems() if not c & 1 ]
+
+#end
\ No newline at end of file
@@ -0,0 +1,436 @@
+#!/usr/bin/env python
+
+"""
+Classification of vertices and edges by their role in maximum matchings.
+
+This module implements matching_decomposition, which tells for every
+vertex and every edge of a graph whether it lies in every, in some or in
+no maximum matching. Removing a vertex or an edge lowers the size of a
+maximum matching exactly when it lies in every maximum matching, so the
+classification answers such what-if questions by a lookup.
+
+One maximum matching from max_cardinality_matching and one alternating
+search from its exposed vertices give the Gallai-Edmonds decomposition:
+the set D of the vertices some maximum matching leaves exposed, the set A
+of their other neighbors and the set C of the rest. Every maximum matching
+matches A into D and C within itself, so the vertices of A and C lie in
+every maximum matching and those of D, unless isolated, in some. An edge
+with an end point in D lies in some maximum matching, and an edge from A
+to A or to C in none. An edge within C lies in some maximum matching if
+and only if C without its end points still has a perfect matching. In the
+bipartite components of C this is read off the strongly connected
+components of the matching's alternating orientation. In the others the
+edges of a few more perfect matchings of C, steered towards the edges left,
+are classified first; one alternating search from the mate of an end point
+then decides the edges of that end point still left. Each search takes
+time O(m), so the edges cost O(nm) in the worst case but usually far less.
+
+:filename decomposition.py
+"""
+
+__all__ = [ 'matching_decomposition', 'MatchingDecomposition', 'CLASSES' ]
+
+# Necessary imports
+import random
+
+import structures
+from matching import max_cardinality_matching
+from weighted import evenOddLabels, EVEN, ODD, UNREACHED
+
+# The classes of a vertex or an edge: in every, some or no maximum matching
+CLASSES = [ 'every', 'some', 'none' ]
+EVERY, SOME, NONE = range( 3 )
+
+# The perfect matchings of C stop once one classifies fewer edges than
+# ROUND_GAIN searches from single vertices are expected to
+ROUND_GAIN = 8
+
+class MatchingDecomposition(object):
+    """ The classes of the vertices and edges of a graph.
+
+    The vertices and edges are given by the nodes of the graph
+    decomposed. The size of a maximum matching without any one vertex or
+    edge is found in constant time.
+    """
+
+    __slots__ = [ 'mate', 'size', 'labels', 'index', 'label', 'vertexClass', 'edgeClass' ]
+
+    def __init__(self, mate, labels, label, vertexClass, edgeClass):
+        self.mate = mate
+        self.size = len( mate ) / 2
+        self.labels = labels
+        self.index = dict( (v, i) for i, v in enumerate( labels ) )
+        self.label = label
+        self.vertexClass = vertexClass
+        self.edgeClass = edgeClass
+
+    def vertex_class(self, v):
+        """ Return 'every', 'some' or 'none' for the vertex v. """
+        return CLASSES[ self.vertexClass[ self.index[v] ] ]
+
+    def edge_class(self, u, v):
+        """ Return 'every', 'some' or 'none' for the edge (u, v).
+
+        A KeyError is raised if (u, v) is not an edge of the graph, or if
+        the edges were not classified.
+        """
+
+        i, j = self.index[u], self.index[v]
+        return CLASSES[ self.edgeClass[ (i, j) if i < j else (j, i) ] ]
+
+    def vertex_classes(self):
+        """ Return the dictionary of the class of every vertex. """
+        return dict( (v, CLASSES[c]) for v, c in zip( self.labels, self.vertexClass ) )
+
+    def edge_classes(self):
+        """ Return the dictionary of the class of every edge (u, v). """
+        labels = self.labels
+        return dict( ((labels[i], labels[j]), CLASSES[c])
+                     for (i, j), c in self.edgeClass.iteritems() )
+
+    def size_without_vertex(self, v):
+        """ Return the size of a maximum matching of the graph without v. """
+        return self.size - ( self.vertexClass[ self.index[v] ] == EVERY )
+
+    def size_without_edge(self, u, v):
+        """ Return the size of a maximum matching of the graph without (u, v). """
+        return self.size - ( self.edge_class(u, v) == 'every' )
+
+    def gallai_edmonds(self):
+        """ Return the Gallai-Edmonds decomposition (D, A, C) as sets of vertices. """
+        parts = { EVEN : set(), ODD : set(), UNREACHED : set() }
+        for v, l in zip( self.labels, self.label ):
+            parts[l].add( v )
+        return parts[EVEN], parts[ODD], parts[UNREACHED]
+
+def matching_decomposition( G, mate=None, edges=True ):
+    """Classify the vertices and edges of G by the maximum matchings holding them.
+
+    :param G - the NetworkX graph given
+        A structures.CompactGraph is accepted as well.
+
+    :param mate - a maximum matching of G to start from (default None)
+        A mate dictionary as returned by max_cardinality_matching. If
+        None, a maximum matching is computed.
+
+    :param edges - whether to classify the edges too (default True)
+        The vertices take one alternating search, the edges within C
+        more work, so without them edge_class is not available.
+
+    :return decomposition - MatchingDecomposition
+    """
+
+    if not isinstance(G, structures.CompactGraph):
+        G = structures.CompactGraph.from_networkx( G )
+    n = len( G )
+    labels = G.labels if G.labels is not None else range( n )
+    index = dict( (v, i) for i, v in enumerate( labels ) )
+    adjacency = [ G.neighbors( v ) for v in xrange( n ) ]
+
+    if mate is None:
+        mate = max_cardinality_matching(G)
+    mates = [ -1 ] * n
+    for v, w in mate.iteritems():
+        mates[ index[v] ] = index[w]
+    for v, w in enumerate( mates ):
+        if w >= 0 and (mates[w] != v or w not in adjacency[v]):
+            raise ValueError("mate is not a matching of G at %r" % (labels[v],))
+    try:
+        label = evenOddLabels( adjacency, mates )
+    except RuntimeError:
+        raise ValueError("mate is not a maximum matching")
+
+    vertexClass = bytearray( n )
+    for v in xrange( n ):
+        if label[v] == EVEN:
+            vertexClass[v] = SOME if any( u != v for u in adjacency[v] ) else NONE
+
+    edgeClass = { }
+    if edges:
+        edgeClass = edgeClasses( G, adjacency, mates, label )
+    return MatchingDecomposition(mate, labels, label, vertexClass, edgeClass)
+
+def edgeClasses( G, adjacency, mate, label ):
+    """ Classify the edges by the Gallai-Edmonds labels and searches within C.
+
+    :param G - the CompactGraph decomposed
+    :param adjacency - the list of neighbors of each vertex
+    :param mate - the mate of each vertex, or -1; a maximum matching
+    :param label - the Gallai-Edmonds label of each vertex
+    :return edgeClass - dictionary of the class of each edge (u, v), u < v
+    """
+
+    edgeClass = { }
+    left = [ ] # Edges within C left to classify
+    pending = [ 0 ] * len( adjacency ) # Number of them at each vertex
+    for v, row in enumerate( adjacency ):
+        for u in row:
+            if v > u:
+                continue
+            if v == u:
+                edgeClass[(v, u)] = NONE
+            elif label[u] == EVEN or label[v] == EVEN:
+                edgeClass[(v, u)] = SOME
+            elif label[u] == ODD or label[v] == ODD:
+                edgeClass[(v, u)] = NONE
+            elif mate[v] != u:
+                edgeClass[(v, u)] = None
+                left.append( (v, u) )
+                pending[v] += 1
+                pending[u] += 1
+
+    inC = bytearray( l == UNREACHED for l in label )
+    allowed = bytearray( len( adjacency ) ) # Vertices with an unmatched edge in some
+
+    def classify(u, v, c):
+        edge = (u, v) if u < v else (v, u)
+        if edgeClass.get( edge, SOME ) is None:
+            edgeClass[edge] = c
+            pending[u] -= 1
+            pending[v] -= 1
+        if c == SOME:
+            allowed[u] = allowed[v] = 1
+
+    # In a bipartite component of C an unmatched edge lies in some maximum
+    # matching if and only if its end points are strongly connected once
+    # the unmatched edges point from one side to the other and the matched
+    # edges back
+    side = bipartiteSides( adjacency, inC, pending )
+    def successors(v):
+        if side[v] == 1:
+            return [ mate[v] ]
+        return [ u for u in adjacency[v] if inC[u] and u != mate[v] ]
+    component = strongComponents( [ v for v in xrange( len( adjacency ) ) if side[v] == 1 ],
+                                  successors )
+    for u, v in left:
+        if side[u] >= 0:
+            classify( u, v, SOME if component[u] == component[v] else NONE )
+    left = [ e for e in left if edgeClass[e] is None ]
+
+    # Every edge of a perfect matching of C lies in some maximum matching.
+    # The perfect matchings found from greedy matchings of the edges left
+    # classify most edges of C when most lie in some maximum matching, and
+    # stop once a round classifies fewer edges than ROUND_GAIN searches
+    # are expected to
+    rnd = random.Random( 0 )
+    while left:
+        rnd.shuffle( left )
+        initial = { }
+        for u, v in left:
+            if u not in initial and v not in initial:
+                initial[u] = v
+                initial[v] = u
+        perfect = max_cardinality_matching(G, output='array', initial=initial, vertex_mask=inC)
+        gained = 0
+        for v, u in enumerate( perfect ):
+            if v < u and mate[v] != u:
+                gained += edgeClass[(v, u)] is None
+                classify( v, u, SOME )
+        left = [ e for e in left if edgeClass[e] is None ]
+        if gained * sum( 1 for p in pending if p ) < ROUND_GAIN * 2 * len( left ):
+            break
+
+    # An edge (x, y) within C lies in some maximum matching if and only if
+    # y is even in the search from the mate of x in C without x. The even
+    # path found to y closes an alternating cycle with (y, x) and (x, mate
+    # of x), and every edge of that cycle lies in some maximum matching
+    for x in xrange( len( adjacency ) ):
+        if not pending[x]:
+            continue
+        targets = set( y for y in adjacency[x]
+                       if edgeClass.get( (x, y) if x < y else (y, x), SOME ) is None )
+        even, cycles = evenVertices( adjacency, mate, x, inC, targets )
+        for u, v in cycles:
+            classify( u, v, SOME )
+        for y in targets:
+            classify( x, y, SOME if y in even else NONE )
+
+    # A matched edge within C lies in every maximum matching if and only if
+    # no other edge of its end points lies in some
+    for v, u in enumerate( mate ):
+        if v < u:
+            shared = label[v] != UNREACHED or allowed[v] or allowed[u]
+            edgeClass[(v, u)] = SOME if shared else EVERY
+    return edgeClass
+
+def bipartiteSides( adjacency, keep, pending ):
+    """ Two-color the components of the subgraph of keep with edges pending.
+
+    :param adjacency - the list of neighbors of each vertex
+    :param keep - bytearray of the vertices of the subgraph
+    :param pending - the number of edges left to classify at each vertex
+    :return side - list of 0 or 1 for the vertices of bipartite
+        components, -1 for the others
+    """
+
+    side = [ -1 ] * len( adjacency )
+    for s in xrange( len( adjacency ) ):
+        if not pending[s] or side[s] >= 0:
+            continue
+        side[s] = 0
+        queue = [ s ]
+        bipartite = True
+        for v in queue:
+            for u in adjacency[v]:
+                if not keep[u]:
+                    continue
+                if side[u] < 0:
+                    side[u] = 1 - side[v]
+                    queue.append( u )
+                elif side[u] == side[v]:
+                    bipartite = False
+        if not bipartite:
+            for v in queue:
+                side[v] = 2
+    return [ -1 if x == 2 else x for x in side ]
+
+def strongComponents( vertices, successors ):
+    """ Number the strongly connected components of a directed graph.
+
+    An iterative version of Tarjan's algorithm, run from each of vertices.
+
+    :param vertices - the vertices to start from
+    :param successors - function returning the successors of a vertex
+    :return component - dictionary of the component number of each
+        vertex reached
+    """
+
+    component = { }
+    index = { }
+    low = { }
+    stack = [ ]
+    for s in vertices:
+        if s in index:
+            continue
+        index[s] = low[s] = len( index )
+        stack.append( s )
+        calls = [ (s, iter( successors( s ) )) ]
+        while calls:
+            v, it = calls[-1]
+            for u in it:
+                if u not in index:
+                    index[u] = low[u] = len( index )
+                    stack.append( u )
+                    calls.append( (u, iter( successors( u ) )) )
+                    break
+                if u not in component:
+                    low[v] = min( low[v], index[u] )
+            else:
+                calls.pop()
+                if calls:
+                    w = calls[-1][0]
+                    low[w] = min( low[w], low[v] )
+                if low[v] == index[v]:
+                    while True:
+                        u = stack.pop()
+                        component[u] = v
+                        if u == v:
+                            break
+    return component
+
+def evenVertices( adjacency, mate, removed, keep, targets ):
+    """ Find the vertices reached by even alternating paths from a mate.
+
+    The search starts from the mate of removed and runs in the subgraph of
+    the vertices keep holds, without removed. The blossoms met are shrunk
+    with a union-find structure. The state is kept in dictionaries, so the
+    time taken depends only on the part of the subgraph reached, and the
+    search stops once all the targets are even.
+
+    :param adjacency - the list of neighbors of each vertex
+    :param mate - the mate of each vertex, a perfect matching of keep
+    :param removed - the vertex left out of the subgraph
+    :param keep - bytearray of the vertices of the subgraph
+    :param targets - the set of vertices looked for
+    :return (even, cycles) - the set of even vertices found, and the
+        unmatched edges of the even paths found to targets through the
+        search tree alone
+    """
+
+    root = mate[removed]
+    label = { root : EVEN }
+    parent = { }
+    through = { } # The odd vertex an even vertex was reached through
+    base = { }
+    stamp = { }
+    walked = { root : True }
+    cycles = [ ]
+    found = [ 0 ]
+    search = 0
+
+    def find(x):
+        root = x
+        while root in base:
+            root = base[root]
+        while x != root and base[x] != root:
+            base[x], x = root, base[x]
+        return root
+
+    def climb(b):
+        """ Return the base above base b in the forest, or -1 at the root. """
+        return find( parent[mate[b]] ) if b != root else -1
+
+    def reached(y):
+        """ Count an even target and collect the tree path to it. """
+        found[0] += 1
+        path = [ ]
+        v = y
+        while v not in walked and v in through:
+            u = through[v]
+            path.append( (parent[u], u) )
+            v = parent[u]
+        success = walked.get( v, False )
+        for u, w in path:
+            walked[mate[u]] = success
+        if success:
+            cycles.extend( path )
+
+    queue = [ root ]
+    i = 0
+    while i < len( queue ) and found[0] < len( targets ):
+        v = queue[i]
+        i += 1
+        for u in adjacency[v]:
+            if u == removed or u == v or not keep[u]:
+                continue
+            l = label.get( u )
+            if l == ODD or find( u ) == find( v ):
+                continue
+            if l is None:
+                label[u] = ODD
+                parent[u] = v
+                m = mate[u]
+                label[m] = EVEN
+                through[m] = u
+                queue.append( m )
+                if m in targets:
+                    reached( m )
+                continue
+
+            # Two even vertices: find the base of the blossom they close
+            search += 1
+            a, b = find( v ), find( u )
+            while True:
+                if a >= 0:
+                    if stamp.get( a ) == search:
+                        break
+                    stamp[a] = search
+                    a = climb( a )
+                a, b = b, a
+            lca = a
+
+            # Shrink the blossom, making its odd vertices even
+            for x in (v, u):
+                x = find( x )
+                while x != lca:
+                    m = mate[x]
+                    label[m] = EVEN
+                    queue.append( m )
+                    if m in targets:
+                        reached( m )
+                    base[x] = base[m] = lca
+                    x = find( parent[m] )
+    even = set( v for v, l in label.iteritems() if l == EVEN )
+    return even, cycles
+
+#end
\ No newline at end of file
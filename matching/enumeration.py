@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+
+"""
+Enumeration of the maximum matchings of a graph.
+
+This module implements iter_max_matchings, a generator that yields every
+maximum matching of a graph exactly once, starting from the one
+max_cardinality_matching finds. The matchings are produced lazily, so
+taking the first k of them costs only the work for those k.
+
+The matchings are enumerated by binary partition. Every node of the search
+stands for the maximum matchings of G that contain some fixed edges and
+avoid some removed ones, and holds one of them, M, already yielded. A
+second matching of the node comes from an alternating path or cycle:
+
+    * an exposed vertex r with a neighbor a, matched to b, gives
+      M - (a, b) + (r, a), an even alternating path of two edges;
+    * otherwise the node is matched without one edge e of M, warm started
+      from the rest of M. A matching as large as M differs from it along
+      an alternating cycle through e. A smaller one shows that e lies in
+      every matching of the node, so e is fixed and the next edge tried.
+
+Once a second matching M' avoiding e is found and yielded, the node splits
+into the matchings that contain e, which hold M, and those that avoid it,
+which hold M'. No matching is yielded twice. A node tries at most one
+matching per edge of M, and the stack of nodes is at most m deep, so the
+time between two matchings is polynomial.
+
+:filename enumeration.py
+"""
+
+__all__ = [ 'iter_max_matchings' ]
+
+# Necessary imports
+import array
+
+import structures
+from matching import max_cardinality_matching
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def iter_max_matchings( G, output='dict' ):
+    """Generate all maximum matchings of G, each exactly once.
+
+    :param G - the NetworkX graph given
+        A structures.CompactGraph is accepted as well.
+
+    :param output - the form of each matching (default 'dict')
+        Either 'dict', 'array' or 'compact', as for
+        max_cardinality_matching. The array and compact forms are indexed
+        by the vertex IDs of the compiled graph.
+
+    :return matchings - generator of the maximum matchings of G, the first
+        of which is the one max_cardinality_matching finds
+
+    :notes
+    The graph is compiled once and every search runs on it under vertex
+    and edge masks, which the search sets and restores as it goes.
+    """
+
+    if output not in ('dict', 'array', 'compact'):
+        raise ValueError("unknown output %r" % (output,))
+    if not isinstance(G, structures.CompactGraph):
+        G = structures.CompactGraph.from_networkx( G )
+    n = len( G )
+    offsets = G.offsets
+    rows = [ G.neighbors( v ) for v in xrange( n ) ]
+    keepVertex = bytearray( [1] ) * n
+    keepEdge = bytearray( [1] ) * len( G.targets )
+
+    def pack(mate):
+        """ Return a matching of vertex IDs in the requested output form. """
+        if output == 'dict':
+            labels = G.labels if G.labels is not None else range( n )
+            return dict( (labels[v], labels[w]) for v, w in enumerate( mate ) if w >= 0 )
+        if numpy is not None:
+            mate = numpy.array( mate, numpy.int64 )
+        else:
+            mate = array.array( 'l', mate )
+        result = structures.MateArray(mate, G.labels)
+        return result.mate if output == 'array' else result
+
+    def position(u, v):
+        """ Return the index of the edge slot of v in the row of u. """
+        return offsets[u] + rows[u].index( v )
+
+    def anotherMatching(mate, changes):
+        """ Find a second matching of the node, fixing edges in every one.
+
+        :param mate - the matching the node holds
+        :param changes - the mask entries the node cleared, extended by
+            the vertices of the edges fixed
+        :return (edge, other) - the edge of mate other avoids and the
+            second matching, or None if mate is the only one
+        """
+
+        # An exposed vertex next to a matched one: a path of two edges
+        for r in xrange( n ):
+            if not keepVertex[r] or mate[r] >= 0:
+                continue
+            for k, a in enumerate( rows[r], offsets[r] ):
+                if keepEdge[k] and keepVertex[a] and a != r:
+                    b = mate[a]
+                    other = array.array( 'l', mate )
+                    other[b] = -1
+                    other[a] = r
+                    other[r] = a
+                    return (a, b), other
+
+        # A perfect matching of the node: match it without each edge in turn
+        size = sum( 1 for v in xrange( n ) if keepVertex[v] and mate[v] >= 0 )
+        for x in xrange( n ):
+            y = mate[x]
+            if y < x or not keepVertex[x]:
+                continue
+            slots = ( position( x, y ), position( y, x ) )
+            for k in slots:
+                keepEdge[k] = 0
+            initial = dict( (v, w) for v, w in enumerate( mate ) if w >= 0 and v != x and v != y )
+            found = max_cardinality_matching(G, output='array', initial=initial,
+                                             vertex_mask=keepVertex, edge_mask=keepEdge)
+            for k in slots:
+                keepEdge[k] = 1
+            if sum( 1 for v in xrange( n ) if found[v] >= 0 ) == size:
+                other = array.array( 'l', mate )
+                for v in xrange( n ):
+                    if keepVertex[v]:
+                        other[v] = found[v]
+                return (x, y), other
+            keepVertex[x] = keepVertex[y] = 0
+            size -= 2
+            changes.extend( [ (keepVertex, x), (keepVertex, y) ] )
+        return None
+
+    mate = max_cardinality_matching(G, output='array')
+    mate = array.array( 'l', ( int( w ) for w in mate ) )
+    yield pack( mate )
+
+    # Each node enters with the mask entries it clears, and leaves an undo
+    # entry beneath its children that restores them
+    NODE, UNDO = 0, 1
+    stack = [ (NODE, mate, [ ]) ]
+    while stack:
+        kind, mate, changes = stack.pop()
+        if kind == UNDO:
+            for mask, k in changes:
+                mask[k] = 1
+            continue
+        for mask, k in changes:
+            mask[k] = 0
+        stack.append( (UNDO, None, changes) )
+        found = anotherMatching( mate, changes )
+        if found is None:
+            continue
+        (x, y), other = found
+        yield pack( other )
+        stack.append( (NODE, other, [ (keepEdge, position( x, y )), (keepEdge, position( y, x )) ]) )
+        stack.append( (NODE, mate, [ (keepVertex, x), (keepVertex, y) ]) )
+
+#end
\ No newline at end of file
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+
+"""
+Sublinear estimation of matching size.
+
+This module implements estimate_matching_size, which estimates the size of
+the random greedy maximal matching of a large graph from a sample of its
+vertices, reading only the neighborhoods a local exploration around each
+sampled vertex reaches. That matching is a 2-approximation of a maximum
+matching, so the estimate brackets the maximum size within a factor of
+two but does not estimate it. The time taken depends on the number of
+samples and the degrees near the samples, not on the number of edges, so
+the estimate stays cheap enough to refresh often on graphs far too large
+to match.
+
+The exploration is the random greedy oracle of Nguyen and Onak, with the
+edge order of Yoshida, Yamamoto and Ito. Every edge is given a random
+rank, and the greedy maximal matching M adds the edges by increasing rank
+whenever both end points are still exposed. An edge lies in M exactly when
+none of its adjacent edges of lower rank does, which the oracle decides by
+recursion on those edges, in increasing rank, stopping at the first one in
+M. A vertex is matched by M when one of its edges is. The ranks are drawn
+lazily and the answers memoized, so the oracle answers all its queries
+about the same matching M.
+
+The fraction of sampled vertices matched by M estimates 2 |M| / n, with a
+confidence interval from the Hoeffding bound. Since M is maximal, a
+maximum matching has between |M| and 2 |M| edges.
+
+:filename estimation.py
+"""
+
+__all__ = [ 'estimate_matching_size', 'SAMPLES', 'CONFIDENCE' ]
+
+# Necessary imports
+import math
+import random
+
+import structures
+
+# Default number of sampled vertices and level of the confidence interval
+SAMPLES = 1000
+CONFIDENCE = 0.95
+
+def estimate_matching_size( G, samples=SAMPLES, confidence=CONFIDENCE, seed=None, report=None ):
+    """Estimate the greedy maximal matching size of G from sampled vertices.
+
+    :param G - the graph given
+        Either a structures.CompactGraph, a structures.ImplicitGraph or a
+        NetworkX graph. A NetworkX graph is compiled first, which takes
+        time O(m), so large graphs should be passed compiled or implicit.
+
+    :param samples - the number of vertices sampled (default SAMPLES)
+        The vertices are drawn uniformly, with replacement.
+
+    :param confidence - the level of the interval (default CONFIDENCE)
+        Between 0 and 1, exclusive.
+
+    :param seed - the seed of the sample and the ranks (default None)
+
+    :param report - a dictionary to fill in (default None)
+        If given, report['matched'] is set to the number of sampled
+        vertices matched by the greedy matching, report['rows'] to the
+        number of neighbor rows read and report['bounds'] to a (low, high)
+        interval holding the size of a maximum matching with the requested
+        confidence.
+
+    :return (estimate, low, high) - the estimated size of the random
+        greedy maximal matching and the confidence interval around it.
+        This is not an estimate of the maximum matching size, which lies
+        between low and 2 * high, as given by report['bounds'].
+
+    :notes
+    The greedy matching is maximal, so the estimate is at least half the
+    size of a maximum matching, up to the sampling error. With average
+    degree d the exploration reads O(d) rows per sample in expectation
+    over the ranks and the sampled vertex.
+    """
+
+    if samples < 1:
+        raise ValueError("at least one sample is required")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must lie strictly between 0 and 1")
+    if not isinstance(G, (structures.CompactGraph, structures.ImplicitGraph)):
+        G = structures.CompactGraph.from_networkx( G )
+
+    n = len( G )
+    if n == 0:
+        if report is not None:
+            report['matched'] = report['rows'] = 0
+            report['bounds'] = (0, 0)
+        return 0.0, 0.0, 0.0
+
+    rnd = random.Random( seed )
+    oracle = RandomGreedyOracle(G, rnd)
+    matched = 0
+    for _ in xrange( samples ):
+        if oracle.vertex( rnd.randrange( n ) ) >= 0:
+            matched += 1
+
+    # Each sampled vertex is matched with probability 2 |M| / n
+    fraction = float( matched ) / samples
+    error = math.sqrt( math.log( 2.0 / (1.0 - confidence) ) / (2.0 * samples) )
+    estimate = fraction * n / 2.0
+    low = max(0.0, fraction - error) * n / 2.0
+    high = min(1.0, fraction + error) * n / 2.0
+
+    if report is not None:
+        report['matched'] = matched
+        report['rows'] = len( oracle.rows )
+        report['bounds'] = (low, min(2.0 * high, float( n / 2 )))
+    return estimate, low, high
+
+class RandomGreedyOracle(object):
+    """ Local oracle for the random greedy maximal matching of a graph.
+
+    The oracle answers whether an edge or a vertex is matched by the
+    maximal matching built greedily by increasing random rank, exploring
+    only the edges of lower rank around the query. The rows read are kept
+    sorted by rank, and every answer is memoized.
+    """
+
+    __slots__ = [ 'G', 'rnd', 'ranks', 'rows', 'answers' ]
+
+    def __init__(self, G, rnd):
+        """ Create an oracle for the graph G.
+
+        :param G - the graph, indexed by vertex ID
+        :param rnd - the random.Random drawing the ranks
+        """
+
+        self.G = G
+        self.rnd = rnd
+        self.ranks = { }
+        self.rows = { }
+        self.answers = { }
+
+    def row(self, v):
+        """ Return the (ranks, neighbors) of vertex v, by increasing rank. """
+
+        row = self.rows.get( v )
+        if row is None:
+            ranks = self.ranks
+            pairs = [ ]
+            for w in self.G.neighbors( v ):
+                if w == v:
+                    continue
+                key = (v, w) if v < w else (w, v)
+                rank = ranks.get( key )
+                if rank is None:
+                    rank = ranks[key] = self.rnd.random()
+                pairs.append( (rank, w) )
+            pairs.sort()
+            row = self.rows[v] = ( [ r for r, w in pairs ], [ w for r, w in pairs ] )
+        return row
+
+    def edge(self, u, v):
+        """ Return True if the edge (u, v) is in the greedy matching.
+
+        The recursion on the adjacent edges of lower rank runs on an
+        explicit stack. Each frame merges the rows of both end points by
+        rank and stops at the first adjacent edge in the matching, or at
+        the rank of its own edge.
+        """
+
+        answers = self.answers
+        first = (u, v) if u < v else (v, u)
+        if first in answers:
+            return answers[first]
+
+        stack = [ [u, v, self.ranks[first], 0, 0] ]
+        while stack:
+            frame = stack[-1]
+            a, b, rank, i, j = frame
+            ranksA, rowA = self.row( a )
+            ranksB, rowB = self.row( b )
+            answer = None
+            while answer is None:
+                if i < len( rowA ) and rowA[i] == b:
+                    i += 1
+                    continue
+                if j < len( rowB ) and rowB[j] == a:
+                    j += 1
+                    continue
+                rankA = ranksA[i] if i < len( rowA ) else 1.0
+                rankB = ranksB[j] if j < len( rowB ) else 1.0
+                if min(rankA, rankB) >= rank:
+                    answer = True
+                    break
+                x, y = (a, rowA[i]) if rankA <= rankB else (b, rowB[j])
+                key = (x, y) if x < y else (y, x)
+                known = answers.get( key )
+                if known is None:
+                    # Decide the lower edge first and come back to it
+                    stack.append( [x, y, rankA if x == a else rankB, 0, 0] )
+                    break
+                if known:
+                    answer = False
+                elif x == a:
+                    i += 1
+                else:
+                    j += 1
+            frame[3], frame[4] = i, j
+            if answer is not None:
+                answers[(a, b) if a < b else (b, a)] = answer
+                stack.pop()
+        return answers[first]
+
+    def vertex(self, v):
+        """ Return the mate of vertex v in the greedy matching, or -1. """
+
+        for w in self.row( v )[1]:
+            if self.edge( v, w ):
+                return w
+        return -1
+
+#end
\ No newline at end of file
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+
+"""
+Maximum cardinality matching of geometric proximity graphs.
+
+This module implements match_points, which pairs points that lie within a
+given distance of each other. Instead of testing all O(n^2) pairs, the
+pairs within the radius are found through a spatial index over the
+coordinates, either the KD-tree of SciPy or a uniform grid of cells as
+wide as the radius, built with vectorized NumPy operations. The pairs are
+compiled into a CompactGraph in one step and matched by
+max_cardinality_matching.
+
+:filename geometric.py
+"""
+
+__all__ = [ 'match_points', 'close_pairs', 'INDEXES' ]
+
+# Necessary imports
+import itertools
+
+import structures
+from matching import max_cardinality_matching
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import scipy.spatial
+except ImportError:
+    scipy = None
+
+# The spatial indexes close_pairs can use
+INDEXES = [ 'kdtree', 'grid' ]
+
+# Number of points whose candidate pairs the grid index checks at once
+BATCH = 4096
+
+def match_points( coords, radius, output='dict', index=None, lazy=False ):
+    """Compute a maximum matching of points within a distance of each other.
+
+    :param coords - the n by d NumPy array of point coordinates
+
+    :param radius - the largest Euclidean distance of two matched points
+
+    :param output - the form of the result (default 'dict')
+        Either 'dict', 'array' or 'compact', as for
+        max_cardinality_matching. The vertices are the row numbers of
+        coords.
+
+    :param index - the spatial index to use (default None)
+        One of INDEXES. If None, the KD-tree is used when SciPy is
+        available and the grid otherwise.
+
+    :param lazy - whether to stream the neighbor queries (default False)
+        If True, no adjacency is compiled: the matcher queries the
+        KD-tree for the neighbors of a vertex when a search reaches it,
+        through a structures.ImplicitGraph, which keeps the rows of the
+        most recently reached vertices in its bounded cache. This needs
+        SciPy.
+
+    :return mate - the maximum matching, in the requested output form
+    """
+
+    if not lazy:
+        pairs = close_pairs( coords, radius, index )
+        G = structures.CompactGraph.from_edge_array( pairs, len( numpy.asarray( coords ) ) )
+        return max_cardinality_matching(G, output=output)
+
+    if index not in (None, 'kdtree'):
+        raise ValueError("lazy matching uses the kdtree index")
+    if scipy is None:
+        raise ImportError("lazy matching requires SciPy")
+    coords = pointArray( coords, radius )
+    tree = scipy.spatial.cKDTree( coords )
+    def neighbors(v):
+        return [ u for u in tree.query_ball_point( coords[v], radius ) if u != v ]
+    G = structures.ImplicitGraph(xrange( len( coords ) ), neighbors)
+    return max_cardinality_matching(G, output=output, dense=False)
+
+def close_pairs( coords, radius, index=None ):
+    """ Find the pairs of points within a distance of each other.
+
+    :param coords - the n by d NumPy array of point coordinates
+    :param radius - the largest Euclidean distance of a pair
+    :param index - the spatial index to use, one of INDEXES (default None)
+    :return pairs - the (m, 2) array of the row numbers of the pairs, each
+        pair once with the lower row number first
+    """
+
+    coords = pointArray( coords, radius )
+    if index is None:
+        index = 'kdtree' if scipy is not None else 'grid'
+    if index not in INDEXES:
+        raise ValueError("unknown index %r" % (index,))
+    if len( coords ) == 0:
+        return numpy.zeros( (0, 2), numpy.int64 )
+    if index == 'kdtree':
+        if scipy is None:
+            raise ImportError("the kdtree index requires SciPy")
+        pairs = scipy.spatial.cKDTree( coords ).query_pairs( radius, output_type='ndarray' )
+        return pairs.reshape( -1, 2 ).astype( numpy.int64 )
+    return gridPairs( coords, radius )
+
+def pointArray( coords, radius ):
+    """ Check the arguments and return coords as an n by d float array. """
+
+    if numpy is None:
+        raise ImportError("match_points requires NumPy")
+    coords = numpy.asarray( coords, float )
+    if coords.ndim == 1:
+        coords = coords.reshape( -1, 1 )
+    if coords.ndim != 2:
+        raise ValueError("coords must have shape (n, d)")
+    if radius < 0:
+        raise ValueError("radius must not be negative")
+    return coords
+
+def gridPairs( coords, radius ):
+    """ Find the pairs of points within radius with a uniform grid.
+
+    Every point is put into a cell of side radius, so the points within
+    radius of a point lie in its own cell or in one of the neighboring
+    cells. Each pair of neighboring cells is visited once, through the
+    offsets that are lexicographically positive, and the candidate pairs
+    of a batch of points are expanded and filtered by distance at once.
+
+    :param coords - the n by d array of point coordinates
+    :param radius - the largest Euclidean distance of a pair
+    :return pairs - the (m, 2) array of pairs, lower row number first
+    """
+
+    n, d = coords.shape
+    if radius == 0:
+        # A radius of zero pairs coincident points only
+        return coincidentPairs( coords )
+
+    # Number the cells, leaving a margin so every neighbor cell has a key
+    cells = gridCells( numpy.floor( (coords - coords.min( axis=0 )) / radius ) ) + 1
+    shape = cells.max( axis=0 ) + 2
+    if reduce( lambda size, side: size * int( side ), shape, 1 ) >= 2**63:
+        raise ValueError("too many grid cells for %d dimensions, use the kdtree index" % (d,))
+    strides = numpy.cumprod( numpy.concatenate( ([1], shape[:0:-1]) ) )[::-1]
+    keys = cells.dot( strides )
+
+    # Sort the points by cell, so each cell is a range of the order
+    order = numpy.argsort( keys, kind='mergesort' )
+    sortedKeys = keys[order]
+
+    found = [ ]
+    offsets = [ o for o in itertools.product( (-1, 0, 1), repeat=d ) if o >= (0,) * d ]
+    for offset in offsets:
+        shift = int( numpy.dot( offset, strides ) )
+        for first in xrange(0, n, BATCH):
+            points = numpy.arange( first, min( first + BATCH, n ) )
+            target = keys[points] + shift
+            start = numpy.searchsorted( sortedKeys, target, 'left' )
+            count = numpy.searchsorted( sortedKeys, target, 'right' ) - start
+
+            # Expand each point into its candidate pairs
+            total = int( count.sum() )
+            if total == 0:
+                continue
+            left = numpy.repeat( points, count )
+            ends = numpy.cumsum( count )
+            right = order[ numpy.arange( total ) + numpy.repeat( start - ends + count, count ) ]
+
+            # Keep the pairs within radius, each once
+            keep = ((coords[left] - coords[right]) ** 2).sum( axis=1 ) <= radius * radius
+            if shift == 0:
+                keep &= left < right
+            pairs = numpy.column_stack( (left[keep], right[keep]) )
+            found.append( numpy.sort( pairs, axis=1 ) )
+
+    if not found:
+        return numpy.zeros( (0, 2), numpy.int64 )
+    return numpy.concatenate( found ).astype( numpy.int64 )
+
+def gridCells( cells ):
+    """ Renumber the cells along each axis, keeping neighbors adjacent.
+
+    The occupied cells of an axis are numbered in order, and a gap of one
+    cell is kept wherever two of them are not adjacent, so the points of
+    a sparse or far spread set get small cell numbers whose keys fit in
+    an int64.
+
+    :param cells - the n by d float array of cell numbers
+    :return cells - the n by d int64 array of renumbered cells
+    """
+
+    renumbered = numpy.empty( cells.shape, numpy.int64 )
+    for axis in xrange( cells.shape[1] ):
+        values, inverse = numpy.unique( cells[:, axis], return_inverse=True )
+        steps = numpy.where( numpy.diff( values ) > 1, 2, 1 )
+        renumbered[:, axis] = numpy.concatenate( ([0], numpy.cumsum( steps )) )[inverse]
+    return renumbered
+
+def coincidentPairs( coords ):
+    """ Find the pairs of points with equal coordinates. """
+
+    order = numpy.lexsort( coords.T[::-1] )
+    found = [ ]
+    start = 0
+    for k in xrange(1, len( order ) + 1):
+        if k == len( order ) or (coords[order[k]] != coords[order[start]]).any():
+            group = numpy.sort( order[start:k] )
+            found.extend( itertools.combinations( group.tolist(), 2 ) )
+            start = k
+    return numpy.array( found, numpy.int64 ).reshape( -1, 2 )
+
+#end
\ No newline at end of file
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+"""
+Maximum cardinality matching of implicit graphs.
+
+This module implements implicit_matching, which matches a graph given by
+its vertices and a neighbor rule instead of a NetworkX graph. The rule is
+wrapped in a structures.ImplicitGraph and the Micali-Vazirani phases call
+it in place of G.neighbors_iter, so the edges of a vertex are only
+generated when a search reaches the vertex. Unlike other graphs, an
+implicit graph is not split into connected components before the first
+phase, since that would generate every row up front. The rows generated
+are memoized in a cache of bounded size.
+
+:filename implicit.py
+"""
+
+__all__ = [ 'implicit_matching' ]
+
+# Necessary imports
+import structures
+from matching import max_cardinality_matching
+
+def implicit_matching( vertices, neighbors, cache_size=structures.implicit_graph.CACHE_SIZE,
+                       output='dict', initial=None, validate='off', report=None ):
+    """Compute a maximum cardinality matching of an implicit graph.
+
+    :param vertices - the iterable of vertices, each hashable
+
+    :param neighbors - the neighbor rule
+        A function returning an iterable of the neighbors of a vertex,
+        for example a generator function. It must be symmetric and is
+        called again for a vertex whose row has left the cache.
+
+    :param cache_size - the number of rows to cache (default CACHE_SIZE)
+        0 disables the cache and None makes it unbounded.
+
+    :param output - the form of the result (default 'dict')
+        Either 'dict', 'array' or 'compact', as for
+        max_cardinality_matching. The array and compact forms are indexed
+        by the position of each vertex in vertices.
+
+    :param initial - a mate dictionary of vertices to start from (default None)
+
+    :param validate - the consistency checks to run (default 'off')
+
+    :param report - a dictionary to fill in (default None)
+        If given, report['hits'] and report['misses'] are set to the
+        number of lookups answered by the cache and by the rule.
+
+    :return mate - the maximum matching, in the requested output form
+    """
+
+    G = structures.ImplicitGraph(vertices, neighbors, cache_size)
+    if initial:
+        initial = dict( (G.index[v], G.index[w]) for v, w in initial.iteritems() )
+
+    mate = max_cardinality_matching(G, output=output, dense=False, initial=initial,
+                                    validate=validate)
+    if report is not None:
+        report['hits'] = G.hits
+        report['misses'] = G.misses
+    return mate
+
+#end
\ No newline at end of file
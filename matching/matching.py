@@ -10,6 +10,14 @@ Michael C. Loui, Algorithmica, 1988.
 Many terms used in the code comments are explained in the paper by Peterson
 and Loui. The paper could prove necessary in making sense of this code.
 
+The matcher only reads its input. All the state of a call, including the
+used and visited marks of the edges, is created by the call and dropped
+when it returns; nothing is written into the graph, its node or edge
+attribute dictionaries, or the initial matching, and the module keeps no
+mutable state. Any number of threads can therefore match the same graph,
+or subgraphs sharing its attribute dictionaries, at the same time, as long
+as no thread modifies the graph while it is being matched.
+
 :filename matching.py
 """
 
@@ -17,12 +25,33 @@ and Loui. The paper could prove necessary in making sense of this code.
 __author__  = "Alexander Soloviev"
 __email__   = "solova@rpi.edu"
 __date__    = "04/04/2015"
-__all__     = [ 'max_cardinality_matching' ]
+__all__     = [ 'max_cardinality_matching', 'VALIDATION_LEVELS', 'MatchingCancelled' ]
 
 # Necessary imports
+import array
+import collections
 import structures
 
-def max_cardinality_matching( G ):
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Edge density above which the dense backend is used, and the largest size
+# in bytes of the n by n adjacency matrix it builds when chosen by default,
+# which holds 8192 nodes
+DENSE_DENSITY = 0.25
+DENSE_MAX_BYTES = 64 * 2**20
+
+# Validation levels, from none to the strongest checks
+VALIDATION_LEVELS = [ 'off', 'phase', 'full' ]
+
+class MatchingCancelled(Exception):
+    """ Raised by max_cardinality_matching once its cancel event is set. """
+
+def max_cardinality_matching( G, output='dict', dense=None, initial=None,
+                              reorder=None, validate='off', vertex_mask=None,
+                              edge_mask=None, max_length=None, cancel=None ):
     """Compute a maximum cardinality matching in a general graph G.
     
     A matching is a subset of edges in which no node occurs more than once.
@@ -30,16 +59,111 @@ def max_cardinality_matching( G ):
     The maximum matching is a matching of maximum cardinality.
     
     :param G - the NetworkX graph given
-        Undirected graph.
+        Undirected graph. A structures.CompactGraph, for example one
+        loaded with structures.load_graph, is accepted as well. G is
+        only read, never modified. A SciPy sparse adjacency matrix or
+        an (m, 2) NumPy edge array is wrapped in a CompactGraph; the
+        index arrays of a CSR matrix are used without a copy. A
+        structures.ImplicitGraph is matched without compiling, calling
+        its neighbor rule only for the vertices the searches reach.
+    
+    :param output - the form of the result (default 'dict')
+        Either 'dict', 'array' or 'compact'. The array form requires a
+        CompactGraph or array input. A NetworkX graph is compiled into a
+        CompactGraph before matching, and the dictionary form is keyed by
+        its nodes again. Only the returned value is compact: the phases
+        keep the matching in a dictionary whatever the output, about 200
+        bytes per matched vertex, and the array is filled from it at the
+        end, so the peak memory of a matching is the same for every form.
+        
+    :param dense - use the dense backend (default None)
+        The dense backend keeps a boolean adjacency matrix and filters
+        the neighbors of each vertex with vectorized NumPy operations.
+        The matrix takes n * n bytes on top of the compiled graph and the
+        edge slots of the phases, 400 MB for 20000 nodes. If None, the
+        dense backend is used when NumPy is available, the edge density
+        of G is at least DENSE_DENSITY and the matrix takes at most
+        DENSE_MAX_BYTES. True builds the matrix whatever its size.
+        
+    :param initial - a matching to start from (default None)
+        A mate dictionary of the nodes of G, or of the vertex IDs if G is
+        a CompactGraph. For a CompactGraph the array or compact result of
+        an earlier call is accepted as well. The phases augment this
+        matching instead of the empty one, so a good initial matching
+        (for example a greedy one) leaves fewer phases to run.
+        
+    :param reorder - renumber the vertices for locality (default None)
+        One of structures.ORDERINGS ('bfs', 'rcm' or 'degree'). The
+        graph is compiled with its vertices renumbered so that neighbors
+        lie close together in memory, and the matching is mapped back to
+        the original vertices at the end. The result does not depend on
+        the renumbering, only the time taken to find it does.
+        
+    :param validate - the consistency checks to run (default 'off')
+        One of VALIDATION_LEVELS. With 'off' no checks run at all. With
+        'phase' the symmetry of the matching is checked after every
+        phase. With 'full' the level, predecessor and bloom invariants
+        are checked after every phase as well, and every augmenting path
+        is checked to alternate between exposed vertices before the
+        matching is augmented along it. A failed check raises an
+        AssertionError, also when Python runs with -O.
+        
+    :param vertex_mask - the vertices to match (default None)
+        A sequence or NumPy array of n booleans, indexed by the vertex
+        IDs of a CompactGraph. Only the subgraph induced by the vertices
+        whose entry is true is matched; the other vertices are skipped
+        when the neighbors of a vertex are scanned and are left exposed.
+        The graph is not copied, so one compiled graph can be matched
+        under many masks.
+        
+    :param edge_mask - the edges to match (default None)
+        A sequence or NumPy array of booleans with one entry for each
+        entry of G.targets, that is for each edge in the row of each of
+        its end points. Both entries of an edge must agree. Only the
+        edges whose entries are true are matched. If an initial matching
+        is given with a mask, its pairs outside the masked subgraph are
+        dropped, so the matching of the whole graph can warm start the
+        matching of a subgraph.
+        
+    :param max_length - the longest augmenting path to search for
+        (default None, no limit)
+        The phases find the shortest augmenting paths first, so they end
+        as soon as no augmenting path of at most max_length edges is
+        left. The matching returned then has at least (k + 1) / (k + 3)
+        times the maximum size, for k the largest odd number not above
+        max_length. A good initial matching makes this a cheap way to
+        improve it.
+        
+    :param cancel - an event stopping the matching (default None)
+        Any object with an is_set method, such as a threading.Event. It
+        is polled before every phase and every level of a search, and
+        once it is set MatchingCancelled is raised, so a matching that
+        is no longer wanted stops within one level of the search.
         
     :return mate - dictionary
         The matching is returned as a dictionary such that
         mate[v] == w if node v is matched to node w. Unmatched
-        nodes do not occur as a key in mate.
+        nodes do not occur as a key in mate. If G is a CompactGraph
+        with a label table, mate is keyed by the labels.
+        
+    :return mate - NumPy array, if output is 'array'
+        mate[v] == w if vertex v is matched to vertex w, and
+        mate[v] == -1 if vertex v is exposed.
+        
+    :return mate - structures.MateArray, if output is 'compact'
+        The mate array indexed by compiled vertex ID together with the
+        label table of the compiled graph. Its edges method returns the
+        matched edges as an array of pairs.
         
     :notes
     This function takes time O(sqrt(number_of_nodes) * number_of_edges).
     
+    This function is thread-safe and re-entrant. It never writes into G
+    or initial, so concurrent calls on a shared graph do not interfere.
+    The exception is a structures.ImplicitGraph, whose row cache is
+    written on every lookup without a lock, so an implicit graph must not
+    be matched by several threads at once.
+    
     This method is based on the "blossom" method for finding augmenting
     paths.
     
@@ -48,23 +172,94 @@ def max_cardinality_matching( G ):
         Paul A. Peterson and Michael C. Loui, Algorithmica, 1988
     """
     
+    # Wrap array inputs in a compact graph sharing their index arrays
+    if not hasattr(G, 'neighbors_iter'):
+        G = structures.CompactGraph.from_array( G )
+    
+    if output not in ('dict', 'array', 'compact'):
+        raise ValueError("unknown output %r" % (output,))
+    implicit = isinstance(G, structures.ImplicitGraph)
+    if output == 'array' and not isinstance(G, structures.CompactGraph) and not implicit:
+        raise ValueError("array output requires a CompactGraph, "
+                         "use output='compact' for NetworkX graphs")
+    
+    # Choose the backend
+    if dense is None:
+        dense = isDense( G )
+    if dense and numpy is None:
+        raise ImportError("the dense backend requires NumPy")
+    if implicit and (dense or reorder is not None):
+        raise ValueError("an ImplicitGraph cannot be matched dense or reordered")
+    
+    if reorder is not None and reorder not in structures.ORDERINGS:
+        raise ValueError("unknown vertex order %r" % (reorder,))
+    if validate not in VALIDATION_LEVELS:
+        raise ValueError("unknown validation level %r" % (validate,))
+    if max_length is not None and max_length < 1:
+        raise ValueError("max_length must be at least 1")
+    masked = vertex_mask is not None or edge_mask is not None
+    if masked and not isinstance(G, structures.CompactGraph):
+        raise ValueError("masks require a CompactGraph, compile the graph "
+                         "with structures.CompactGraph.from_networkx first")
+    if masked and reorder is not None:
+        raise ValueError("masks cannot be combined with reorder")
+    
+    # Read an initial matching in array or compact form
+    if initial is not None and not isinstance(initial, dict):
+        if not isinstance(G, structures.CompactGraph) and not implicit:
+            raise ValueError("an initial mate array requires a CompactGraph")
+        if isinstance(initial, structures.MateArray):
+            initial = initial.mate
+        initial = dict( (v, int( w )) for v, w in enumerate( initial ) if w >= 0 )
+    
+    # The phases keep their state in arrays indexed by integer vertices
+    if not isinstance(G, structures.CompactGraph) and not implicit:
+        G = structures.CompactGraph.from_networkx( G )
+        if initial:
+            index = dict( (v, i) for i, v in enumerate( G.labels ) )
+            initial = dict( (index[v], index[w]) for v, w in initial.iteritems() )
+    
+    # Drop the pairs of the initial matching that the masks remove
+    keepVertex = maskBytes( vertex_mask, len( G ), 'vertex_mask' )
+    keepEdge = None
+    if edge_mask is not None:
+        keepEdge = maskBytes( edge_mask, len( G.targets ), 'edge_mask' )
+    if initial and masked:
+        kept = maskedNeighbors( G, keepVertex, keepEdge )
+        initial = dict( (v, w) for v, w in initial.iteritems()
+                        if (keepVertex is None or keepVertex[v]) and w in kept( v ) )
+    
+    # Check that the initial matching is symmetric
+    if initial:
+        for v, w in initial.iteritems():
+            if initial.get( w ) != v:
+                raise ValueError("initial matching is not symmetric at %r" % (v,))
+    
+    # Renumber the vertices, original keeps the graph to map back to
+    order = None
+    if reorder is not None and len( G ):
+        order = structures.vertex_order( G, reorder )
+        original = G
+        G = structures.CompactGraph( G.offsets, G.targets, None, G.m ).permuted( order )
+        if initial:
+            rank = dict( (v, i) for i, v in enumerate( order ) )
+            initial = dict( (rank[v], rank[w]) for v, w in initial.iteritems() )
+    
+    # The phases scan only the neighbors kept by the masks
+    neighborsOf = maskedNeighbors( G, keepVertex, keepEdge )
     # Global variables for initializing node attributes
     INFINITY = len( G ) + 1 # Odd and even level attribute value
     
-    UNERASED = False # Erase attribute value
-    ERASED = True
+    UNERASED = 0 # Erase attribute value
+    ERASED = 1
     
-    UNVISITED = False # Visit attribute value
-    VISITED = True
+    UNVISITED = 0 # Visit attribute value
+    VISITED = 1
     
     LEFT = -1 # Left and right attribute value
     UNMARKED = 0
     RIGHT = 1
     
-    # Global variables for initializing edge attributes
-    UNUSED = False
-    USED = True
-    
     class Bloom:
         """ Representation of a bloom (a generalization of a blossom).
         
@@ -90,25 +285,117 @@ def max_cardinality_matching( G ):
             self.vR = vR
             self.dcv = dcv
             self.barrier = barrier
+            self.root = vL # The base* of s, where the left search starts
             
     # Get a list of vertices    
     gnodes = G.nodes()
     if not gnodes:
-        return { } # Ignore empty graphs
+        return packMate( G, { }, output ) # Ignore empty graphs
     
     # Initialize the top-level data structures for node attributes.
-    # Each of these is a dictionary indexed by the node.
-    nodeEvenLevel = { }
-    nodeOddLevel = { }
-    nodeBloom = { }
-    nodePredecessors = { }
-    nodeSuccessors = { }
-    nodeAnomalies = { }
-    nodeCount = { }
-    nodeErase = { }
-    nodeVisit = { }
-    nodeMark = { }
-    nodeParent = { }
+    # Each of these is indexed by the vertex. The integer attributes are
+    # kept in typed arrays and the flags in byte arrays, a few bytes per
+    # vertex each; only the blooms and parents, which may be None, are
+    # kept in lists. The level of a vertex, the smaller of its even and
+    # odd levels, is fixed by the first of the two that is set, so it is
+    # cached in nodeLevel.
+    n = len( G )
+    nodeEvenLevel = array.array( 'l', [INFINITY] ) * n
+    nodeOddLevel = array.array( 'l', [INFINITY] ) * n
+    nodeLevel = array.array( 'l', [INFINITY] ) * n
+    nodeCount = array.array( 'l', [0] ) * n
+    nodeErase = bytearray( n )
+    nodeVisit = bytearray( n )
+    nodeMark = array.array( 'b', [UNMARKED] ) * n
+    nodeBloom = [ None ] * n
+    nodeParent = [ None ] * n
+    
+    # The dense backend keeps a boolean adjacency matrix and, for the
+    # current phase, the sets of unerased vertices and of vertices with a
+    # finite even level as boolean vectors indexed by the vertex.
+    if dense:
+        adjacency = G.dense_adjacency()
+        if keepEdge is not None:
+            offsets = numpy.asarray( G.offsets, numpy.int64 )
+            rows = numpy.repeat( numpy.arange( len( G ) ), numpy.diff( offsets ) )
+            removed = numpy.frombuffer( keepEdge, numpy.uint8 ) == 0
+            adjacency[ rows[removed], numpy.asarray( G.targets, numpy.int64 )[removed] ] = False
+        if keepVertex is not None:
+            removed = numpy.frombuffer( keepVertex, numpy.uint8 ) == 0
+            adjacency[removed, :] = False
+            adjacency[:, removed] = False
+        unerasedSet = numpy.ones(len( G ), bool)
+        evenSet = numpy.zeros(len( G ), bool)
+    
+    # The predecessors, successors and anomalies of a vertex are distinct
+    # neighbors of it, so the three lists of vertex v fit into the row
+    # G.offsets[v] : G.offsets[v + 1] of one flat array of edge slots. The
+    # predecessors of v are final before its first anomaly is found, so both
+    # grow from the start of the row, the anomalies after the predecessors;
+    # the successors grow from the end of the row. A phase only resets the
+    # counts, it allocates nothing.
+    predecessorCount = array.array( 'l', [0] ) * len( G )
+    anomalyCount = array.array( 'l', [0] ) * len( G )
+    successorCount = array.array( 'l', [0] ) * len( G )
+    relationLists = [ ]
+    
+    if not implicit:
+        rowStart = G.offsets
+        edgeSlots = array.array( 'l', [0] ) * len( G.targets )
+        
+        def addPredecessor(u, v):
+            """ Record v as a predecessor of u, and u as a successor of v. """
+            edgeSlots[ rowStart[u] + predecessorCount[u] ] = v
+            predecessorCount[u] += 1
+            successorCount[v] += 1
+            edgeSlots[ rowStart[v + 1] - successorCount[v] ] = u
+        
+        def addAnomaly(u, v):
+            """ Record v as an anomaly of u. """
+            edgeSlots[ rowStart[u] + predecessorCount[u] + anomalyCount[u] ] = v
+            anomalyCount[u] += 1
+        
+        def predecessors(v):
+            start = rowStart[v]
+            return edgeSlots[ start : start + predecessorCount[v] ]
+        
+        def anomalies(v):
+            start = rowStart[v] + predecessorCount[v]
+            return edgeSlots[ start : start + anomalyCount[v] ]
+        
+        def successors(v):
+            end = rowStart[v + 1]
+            return reversed( edgeSlots[ end - successorCount[v] : end ] )
+    
+    else:
+        
+        # The rows of an implicit graph are not known in advance, so the
+        # lists are kept for the vertices reached in the phase only
+        predecessorLists = collections.defaultdict( list )
+        anomalyLists = collections.defaultdict( list )
+        successorLists = collections.defaultdict( list )
+        relationLists = [ predecessorLists, anomalyLists, successorLists ]
+        
+        def addPredecessor(u, v):
+            """ Record v as a predecessor of u, and u as a successor of v. """
+            predecessorLists[u].append( v )
+            predecessorCount[u] += 1
+            successorLists[v].append( u )
+            successorCount[v] += 1
+        
+        def addAnomaly(u, v):
+            """ Record v as an anomaly of u. """
+            anomalyLists[u].append( v )
+            anomalyCount[u] += 1
+        
+        def predecessors(v):
+            return predecessorLists.get( v, () )
+        
+        def anomalies(v):
+            return anomalyLists.get( v, () )
+        
+        def successors(v):
+            return successorLists.get( v, () )
     
     # Path compression:
     #nodeBaseStar = { }
@@ -120,18 +407,46 @@ def max_cardinality_matching( G ):
     
     # Initialize the top-level data structure for candidates.
     # Candidates is constructed so that candidates[i] contains all of the
-    # vertices to search at the current level i.
-    candidates = { }
+    # vertices to search at the current level i. The lists of the levels
+    # reached are created as they are needed.
+    candidates = collections.defaultdict( list )
     
     # Initialize the top-level data structure for bridges.
     # Bridges is constructed so that bridges[i] contains all bridges at
     # level i. A bridge is an edge whose removal leaves a disconnected graph.
-    bridges = { }
+    bridges = collections.defaultdict( structures.OrderedSet )
+    
+    # Initialize the top-level data structures for edge attributes. Each
+    # of these is a set of edges, given as sorted tuples, that are used by
+    # the depth-first searches or visited by findPath during the current
+    # phase. They are kept here rather than in G so that G is never written.
+    usedEdges = set()
+    visitedEdges = set()
     
     # If v is a matched vertex, mate[v] is its partner vertex.
     # If v is a single vertex, v does not occur as a key in mate.
-    # Initially all vertices are single and are updated during augmentation.    
-    mate = { }
+    # Initially all vertices are single, unless an initial matching is
+    # given, and are updated during augmentation.
+    mate = dict( initial ) if initial else { }
+    
+    # Split the vertices into connected components and count the exposed
+    # vertices of each. An augmenting path needs two exposed vertices in the
+    # same component, so each phase resets and searches only the vertices
+    # of the active components, those with at least two exposed vertices.
+    # Splitting an implicit graph would generate every row up front, so
+    # its vertices are kept in a single component.
+    if implicit:
+        componentNodes = [ [ v for v in G.nodes_iter() if keepVertex is None or keepVertex[v] ] ]
+    else:
+        componentNodes = connectedComponents( G, neighborsOf, keepVertex )
+    componentOf = array.array( 'l', [0] ) * len( G )
+    exposedCount = [ ]
+    for c, nodes in enumerate( componentNodes ):
+        for v in nodes:
+            componentOf[v] = c
+        exposedCount.append( sum( 1 for v in nodes if v not in mate ) )
+    activeComponents = range( len( componentNodes ) )
+    activeNodes = [ ]
     
     def search():
         """ The search subroutine.
@@ -145,40 +460,76 @@ def max_cardinality_matching( G ):
         
         i = 0 # Counter for the current level
         
-        # Insert each exposed vertex into candidates
-        for v in G.nodes_iter():
+        # Insert each exposed vertex of the active components into candidates
+        for v in activeNodes:
             if v not in mate:
                 nodeEvenLevel[v] = 0
+                nodeLevel[v] = 0
                 candidates[0].append( v )
+                if dense: evenSet[v] = True
         
         # Perform a breadth-first search through each of the vertices.
         # Continue iteration while candidates is not empty and no augmentation
-        # occurred at level i-1.
+        # occurred at level i-1. The bridges of level i close augmenting
+        # paths of length 2i+1, so max_length bounds the levels searched.
+        levels = len( activeNodes ) + 1
+        if max_length is not None:
+            levels = min( levels, (max_length + 1) / 2 )
         augmented = False
-        while (i < len( gnodes ) + 1) and not augmented:
+        while (i < levels) and not augmented:
             
-            if i % 2 == 0: # If level i is even
+            if cancel is not None and cancel.is_set():
+                raise MatchingCancelled("matching cancelled at level %d" % i)
+            
+            if i % 2 == 0 and dense: # If level i is even, dense backend
+                for v in candidates[i]:
+                    
+                    # Select the unerased and unmatched neighbors u of node v
+                    # at once and split them by whether their even level is
+                    # finite, then handle them as in the loop below.
+                    mask = adjacency[v] & unerasedSet
+                    mask[v] = False
+                    if v in mate:
+                        mask[ mate[v] ] = False
+                    neighbors = numpy.flatnonzero( mask )
+                    outer = evenSet[neighbors]
+                    
+                    for u in neighbors[outer].tolist():
+                        j = (nodeEvenLevel[u] + nodeEvenLevel[v]) / 2
+                        bridges[j].add( tuple( sorted( [u, v] ) ) )
+                        
+                    for u in neighbors[~outer].tolist():
+                        if nodeOddLevel[u] == INFINITY:
+                            nodeOddLevel[u] = i + 1
+                            nodeLevel[u] = i + 1
+                        if nodeOddLevel[u] == i + 1:
+                            nodeCount[u] += 1
+                            addPredecessor(u, v)
+                            candidates[i + 1].append( u )
+                        elif nodeOddLevel[u] < i:
+                            addAnomaly(u, v)
+            
+            elif i % 2 == 0: # If level i is even
                 for v in candidates[i]:
                     
                     # For each unerased and unmatched neighbor u of node v,
                     # determine whether the edge (u, v) is a bridge.
-                    for u in G.neighbors_iter( v ):
+                    for u in neighborsOf( v ):
                         if u == v: continue # Ignore self-loops
                         if mate.get(v) != u and nodeErase[u] == UNERASED:
-                            assert mate.get(u) != v
                             if nodeEvenLevel[u] < INFINITY:
                                 j = (nodeEvenLevel[u] + nodeEvenLevel[v]) / 2
                                 bridges[j].add( tuple( sorted( [u, v] ) ) )
                             else:
                                 if nodeOddLevel[u] == INFINITY:
                                     nodeOddLevel[u] = i + 1
+                                    nodeLevel[u] = i + 1
                                 if nodeOddLevel[u] == i + 1:
                                     nodeCount[u] += 1
-                                    nodePredecessors[u].append( v )
-                                    nodeSuccessors[v].append( u )
+                                    addPredecessor(u, v)
                                     candidates[i + 1].append( u )
                                 elif nodeOddLevel[u] < i:
-                                    nodeAnomalies[u].append( v )
+                                    addAnomaly(u, v)
             
             else: # If level i is odd
                 for v in candidates[i]:
@@ -192,16 +543,18 @@ def max_cardinality_matching( G ):
                             j = (nodeOddLevel[u] + nodeOddLevel[v]) / 2
                             bridges[j].add( tuple( sorted( [u, v] ) ) )
                         elif nodeEvenLevel[u] == INFINITY:
-                            nodePredecessors[u] = [v]
-                            nodeSuccessors[v] = [u]
+                            addPredecessor(u, v)
                             nodeCount[u] = 1
                             nodeEvenLevel[u] = i + 1
+                            nodeLevel[u] = i + 1
                             candidates[i + 1].append( u )
+                            if dense: evenSet[u] = True
             
             # Call augmentBlossom for each edge in bridges
             for s, t in bridges[i]:
                 if nodeErase[s] == UNERASED and nodeErase[t] == UNERASED:
-                    augmented = augmentBlossom(s, t, i)
+                    if augmentBlossom(s, t, i):
+                        augmented = True # A later bloom must not reset this
             
             i += 1 # Increment the level counter
             
@@ -252,15 +605,15 @@ def max_cardinality_matching( G ):
             
             # Get the levels of both vL and vR
             if dfsInfo.vL == None or dfsInfo.vR == None: return False
-            level_vL = min(nodeEvenLevel[dfsInfo.vL], nodeOddLevel[dfsInfo.vL])
-            level_vR = min(nodeEvenLevel[dfsInfo.vR], nodeOddLevel[dfsInfo.vR])
+            level_vL = nodeLevel[dfsInfo.vL]
+            level_vR = nodeLevel[dfsInfo.vR]
             
             # Increase the matching if vL and vR are both exposed
             if dfsInfo.vL not in mate and dfsInfo.vR not in mate:
                 pathL = findPath(dfsInfo.s, dfsInfo.vL, None)
                 pathR = findPath(dfsInfo.t, dfsInfo.vR, None)
                 path = connectPath(pathL, pathR, dfsInfo.s, dfsInfo.t)
-                augmentMatching(dfsInfo.vL, dfsInfo.vR)
+                augmentMatching(path)
                 erasePath(path)
                 augmented = True
                 break
@@ -294,16 +647,17 @@ def max_cardinality_matching( G ):
                 # Set the base* attribute of the vertex
                 #nodeBaseStar[v] = baseStardcv
                 
-                level_v = min(nodeEvenLevel[v], nodeOddLevel[v])
+                level_v = nodeLevel[v]
                 if level_v % 2 == 0: # Check if v is outer
                     nodeOddLevel[v] = 2*i + 1 - nodeEvenLevel[v]
                 else: # Else v is inner
                     nodeEvenLevel[v] = 2*i + 1 - nodeOddLevel[v]
                     candidates[ nodeEvenLevel[v] ].append( v )
-                    for z in nodeAnomalies[v]:
+                    if dense: evenSet[v] = True
+                    for z in anomalies( v ):
                         j = (nodeEvenLevel[v] + nodeEvenLevel[z]) / 2
                         bridges[j].add( tuple( sorted( [v, z] ) ) )
-                        G[v][z]['use'] = USED
+                        usedEdges.add( tuple( sorted( [v, z] ) ) )
             
         # Clear the bloomNodes list
         del bloomNodes[:]
@@ -363,29 +717,26 @@ def max_cardinality_matching( G ):
         
         return path
     
-    def augmentMatching(lv, rv):
-        """ Augment the matching by the path from vertex lv to vertex rv.
+    def augmentMatching(path):
+        """ Augment the matching by the alternating path given.
+        
+        The parent pointers are not followed, since opening nested blooms
+        can leave them inconsistent with the path that was found.
         
-        :param lv - the left vertex
-        :param rv - the right vertex
+        :param path - the augmenting path, from one exposed vertex to another
         """
         
-        # Iterate through the path by following the parent pointers
-        firstv = rv
-        secondv = None
-        while firstv != lv:
-            
-            # Get the parent node of firstv
-            secondv = nodeParent[firstv]
-            
-            if mate.get(secondv) != firstv:
-                assert mate.get(firstv) != secondv
-                
-                # Add the vertices to mate
-                mate[firstv] = secondv
-                mate[secondv] = firstv
-                
-            firstv = secondv
+        if validate == 'full':
+            checkPath( path )
+        
+        # Match every other edge of the path, starting with the first one
+        for k in xrange(0, len( path ) - 1, 2):
+            firstv, secondv = path[k], path[k + 1]
+            mate[firstv] = secondv
+            mate[secondv] = firstv
+        
+        # Both ends of the path were exposed vertices of the same component
+        exposedCount[ componentOf[ path[0] ] ] -= 2
         
     def leftDfs(dfsInfo):
         """ The leftDfs subroutine.
@@ -398,15 +749,22 @@ def max_cardinality_matching( G ):
         :return bool - True if a bloom was found, False otherwise
         """
         
+        # Backtracking past the root means that the left search is exhausted.
+        # The parent of the root is s if s lies in a bloom, but the edges of s
+        # must not be searched then, they lead out of the bloom of s.
+        if dfsInfo.vL != dfsInfo.root and dfsInfo.vL == dfsInfo.s:
+            return True # Signal discovery of a bloom
+        
         # Search through all unused and unerased predecessor edges of vL
-        for uL in nodePredecessors[dfsInfo.vL]:
+        for uL in predecessors( dfsInfo.vL ):
             
             # Skip the edge (vL, uL) if it is used or erased
-            if G[dfsInfo.vL][uL]['use'] == USED or nodeErase[uL] == ERASED:
+            edge = tuple( sorted( [dfsInfo.vL, uL] ) )
+            if edge in usedEdges or nodeErase[uL] == ERASED:
                 continue
             
             # Mark the edge (vL, uL) as used
-            G[dfsInfo.vL][uL]['use'] = USED
+            usedEdges.add( edge )
             
             # If uL belongs to a bloom, set the bloombase of uL
             if nodeBloom[uL]:
@@ -423,9 +781,19 @@ def max_cardinality_matching( G ):
             # Otherwise if u is equal to vR, set the dcv equal to u
             elif uL == dfsInfo.vR:
                 dfsInfo.dcv = uL
+                
+                # The right search must look for another vertex first, so
+                # the left search takes uL and the right search backtracks.
+                # It takes uL back once it backtracks to the barrier.
+                if dfsInfo.vR != dfsInfo.barrier:
+                    dfsInfo.vR = nodeParent[uL]
+                    nodeMark[uL] = LEFT
+                    nodeParent[uL] = dfsInfo.vL
+                    dfsInfo.vL = uL
+                    return False
             
         # If u has a mark, then leftDfs is backtracking 
-        if dfsInfo.vL == dfsInfo.s:
+        if dfsInfo.vL == dfsInfo.root:
             return True # Signal discovery of a bloom
         elif nodeParent[dfsInfo.vL] != None:
             dfsInfo.vL = nodeParent[dfsInfo.vL] # Keep backtracking
@@ -444,14 +812,15 @@ def max_cardinality_matching( G ):
         """
         
         # Search through all unused and unerased predecessor edges of vR
-        for uR in nodePredecessors[dfsInfo.vR]:
+        for uR in predecessors( dfsInfo.vR ):
             
             # Skip the edge (vR, uR) if it is used or erased
-            if G[dfsInfo.vR][uR]['use'] == USED or nodeErase[uR] == ERASED:
+            edge = tuple( sorted( [dfsInfo.vR, uR] ) )
+            if edge in usedEdges or nodeErase[uR] == ERASED:
                 continue
             
             # Mark the edge (vR, uR) as used
-            G[dfsInfo.vR][uR]['use'] = USED
+            usedEdges.add( edge )
             
             # If uR belongs to a bloom, set the bloombase of uR
             if nodeBloom[uR]:
@@ -497,9 +866,10 @@ def max_cardinality_matching( G ):
             # Get a vertex from the path
             y = path.pop()
             nodeErase[y] = ERASED
+            if dense: unerasedSet[y] = False
             
             # Iterate through each of its successors
-            for z in nodeSuccessors[y]:
+            for z in successors( y ):
                 if nodeErase[z] == UNERASED:
                     nodeCount[z] -= 1
                     
@@ -507,7 +877,7 @@ def max_cardinality_matching( G ):
                     if nodeCount[z] == 0:
                         path.append( z )
                         
-    def findPath(high, low, b):
+    def findPath(high, low, b, anySide=False):
         """ The findPath subroutine.
         
         Find an alternating path from vertex high to vertex low through
@@ -518,13 +888,14 @@ def max_cardinality_matching( G ):
         :param high - the high vertex
         :param low - the low vertex
         :param b - the bloom given
+        :param anySide - whether the path may cross to the other side of
+            b (default False)
         :return path - the alternating path found
         """
         
         # Determine the level of the vertices high and low
-        level_high = min(nodeEvenLevel[high], nodeOddLevel[high])
-        level_low = min(nodeEvenLevel[low], nodeOddLevel[low])
-        assert level_high >= level_low
+        level_high = nodeLevel[high]
+        level_low = nodeLevel[low]
         
         # If the vertices are equivalent, return a single node path
         if high == low:
@@ -533,6 +904,26 @@ def max_cardinality_matching( G ):
         # Initialize the alternating path
         path = [ ]
         
+        def sideOf(x):
+            """ Return the mark the double depth-first search gave to x.
+            
+            Vertices in blooms nested in b keep the marks of older searches,
+            so the mark is read from their base* relative to b instead. The
+            climb ends at low and at the base of b: blooms sharing the base
+            of b lead there without being nested in b. Vertices whose climb
+            does not end in b lie outside b and count as unmarked.
+            """
+            
+            while nodeBloom[x] != None and nodeBloom[x] != b and x != low \
+            and ( b == None or x != b.base ):
+                x = nodeBloom[x].base
+            if b != None and nodeBloom[x] != b:
+                return x, UNMARKED
+            return x, nodeMark[x]
+        
+        # The search stays on the side of high
+        markHigh = sideOf( high )[1]
+        
         # Perform a depth-first search to find the vertex low from the vertex high
         v = high
         u = high
@@ -541,15 +932,16 @@ def max_cardinality_matching( G ):
             # Check whether v has unvisited predecessor edges
             hasUnvisitedPredecessor = False
             
-            for p in nodePredecessors[v]:
+            for p in predecessors( v ):
                 
                 # Break if the edge (p, v) is unvisited
-                if G[p][v]['visit'] == UNVISITED:
+                edge = tuple( sorted( [p, v] ) )
+                if edge not in visitedEdges:
                     hasUnvisitedPredecessor = True
                     
                     # Check whether vertex v belongs to a bloom, set u accordingly
                     if nodeBloom[v] == None or nodeBloom[v] == b:
-                        G[p][v]['visit'] = VISITED
+                        visitedEdges.add( edge )
                         u = p
                     else:
                         u = nodeBloom[v].base
@@ -558,20 +950,24 @@ def max_cardinality_matching( G ):
             
             # There are no unvisited predecessor edges, so backtrack
             if not hasUnvisitedPredecessor:
-                assert nodeParent[v] != None
                 v = nodeParent[v]
             else:
                 # Get the level of node u
-                level_u = min(nodeEvenLevel[u], nodeOddLevel[u])
+                level_u = nodeLevel[u]
                 
                 # Mark u visited and set the parent pointers
+                baseU, markU = sideOf( u )
                 if nodeErase[u] == UNERASED and level_u >= level_low \
                 and ( u == low or ( nodeVisit[u] == UNVISITED \
-                and ( nodeMark[u] == nodeMark[high] != UNMARKED \
-                or ( nodeBloom[u] != None and nodeBloom[u] != b ) ) ) ):
+                and ( markU == markHigh != UNMARKED or baseU == low \
+                or ( anySide and markU != UNMARKED ) ) ) ):
                     nodeVisit[u] = VISITED
                     nodeParent[u] = v
                     v = u
+                elif nodeBloom[v] != None and nodeBloom[v] != b:
+                    # The base is the only way out of the bloom of v, so
+                    # backtrack instead of trying the same base again
+                    v = nodeParent[v]
                     
         # Compute the path
         while u != high:
@@ -591,8 +987,11 @@ def max_cardinality_matching( G ):
                 nodeVisit[xj] = UNVISITED
                 path[j : j + 2], pathLength = openBloom( xj )
                 nodeParent[ xj ] = path[j - 1] if j > 0 else None
+                
+                # Continue at the base, which may lie in an enclosing bloom
                 j += pathLength - 1
-            j += 1
+            else:
+                j += 1
         
         return path
                 
@@ -610,11 +1009,13 @@ def max_cardinality_matching( G ):
         # Get the bloom that vertex x corresponds to
         bloom = nodeBloom[x]
         base = bloom.base
-        level_x = min(nodeEvenLevel[x], nodeOddLevel[x])
+        level_x = nodeLevel[x]
         path = [ ]
         
         if level_x % 2 == 0: # If x is outer
-            path = findPath(x, base, bloom)
+            # The double depth-first search may leave x on the side that
+            # backed off, so the path to the base may cross sides
+            path = findPath(x, base, bloom, True)
         else: # Else x is inner
             # Get the peaks of the bloom
             (leftPeak, rightPeak) = bloom.peaks
@@ -641,7 +1042,6 @@ def max_cardinality_matching( G ):
         
         base = v
         while nodeBloom[base] != None:
-            assert nodeBloom[base].base != base
             base = nodeBloom[base].base
         
         # Path compression:
@@ -653,18 +1053,85 @@ def max_cardinality_matching( G ):
         #    v = vNext
         return base
     
+    def check(condition, message, *args):
+        """ Raise an AssertionError with the message if condition fails. """
+        if not condition:
+            raise AssertionError(message % args)
+    
+    def checkPath(path):
+        """ Check that path is an augmenting path of the current matching.
+        
+        :param path - the path given as a list of vertices
+        """
+        
+        check(len( path ) % 2 == 0 and len( set( path ) ) == len( path ),
+              "augmenting path %r is odd or not simple", path)
+        check(path[0] not in mate and path[-1] not in mate,
+              "augmenting path %r does not join exposed vertices", path)
+        for k in xrange(len( path ) - 1):
+            check(path[k + 1] in neighborsOf( path[k] ),
+                  "augmenting path %r uses the non-edge %r", path, path[k : k + 2])
+            check(k % 2 == 0 or mate.get( path[k] ) == path[k + 1],
+                  "augmenting path %r does not alternate at %r", path, path[k])
+    
+    def checkMatching():
+        """ Check that the matching of the active vertices is symmetric. """
+        
+        for v in activeNodes:
+            if v in mate:
+                check(mate.get( mate[v] ) == v, "matching is not symmetric at %r", v)
+    
+    def checkPhase():
+        """ Check the level, predecessor and bloom invariants of a phase. """
+        
+        for v in activeNodes:
+            even, odd = nodeEvenLevel[v], nodeOddLevel[v]
+            check(nodeLevel[v] == min(even, odd), "level of %r is not cached", v)
+            check((even == INFINITY or even % 2 == 0) and
+                  (odd == INFINITY or odd % 2 == 1),
+                  "levels of %r have the wrong parity", v)
+            
+            # A predecessor is an even neighbor one level below, or the
+            # mate of an even vertex reached through its matched edge
+            adjacent = neighborsOf( v )
+            for p in predecessors( v ):
+                check(p in adjacent, "predecessor %r of %r is not a neighbor", p, v)
+                check(nodeEvenLevel[p] + 1 == odd or
+                      (mate.get( v ) == p and nodeOddLevel[p] + 1 == even) or
+                      nodeErase[v] == ERASED,
+                      "predecessor %r of %r is not one level below", p, v)
+            
+            # The chain of bloom bases from v must end outside any bloom
+            base, steps = v, 0
+            while nodeBloom[base] != None and steps <= len( activeNodes ):
+                base, steps = nodeBloom[base].base, steps + 1
+            check(nodeBloom[base] == None, "blooms of %r form a cycle", v)
+        
+        check(sum( predecessorCount[v] for v in activeNodes ) ==
+              sum( successorCount[v] for v in activeNodes ),
+              "predecessor and successor lists differ")
+    
     # Main loop: continue iteration until no further augmentation is possible.
     augmented = True
     while augmented:
+        
+        # Drop the components left with at most one exposed vertex
+        activeComponents = [ c for c in activeComponents if exposedCount[c] >= 2 ]
+        if not activeComponents:
+            break
+        if cancel is not None and cancel.is_set():
+            raise MatchingCancelled("matching cancelled between phases")
+        activeNodes = [ v for c in activeComponents for v in componentNodes[c] ]
     
         # Initialize/reset the nodes
-        for v in G.nodes_iter():
+        for v in activeNodes:
             nodeEvenLevel[v] = INFINITY
             nodeOddLevel[v] = INFINITY
+            nodeLevel[v] = INFINITY
             nodeBloom[v] = None
-            nodePredecessors[v] = [ ]
-            nodeSuccessors[v] = [ ]
-            nodeAnomalies[v] = [ ]
+            predecessorCount[v] = 0
+            anomalyCount[v] = 0
+            successorCount[v] = 0
             nodeCount[v] = 0
             nodeErase[v] = UNERASED
             nodeVisit[v] = UNVISITED
@@ -674,30 +1141,134 @@ def max_cardinality_matching( G ):
             # Path compression
             #nodeBaseStar[v] = None
         
+        # Initialize/reset the vertex sets of the dense backend
+        if dense:
+            unerasedSet.fill( True )
+            evenSet.fill( False )
+        
         # Initialize/reset the edges
-        for u, v, d in G.edges_iter( data=True ):
-            if u == v: continue # Ignore self-loops
-            d['use'] = UNUSED
-            d['visit'] = UNVISITED
+        usedEdges.clear()
+        visitedEdges.clear()
+        for lists in relationLists:
+            lists.clear()
             
         # Initialize/reset the candidates and bridges
-        for i in range( len( gnodes ) + 1 ):
-            candidates[i] = [ ]
-            bridges[i] = structures.OrderedSet()
+        candidates.clear()
+        bridges.clear()
         
         # Call the search subroutine
         augmented = search()
         
-        # Paranoia check that the matching is symmetric
-        for v in mate:
-            assert mate[ mate[v] ] == v
+        # Check the matching and the phase
+        if validate != 'off':
+            checkMatching()
+        if validate == 'full':
+            checkPhase()
+    
+    # Map the renumbered vertices back
+    if order is not None:
+        mate = dict( (order[v], order[w]) for v, w in mate.iteritems() )
+        G = original
+    
+    return packMate( G, mate, output )
+
+def connectedComponents( G, neighbors, keepVertex=None ):
+    """ Find the connected components of G.
+    
+    :param G - the graph given
+    :param neighbors - function returning the neighbors of a vertex
+    :param keepVertex - the vertex mask, or None to keep every vertex
+    :return components - the list of the vertices of each component
+    """
+    
+    seen = set()
+    components = [ ]
+    for root in G.nodes_iter():
+        if root in seen or (keepVertex is not None and not keepVertex[root]): continue
+        
+        # Search the component of root breadth first
+        seen.add( root )
+        nodes = [ root ]
+        for v in nodes:
+            for u in neighbors( v ):
+                if u not in seen:
+                    seen.add( u )
+                    nodes.append( u )
+        components.append( nodes )
+    return components
+
+def maskBytes( mask, size, name ):
+    """ Convert a mask into a bytearray of ones and zeros.
+    
+    :param mask - the sequence of booleans given, or None
+    :param size - the number of entries the mask must have
+    :param name - the name of the mask, for the error message
+    :return keep - the bytearray, or None if mask is None
+    """
+    
+    if mask is None:
+        return None
+    if len( mask ) != size:
+        raise ValueError("%s must have %d entries, not %d" % (name, size, len( mask )))
+    if numpy is not None:
+        return bytearray( numpy.asarray( mask, bool ).tostring() )
+    return bytearray( 1 if keep else 0 for keep in mask )
+
+def maskedNeighbors( G, keepVertex, keepEdge ):
+    """ Return the neighbor function of the subgraph kept by the masks.
     
-    # Delete edge attributes from graph G
-    for u, v, d in G.edges_iter( data=True ):
-        if u == v: continue # Ignore self-loops
-        del d['use']
-        del d['visit']
+    :param G - the compact graph given
+    :param keepVertex - the vertex mask as a bytearray, or None
+    :param keepEdge - the edge mask as a bytearray, or None
+    :return neighbors - function returning the list of kept neighbors
+    """
+    
+    if keepVertex is None and keepEdge is None:
+        return G.neighbors
+    if keepEdge is None:
+        return lambda v: [ u for u in G.neighbors( v ) if keepVertex[u] ]
+    
+    offsets = G.offsets
+    if keepVertex is None:
+        return lambda v: [ u for k, u in enumerate( G.neighbors( v ), int( offsets[v] ) )
+                           if keepEdge[k] ]
+    return lambda v: [ u for k, u in enumerate( G.neighbors( v ), int( offsets[v] ) )
+                       if keepEdge[k] and keepVertex[u] ]
+
+def isDense( G ):
+    """ Decide whether the dense backend should match G.
+    
+    :param G - the graph given
+    :return bool - True if the edge density of G is at least DENSE_DENSITY
+        and its adjacency matrix takes at most DENSE_MAX_BYTES
+    """
+    
+    n = len( G )
+    if numpy is None or n < 2 or n * n > DENSE_MAX_BYTES:
+        return False
+    if isinstance(G, structures.ImplicitGraph):
+        return False # The number of edges is not known
+    return 2.0 * G.number_of_edges() / (n * (n - 1)) >= DENSE_DENSITY
+
+def packMate( G, mate, output ):
+    """ Return a mate dictionary in the requested output form.
+    
+    :param G - the graph matched
+    :param mate - the dictionary of matched vertices
+    :param output - the form of the result, 'dict', 'array' or 'compact'
+    :return mate - the matching in the requested form
+    """
+    
+    if output == 'dict':
+        
+        # Translate the vertices of a compact graph back to their labels
+        if isinstance(G, (structures.CompactGraph, structures.ImplicitGraph)) and G.labels is not None:
+            mate = dict( (G.labels[v], G.labels[w]) for v, w in mate.iteritems() )
+        return mate
     
-    return mate
+    # The array is filled from the dictionary of the phases, which is only
+    # freed once the result is returned
+    result = structures.MateArray.from_dict( mate, len( G ), G.labels )
+    return result.mate if output == 'array' else result
 
 #end
\ No newline at end of file
@@ -0,0 +1,470 @@
+#!/usr/bin/env python
+
+"""
+Non-blocking matching for event-driven services.
+
+This module implements amatch and MatchingExecutor, which run
+max_cardinality_matching in a pool of worker threads or processes and hand
+back a MatchingFuture at once, so the thread of an event loop never waits
+for a matching. The future calls its done callbacks from a pool thread
+when the matching is ready; an event loop passes them back to itself with
+its thread-safe call, for example IOLoop.add_callback or
+reactor.callFromThread.
+
+Every executor admits at most concurrency matchings at a time, guarded by a
+semaphore. Further requests wait in a queue, which costs them no CPU, so a
+burst of requests cannot oversubscribe the host. Each admitted matching
+owns one slot of a flag array shared with the workers, and the phases poll
+their flag through the cancel event of max_cardinality_matching. Cancelling
+a future clears a waiting request from the queue and stops a running
+matching within one level of its search.
+
+A thread of the executor waits for each admitted matching and completes
+its future whatever the outcome, so a graph that cannot be pickled, a
+result that cannot be sent back or a worker process that dies fails the
+future and frees its slot instead of holding it forever. A process pool
+left unable to hand out tasks by the death of a worker is replaced.
+
+:filename offload.py
+"""
+
+__all__ = [ 'amatch', 'MatchingExecutor', 'MatchingFuture', 'WORKERS', 'KINDS' ]
+
+# Necessary imports
+import collections
+import logging
+import multiprocessing
+import multiprocessing.pool
+import os
+import threading
+
+from matching import max_cardinality_matching, MatchingCancelled
+
+# Default number of workers, and the kinds of pool they may run in
+WORKERS = multiprocessing.cpu_count()
+KINDS = [ 'thread', 'process' ]
+
+# Seconds between the checks that the worker process of a matching lives
+WATCH = 0.5
+
+logger = logging.getLogger( __name__ )
+
+# Flags, tickets and owner process IDs of the pool a worker process
+# belongs to
+workerFlags = None
+workerTickets = None
+workerOwners = None
+
+# Executor used by amatch when none is given
+defaultExecutor = None
+defaultLock = threading.Lock()
+
+def amatch( G, executor=None, **options ):
+    """Start a maximum cardinality matching of G without waiting for it.
+
+    :param G - the graph given, as for max_cardinality_matching
+
+    :param executor - the MatchingExecutor to run in (default None)
+        If None, a thread executor with WORKERS workers, created on the
+        first call and shared by all later ones.
+
+    :param options - the keyword arguments of max_cardinality_matching,
+        other than cancel
+
+    :return future - the MatchingFuture of the matching
+    """
+
+    global defaultExecutor
+    if executor is None:
+        with defaultLock:
+            if defaultExecutor is None:
+                defaultExecutor = MatchingExecutor()
+        executor = defaultExecutor
+    return executor.submit( G, **options )
+
+class SlotEvent(object):
+    """ Cancel event of a matching, read from its slot of a flag array. """
+
+    __slots__ = [ 'flags', 'slot' ]
+
+    def __init__(self, flags, slot):
+        self.flags = flags
+        self.slot = slot
+
+    def is_set(self):
+        return self.flags[self.slot] != 0
+
+def setWorkerFlags(flags, tickets, owners):
+    """ Keep the shared arrays of the pool, in each worker process. """
+    global workerFlags, workerTickets, workerOwners
+    workerFlags = flags
+    workerTickets = tickets
+    workerOwners = owners
+
+def runMatching(G, flags, slot, ticket, options):
+    """ Match G in a worker and return the outcome instead of raising it.
+
+    :param G - the graph given
+    :param flags - the flag array, or None in a worker process
+    :param slot - the slot of the flag array polled for cancellation
+    :param ticket - the ticket of the slot the matching was admitted with
+    :param options - the keyword arguments of max_cardinality_matching
+    :return (ok, value) - True and the matching, or False and the exception
+    """
+
+    if flags is None:
+        if workerTickets[slot] != ticket:
+            # The executor gave the matching up, and may have reused its slot
+            return False, MatchingCancelled("matching dropped by its executor")
+        flags = workerFlags
+        workerOwners[slot] = os.getpid()
+    try:
+        return True, max_cardinality_matching(G, cancel=SlotEvent(flags, slot), **options)
+    except Exception as error:
+        return False, error
+
+class MatchingFuture(object):
+    """ The pending result of a matching started by a MatchingExecutor.
+
+    A future is pending while its request waits, running once it is
+    admitted, and done when the matching is found, fails or is cancelled.
+    """
+
+    __slots__ = [ 'executor', 'slot', 'state', 'value', 'error', 'callbacks', 'condition' ]
+
+    PENDING, RUNNING, DONE = 0, 1, 2
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.slot = None
+        self.state = MatchingFuture.PENDING
+        self.value = None
+        self.error = None
+        self.callbacks = [ ]
+        self.condition = threading.Condition()
+
+    def running(self):
+        """ Return True if the matching is in progress. """
+        return self.state == MatchingFuture.RUNNING
+
+    def done(self):
+        """ Return True if the matching is found, failed or cancelled. """
+        return self.state == MatchingFuture.DONE
+
+    def cancelled(self):
+        """ Return True if the matching was cancelled. """
+        return self.done() and isinstance(self.error, MatchingCancelled)
+
+    def cancel(self):
+        """ Cancel the matching, unless it is done already.
+
+        A waiting request is removed at once. A running matching stops at
+        the next level of its search, and the future is done only then,
+        unless the matching was found first.
+
+        :return cancelling - False if the future was already done
+        """
+        return self.executor.cancelFuture( self )
+
+    def wait(self, timeout=None):
+        """ Wait until the future is done.
+
+        :param timeout - the seconds to wait at most (default None, no limit)
+        :return done - True if the future is done
+        """
+
+        with self.condition:
+            if not self.done():
+                self.condition.wait( timeout )
+        return self.done()
+
+    def result(self):
+        """ Wait for the matching and return it.
+
+        :return mate - the matching, in the requested output form
+        The exception of a failed matching is raised instead, and
+        MatchingCancelled for a cancelled one.
+        """
+
+        while not self.wait( 1.0 ): # Waiting in steps keeps KeyboardInterrupt
+            pass
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def add_done_callback(self, callback):
+        """ Call callback with the future once it is done.
+
+        The callback is called at once if the future is done already, and
+        otherwise from a thread of the executor.
+        """
+
+        with self.condition:
+            if not self.done():
+                self.callbacks.append( callback )
+                return
+        callback( self )
+
+    def finish(self, value, error):
+        """ Store the outcome, wake the waiting threads and call the callbacks. """
+
+        with self.condition:
+            self.value = value
+            self.error = error
+            self.state = MatchingFuture.DONE
+            callbacks, self.callbacks = self.callbacks, [ ]
+            self.condition.notify_all()
+        for callback in callbacks:
+            try:
+                callback( self )
+            except Exception:
+                # A failing callback must not stop the pool thread calling it
+                logger.exception("callback of a matching future failed")
+
+class MatchingExecutor(object):
+    """ Pool of workers running matchings, at most concurrency at a time.
+
+    Thread workers share the graphs with the caller, and the interpreter
+    switches between them and the event loop, but they take turns on one
+    core under the global interpreter lock. Process workers match in parallel,
+    receiving every graph pickled; a graph loaded by structures.load_graph
+    is sent as its path and mapped by the worker.
+    """
+
+    __slots__ = [ 'kind', 'workers', 'pool', 'flags', 'tickets', 'owners', 'issued', 'lost',
+                  'semaphore', 'free', 'queue', 'lock', 'closed' ]
+
+    def __init__(self, workers=WORKERS, kind='thread', concurrency=None):
+        """ Create an executor and start its workers.
+
+        :param workers - the number of workers (default WORKERS)
+        :param kind - 'thread' or 'process' (default 'thread')
+        :param concurrency - the most matchings admitted at a time
+            (default None, as many as workers)
+        """
+
+        if kind not in KINDS:
+            raise ValueError("unknown executor kind %r" % (kind,))
+        if workers < 1:
+            raise ValueError("at least one worker is required")
+        if concurrency is None:
+            concurrency = workers
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.kind = kind
+        self.workers = workers
+        self.flags = multiprocessing.RawArray( 'b', concurrency )
+        self.tickets = multiprocessing.RawArray( 'l', concurrency )
+        self.owners = multiprocessing.RawArray( 'l', concurrency )
+        self.issued = 0
+        self.lost = set()
+        self.pool = self.startPool()
+        self.semaphore = threading.BoundedSemaphore( concurrency )
+        self.free = range( concurrency )
+        self.queue = collections.deque()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def startPool(self):
+        """ Start a pool of the workers of the executor. """
+        if self.kind == 'thread':
+            return multiprocessing.pool.ThreadPool( self.workers )
+        return multiprocessing.Pool( self.workers, setWorkerFlags,
+                                     (self.flags, self.tickets, self.owners) )
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, G, **options):
+        """ Queue a matching of G and return its future.
+
+        :param G - the graph given, as for max_cardinality_matching
+        :param options - the keyword arguments of max_cardinality_matching,
+            other than cancel
+        :return future - the MatchingFuture of the matching
+        """
+
+        if 'cancel' in options:
+            raise ValueError("the executor sets the cancel event itself")
+        future = MatchingFuture( self )
+        with self.lock:
+            if self.closed:
+                raise ValueError("the executor is closed")
+            self.queue.append( (future, G, options) )
+        self.dispatch()
+        return future
+
+    def dispatch(self):
+        """ Admit waiting requests while the semaphore allows. """
+
+        while True:
+            with self.lock:
+                if not self.queue or not self.semaphore.acquire( False ):
+                    return
+                future, G, options = self.queue.popleft()
+                future.slot = slot = self.free.pop()
+                future.state = MatchingFuture.RUNNING
+                self.issued += 1
+                self.flags[slot] = 0
+                self.tickets[slot] = ticket = self.issued
+                self.owners[slot] = 0
+                pool = self.pool
+
+            flags = self.flags if self.kind == 'thread' else None
+            workers = self.poolWorkers( pool ) if self.kind == 'process' else None
+            try:
+                pending = pool.apply_async( runMatching, (G, flags, slot, ticket, options) )
+            except Exception as error:
+                self.complete( future, (False, error) )
+                continue
+            watcher = threading.Thread( target=self.watch, args=(future, pool, pending, workers) )
+            watcher.daemon = True
+            watcher.start()
+
+    def watch(self, future, pool, pending, workers):
+        """ Wait for the outcome of a matching in the pool and complete its future.
+
+        The pool reports a graph it failed to pickle, or a result it failed
+        to send back, as a failed outcome without calling any callback. A
+        matching lost with its worker process has no outcome at all, so it
+        is failed here once the worker that started it is gone.
+
+        A worker gone without having started a matching died waiting for a
+        task or receiving one, holding the lock of the task queue, so no
+        worker of its pool receives a task again. Such a death is noticed
+        through the workers alive when each matching was dispatched, not
+        through the process ID a matching records once started, since the
+        worker may die unpickling it. The pool is then replaced, and the
+        matchings left in it fail.
+
+        :param future - the MatchingFuture of the matching
+        :param pool - the pool running the matching
+        :param pending - the AsyncResult of the matching in the pool
+        :param workers - the set of the process IDs of the workers alive
+            when the matching was dispatched, or None for a thread pool
+        """
+
+        slot = future.slot
+        outcome = None
+        while outcome is None and not pending.ready():
+            pending.wait( WATCH )
+            if workers is None or pending.ready():
+                continue
+            owner = self.owners[slot]
+            alive = self.poolWorkers( pool )
+            if owner and owner not in alive:
+                with self.lock:
+                    self.lost.add( owner )
+                reason = "worker process %d died during the matching" % owner
+            elif not owner and not workers <= alive and self.replacePool( pool, workers - alive ):
+                reason = "a worker process died before the matching started"
+            else:
+                continue
+            self.tickets[slot] = 0 # The matching must not start any more
+            self.poolWorkers( pool, [ pending ] )
+            outcome = False, multiprocessing.ProcessError( reason )
+        if outcome is None:
+            try:
+                outcome = pending.get()
+            except Exception as error:
+                outcome = False, error
+        self.complete( future, outcome )
+
+    def replacePool(self, pool, dead):
+        """ Replace a pool that lost a worker holding its task queue.
+
+        :param pool - the pool the workers belonged to
+        :param dead - the set of the process IDs of the workers gone
+        :return replaced - True if the pool was given up, now or before
+        """
+
+        with self.lock:
+            if self.pool is not pool:
+                return True
+            # Workers that died running a matching held no lock
+            if dead <= self.lost.union( self.owners ):
+                return False
+            if not self.closed:
+                self.pool = self.startPool()
+        pool.close()
+        self.poolWorkers( pool, stop=True )
+        return True
+
+    def poolWorkers(self, pool, lost=(), stop=False):
+        """ Return the process IDs of the live workers of a process pool.
+
+        :param pool - the multiprocessing.Pool
+        :param lost - the AsyncResults of the tasks lost with their worker,
+            dropped from the pool first (default ())
+        :param stop - whether to drop every task of the pool and kill its
+            workers first (default False)
+        :return workers - the set of the process IDs
+
+        :notes
+        The pool of Python 2.7 does not notice a worker process that dies.
+        A task lost with its worker stays in the pending tasks of the pool
+        forever, so its AsyncResult is never ready and pool.join waits for
+        it. A worker that dies while waiting for a task or receiving one
+        keeps the lock of the task queue, so no other worker receives a
+        task again and pool.terminate waits for the lock forever. This is
+        the only method reading the private state of a pool, its worker
+        processes in pool._pool and its pending tasks in pool._cache, keyed
+        by AsyncResult._job.
+        """
+
+        if stop:
+            pool._cache.clear()
+            for process in list( pool._pool ):
+                process.terminate()
+                process.join()
+        for task in lost:
+            pool._cache.pop( task._job, None )
+        return set( process.pid for process in list( pool._pool ) if process.exitcode is None )
+
+    def complete(self, future, outcome):
+        """ Release the slot of a finished matching and admit the next request. """
+
+        with self.lock:
+            self.free.append( future.slot )
+            future.slot = None # The slot may be reused before the future is done
+            self.semaphore.release()
+        ok, value = outcome
+        if ok:
+            future.finish( value, None )
+        else:
+            future.finish( None, value )
+        self.dispatch()
+
+    def cancelFuture(self, future):
+        """ Cancel a future of this executor, as MatchingFuture.cancel. """
+
+        with self.lock:
+            if future.state == MatchingFuture.RUNNING:
+                if future.slot is None:
+                    return False
+                self.flags[future.slot] = 1
+                return True
+            if future.state == MatchingFuture.DONE:
+                return False
+            self.queue = collections.deque( entry for entry in self.queue if entry[0] is not future )
+        future.finish( None, MatchingCancelled("matching cancelled before it started") )
+        return True
+
+    def close(self):
+        """ Cancel every request and stop the workers once they are idle. """
+
+        with self.lock:
+            self.closed = True
+            waiting = [ entry[0] for entry in self.queue ]
+            for slot in xrange( len( self.flags ) ):
+                self.flags[slot] = 1
+        for future in waiting:
+            self.cancelFuture( future )
+        self.pool.close()
+        self.pool.join()
+
+#end
\ No newline at end of file
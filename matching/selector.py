@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+
+"""
+Engine selection for maximum cardinality matching.
+
+This module implements maximum_matching, a front door over
+max_cardinality_matching. It first computes cheap statistics of the graph
+in a single breadth-first pass: the number of nodes and edges, the density,
+the maximum degree, the connected components and whether each of them is
+bipartite. Each component is then matched by the engine that suits it:
+
+    closed_form     components of a family recognized by closed_form,
+                    whose matching is built without a search
+    hopcroft_karp   bipartite components
+    greedy          large components, matched greedily first and then
+                    finished by the Micali-Vazirani phases
+    mv              the remaining components, matched by the
+                    Micali-Vazirani algorithm from scratch
+
+Every engine returns a maximum matching of its component. The greedy
+engine is therefore a warm start, not an approximation: its greedy matching
+is finished by the full phase loop, as a few bounded augmentation passes
+(max_length of max_cardinality_matching) would leave the result short of
+maximum. The size limits used by the selection are kept in THRESHOLDS, so
+they can be tuned from the measurements of the benchmark driver in the test
+directory, which measures the crossovers against component size only.
+
+The density and the maximum degree are reported but do not steer the
+selection. These whole-graph figures say little about a single component.
+The choice density would drive, the dense backend, is already made per
+component by max_cardinality_matching from the density of that component.
+
+Like max_cardinality_matching, maximum_matching only reads the graph and
+can be called from several threads at once, each passing its own report.
+
+:filename selector.py
+"""
+
+__all__ = [ 'maximum_matching', 'closed_form_matching', 'graph_statistics',
+            'THRESHOLDS' ]
+
+# Necessary imports
+import array
+import collections
+import time
+
+import closed_form
+import structures
+from matching import max_cardinality_matching, packMate
+
+# Component size limits used to select the engines. Bipartite components of
+# at least hopcroft_karp_min_nodes vertices use Hopcroft-Karp, and other
+# components of at least greedy_min_nodes vertices get a greedy start. The
+# values are those suggested by test/benchmark_driver.py.
+THRESHOLDS = {
+    'hopcroft_karp_min_nodes' : 8,
+    'greedy_min_nodes' : 8,
+}
+
+def maximum_matching( G, output='dict', thresholds=None, report=None ):
+    """Compute a maximum cardinality matching, choosing the engine per component.
+
+    :param G - the graph given
+        Any graph accepted by max_cardinality_matching.
+
+    :param output - the form of the result (default 'dict')
+        Either 'dict', 'array' or 'compact', as for
+        max_cardinality_matching.
+
+    :param thresholds - overrides for THRESHOLDS (default None)
+
+    :param report - a dictionary to fill in (default None)
+        If given, report['statistics'] is set to the graph statistics,
+        report['engines'] counts the components matched by each engine,
+        report['families'] counts the components matched in closed form
+        by family and report['time'] holds the seconds spent in each
+        engine, including the recognition of the component.
+
+    :return mate - the maximum matching, in the requested output form
+    """
+
+    checkOutput( G, output )
+    limits = dict( THRESHOLDS )
+    limits.update( thresholds or { } )
+
+    G = compileGraph( G )
+    statistics, components, color = graphStatistics( G )
+
+    engines = collections.Counter()
+    families = collections.Counter()
+    seconds = collections.defaultdict( float )
+    mate = { }
+
+    for vertices, bipartite in components:
+        start = time.time()
+
+        # Match recognized families directly, otherwise select an engine
+        family, pairs = closed_form.recognize(G, vertices, bipartite, color)
+        size = len( vertices )
+        if pairs is not None:
+            engine = 'closed_form'
+            families[family] += 1
+            addPairs(mate, pairs)
+        elif bipartite and size >= limits['hopcroft_karp_min_nodes']:
+            engine = 'hopcroft_karp'
+            hopcroftKarp(G, vertices, color, mate)
+        else:
+            engine = 'greedy' if size >= limits['greedy_min_nodes'] else 'mv'
+            mvEngine(G, vertices, len( components ) == 1, engine == 'greedy', mate)
+
+        seconds[engine] += time.time() - start
+        engines[engine] += 1
+
+    if report is not None:
+        report['statistics'] = statistics
+        report['engines'] = dict( engines )
+        report['families'] = dict( families )
+        report['time'] = dict( seconds )
+
+    return packMate( G, mate, output )
+
+def closed_form_matching( G, output='dict' ):
+    """ Compute a maximum matching of a graph of recognized families.
+
+    Each connected component of G must belong to one of the families in
+    closed_form.FAMILIES, and its matching is built without a search.
+
+    :param G - the graph given
+        Any graph accepted by max_cardinality_matching.
+
+    :param output - the form of the result (default 'dict')
+        Either 'dict', 'array' or 'compact', as for
+        max_cardinality_matching.
+
+    :return mate - the maximum matching in the requested output form, or
+        None if some component of G is not recognized
+    """
+
+    checkOutput( G, output )
+    G = compileGraph( G )
+    components, color = graphStatistics( G )[1:]
+
+    mate = { }
+    for vertices, bipartite in components:
+        pairs = closed_form.recognize(G, vertices, bipartite, color)[1]
+        if pairs is None:
+            return None
+        addPairs(mate, pairs)
+
+    return packMate( G, mate, output )
+
+def checkOutput( G, output ):
+    """ Reject the output forms max_cardinality_matching rejects for G. """
+
+    if output not in ('dict', 'array', 'compact'):
+        raise ValueError("unknown output %r" % (output,))
+    if output == 'array' and hasattr(G, 'neighbors_iter') and not isinstance(G, (structures.CompactGraph, structures.ImplicitGraph)):
+        raise ValueError("array output requires a CompactGraph, "
+                         "use output='compact' for NetworkX graphs")
+
+def compileGraph( G ):
+    """ Compile G into a compact graph, all engines work on vertex IDs. """
+
+    if not hasattr(G, 'neighbors_iter'):
+        return structures.CompactGraph.from_array( G )
+    if not isinstance(G, structures.CompactGraph):
+        return structures.CompactGraph.from_networkx( G )
+    return G
+
+def addPairs( mate, pairs ):
+    """ Add the matched pairs to the mate dictionary. """
+
+    for v, w in pairs:
+        mate[v] = w
+        mate[w] = v
+
+def graph_statistics( G ):
+    """ Compute the statistics used to select the matching engines.
+
+    :param G - the graph given
+    :return statistics - dictionary with the number of nodes 'n', the
+        number of edges 'm', the 'density', the 'max_degree', whether the
+        graph is 'bipartite', and the 'component_sizes' as a dictionary
+        from size to the number of components of that size
+    """
+
+    return graphStatistics( compileGraph( G ) )[0]
+
+def graphStatistics( G ):
+    """ Compute the statistics, the components and a two-coloring of G.
+
+    A breadth-first search labels the components and tries to two-color
+    each of them. The coloring is valid within every bipartite component.
+
+    :param G - the compact graph given
+    :return (statistics, components, color) - the statistics dictionary, a
+        list of (vertices, bipartite) pairs and the color of each vertex
+    """
+
+    n = len( G )
+    color = array.array( 'b', [-1] ) * n
+    components = [ ]
+    maxDegree = 0
+
+    for root in xrange( n ):
+        if color[root] != -1: continue
+
+        # Search the component of root, coloring the vertices alternately
+        color[root] = 0
+        vertices = [root]
+        bipartite = True
+        k = 0
+        while k < len( vertices ):
+            v = vertices[k]
+            neighbors = G.neighbors( v )
+            maxDegree = max( maxDegree, len( neighbors ) )
+            for u in neighbors:
+                if color[u] == -1:
+                    color[u] = 1 - color[v]
+                    vertices.append( u )
+                elif color[u] == color[v]:
+                    bipartite = False # Odd cycle or self-loop
+            k += 1
+        components.append( (vertices, bipartite) )
+
+    m = G.number_of_edges()
+    statistics = {
+        'n' : n,
+        'm' : m,
+        'density' : 2.0 * m / (n * (n - 1)) if n > 1 else 0.0,
+        'max_degree' : maxDegree,
+        'bipartite' : all( bipartite for _, bipartite in components ),
+        'component_sizes' : dict( collections.Counter(
+                                len( vertices ) for vertices, _ in components ) ),
+    }
+    return statistics, components, color
+
+def hopcroftKarp( G, vertices, color, mate ):
+    """ Match a bipartite component with the Hopcroft-Karp algorithm.
+
+    Each phase layers the graph by a breadth-first search from the exposed
+    vertices of color 0 and then augments along vertex-disjoint paths found
+    by depth-first searches through the layers.
+
+    :param G - the compact graph given
+    :param vertices - the vertices of the component
+    :param color - the two-coloring of the component
+    :param mate - the mate dictionary to add the matching to
+    """
+
+    left = [ v for v in vertices if color[v] == 0 ]
+
+    while True:
+
+        # Layer the left vertices by their distance from an exposed one
+        distance = dict( (v, 0) for v in left if v not in mate )
+        queue = collections.deque( distance )
+        found = False
+        while queue:
+            v = queue.popleft()
+            for u in G.neighbors( v ):
+                w = mate.get( u )
+                if w is None:
+                    found = True
+                elif w not in distance:
+                    distance[w] = distance[v] + 1
+                    queue.append( w )
+
+        if not found:
+            break # No augmenting path is left
+
+        # Augment along the layers from each exposed left vertex
+        for root in left:
+            if root in mate: continue
+
+            stack = [root] # Left vertices of the current path
+            via = [ ] # Right vertices between them
+            neighbors = [ iter( G.neighbors( root ) ) ]
+            while stack:
+                v = stack[-1]
+                for u in neighbors[-1]:
+                    w = mate.get( u )
+                    if w is None or distance.get( w ) == distance[v] + 1:
+                        break
+                else:
+                    # Dead end, remove v from the layers and backtrack
+                    distance[v] = None
+                    stack.pop()
+                    neighbors.pop()
+                    if via: via.pop()
+                    continue
+
+                via.append( u )
+                if w is None:
+                    # Augment the matching along the path
+                    for a, b in zip( stack, via ):
+                        mate[a] = b
+                        mate[b] = a
+                    break
+                stack.append( w )
+                neighbors.append( iter( G.neighbors( w ) ) )
+
+def mvEngine( G, vertices, whole, greedy, mate ):
+    """ Match a component with the Micali-Vazirani algorithm.
+
+    :param G - the compact graph given
+    :param vertices - the vertices of the component
+    :param whole - True if the component is all of G
+    :param greedy - start from a greedy matching
+    :param mate - the mate dictionary to add the matching to
+    """
+
+    # Compile the component, labeled by the vertices of G
+    if whole:
+        C = structures.CompactGraph(G.offsets, G.targets, None, G.m)
+    else:
+        index = dict( (v, k) for k, v in enumerate( vertices ) )
+        offsets = array.array( 'l', [0] )
+        targets = array.array( 'l' )
+        for v in vertices:
+            targets.extend( index[u] for u in G.neighbors( v ) )
+            offsets.append( len( targets ) )
+        C = structures.CompactGraph(offsets, targets, vertices)
+
+    initial = greedyMatching( C ) if greedy else None
+    result = max_cardinality_matching(C, initial=initial)
+    mate.update( result )
+
+def greedyMatching( G ):
+    """ Compute a maximal matching greedily.
+
+    The vertices are visited by increasing degree and each exposed vertex is
+    matched to its first exposed neighbor, which leaves few exposed vertices
+    on sparse graphs.
+
+    :param G - the compact graph given
+    :return mate - the mate dictionary of vertex IDs
+    """
+
+    mate = { }
+    for v in sorted( xrange( len( G ) ), key=G.degree ):
+        if v in mate: continue
+        for u in G.neighbors( v ):
+            if u != v and u not in mate:
+                mate[v] = u
+                mate[u] = v
+                break
+    return mate
+
+#end
\ No newline at end of file
@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+
+"""
+Semi-streaming matching of edge files larger than memory.
+
+This module implements stream_matching, which matches a graph read as a
+stream of edges, for example from an edge file too large to load. Only
+O(n) state is kept for the n vertices, never the edges: the index and mate
+of every vertex and, during a pass, two exposed neighbors recorded for
+each matched vertex.
+
+The first pass builds a maximal matching greedily, which has at least half
+the maximum size. Every further pass augments it along augmenting paths
+of length 3, an exposed vertex, a matched edge and another exposed vertex.
+Each matched vertex records up to two of its exposed neighbors while the
+edges stream by, and the matched edges whose end points recorded distinct
+exposed neighbors form, with the recorded edges, a subgraph of O(n) edges.
+max_cardinality_matching matches this subgraph warm started from the
+current matching, which picks a largest set of disjoint augmenting paths
+among the recorded edges.
+
+The passes also bound the maximum matching. The symmetric difference of
+a maximal matching M and a maximum matching consists of augmenting paths,
+of which those of length 3 each need one of the A matched edges with
+distinct exposed neighbors, and the longer ones at least two matched edges
+each. Every path also ends in two of the F exposed vertices with a matched
+neighbor. The maximum matching therefore has at most (3 |M| + A) / 2 and
+at most |M| + F / 2 edges, and the guarantee reported is the ratio of the
+matching found to the smallest such bound of all passes. It reaches 2/3
+as soon as a pass finds no augmenting path of length 3, where the passes
+end.
+
+:filename streaming.py
+"""
+
+__all__ = [ 'stream_matching', 'PASSES' ]
+
+# Necessary imports
+import array
+
+import structures
+from matching import max_cardinality_matching
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Default number of passes over the stream, the first one included
+PASSES = 4
+
+def stream_matching( source, passes=PASSES, nodetype=int, output='dict', report=None ):
+    """Compute a large matching of a graph read as a stream of edges.
+
+    :param source - the edges of the graph
+        Either the path of an edge file or a function returning an
+        iterable of (u, v) pairs. An edge file holds one edge per line,
+        given by its two end points separated by white space. Further
+        fields, blank lines and comments starting with '#' are skipped.
+        The function is called once per pass and must return the same
+        edges each time, in any order.
+
+    :param passes - the largest number of passes (default PASSES)
+        The first pass builds a maximal matching and every further pass
+        augments it. The passes end early once no augmenting path of
+        length 3 is left.
+
+    :param nodetype - the type of the vertices of an edge file (default int)
+        Each end point read from the file is converted by this function.
+
+    :param output - the form of the result (default 'dict')
+        Either 'dict', 'array' or 'compact', as for
+        max_cardinality_matching. The array and compact forms are indexed
+        by the order in which the vertices first occur in the stream.
+
+    :param report - a dictionary to fill in (default None)
+        If given, report['passes'] is set to the number of passes made,
+        report['edges'] to the number of edges in one pass,
+        report['bound'] to an upper bound on the size of a maximum
+        matching and report['guarantee'] to the ratio of the size of the
+        matching found to that bound.
+
+    :return mate - the matching, in the requested output form
+
+    :notes
+    Each pass takes time O(m), and the matching of the subgraph of
+    recorded edges takes time O(n sqrt(n)).
+    """
+
+    if passes < 1:
+        raise ValueError("at least one pass is required")
+    if output not in ('dict', 'array', 'compact'):
+        raise ValueError("unknown output %r" % (output,))
+    if not isinstance(source, basestring) and not callable( source ):
+        raise TypeError("source must be a path or a function")
+
+    # First pass: index the vertices and match greedily
+    index = { }
+    labels = [ ]
+    mate = array.array( 'l' )
+    edgeCount = 0
+    for u, v in streamEdges( source, nodetype ):
+        edgeCount += 1
+        i = index.get( u )
+        if i is None:
+            i = index[u] = len( labels )
+            labels.append( u )
+            mate.append( -1 )
+        j = index.get( v )
+        if j is None:
+            j = index[v] = len( labels )
+            labels.append( v )
+            mate.append( -1 )
+        if i != j and mate[i] < 0 and mate[j] < 0:
+            mate[i] = j
+            mate[j] = i
+
+    # A maximal matching has at least half the maximum size
+    n = len( labels )
+    size = ( n - mate.count( -1 ) ) / 2
+    bound = 2 * size
+
+    # Further passes: augment along the recorded paths of length 3
+    passCount = 1
+    while passCount < passes and bound > size:
+        passCount += 1
+        first, second, exposed = recordNeighbors( source, nodetype, index, mate )
+        augmentable, gained = augmentPaths( mate, first, second )
+        bound = min( bound, (3 * size + augmentable) / 2, size + exposed / 2 )
+        size += gained
+        if augmentable == 0:
+            break
+
+    if report is not None:
+        report['passes'] = passCount
+        report['edges'] = edgeCount
+        report['bound'] = bound
+        report['guarantee'] = float( size ) / bound if bound else 1.0
+
+    if output == 'dict':
+        return dict( (labels[v], labels[w]) for v, w in enumerate( mate ) if w >= 0 )
+    if numpy is not None:
+        mate = numpy.array( mate, numpy.int64 )
+    result = structures.MateArray(mate, labels)
+    return result.mate if output == 'array' else result
+
+def streamEdges( source, nodetype ):
+    """ Return an iterator over the edges of source for one pass.
+
+    :param source - the path of an edge file or a function returning edges
+    :param nodetype - the type of the vertices of an edge file
+    :return edges - the iterator of (u, v) pairs
+    """
+
+    if not isinstance(source, basestring):
+        return iter( source() )
+
+    def fileEdges():
+        with open(source) as f:
+            for line in f:
+                fields = line.split('#', 1)[0].split()
+                if len( fields ) >= 2:
+                    yield nodetype( fields[0] ), nodetype( fields[1] )
+    return fileEdges()
+
+def recordNeighbors( source, nodetype, index, mate ):
+    """ Record up to two exposed neighbors of each matched vertex in a pass.
+
+    Two distinct neighbors are kept whenever a vertex has two. A recorded
+    second neighbor is replaced by one recorded for fewer vertices, so
+    that the recorded edges spread over the exposed vertices.
+
+    :param source - the edges of the graph, as for stream_matching
+    :param nodetype - the type of the vertices of an edge file
+    :param index - the dictionary of vertex IDs
+    :param mate - the mate array of the maximal matching
+    :return (first, second, exposed) - the arrays of the recorded
+        neighbors, -1 where none was recorded, and the number of exposed
+        vertices with a matched neighbor
+    """
+
+    n = len( mate )
+    first = array.array( 'l', [-1] ) * n
+    second = array.array( 'l', [-1] ) * n
+    claims = array.array( 'l', [0] ) * n
+    seen = bytearray( n )
+    exposed = 0
+    for u, v in streamEdges( source, nodetype ):
+        try:
+            i, j = index[u], index[v]
+        except KeyError:
+            raise ValueError("the edges changed between passes")
+
+        # Orient the edge from its matched end to its exposed end
+        if mate[i] < 0:
+            if mate[j] < 0:
+                if i != j:
+                    raise ValueError("the edges changed between passes")
+                continue
+            i, j = j, i
+        elif mate[j] >= 0:
+            continue
+        if not seen[j]:
+            seen[j] = 1
+            exposed += 1
+
+        if first[i] < 0:
+            first[i] = j
+        elif first[i] != j and second[i] != j:
+            if second[i] >= 0:
+                if claims[second[i]] <= claims[j]:
+                    continue
+                claims[second[i]] -= 1
+            second[i] = j
+        else:
+            continue
+        claims[j] += 1
+    return first, second, exposed
+
+def augmentPaths( mate, first, second ):
+    """ Augment mate along disjoint paths of recorded edges.
+
+    :param mate - the mate array, augmented in place
+    :param first - the first recorded exposed neighbor of each vertex
+    :param second - the second recorded exposed neighbor of each vertex
+    :return (augmentable, gained) - the number of matched edges whose end
+        points recorded distinct exposed neighbors, and the number of
+        edges the matching gained
+    """
+
+    # Collect the matched edges that start an augmenting path of length 3
+    index = { }
+    pairs = [ ]
+    initial = { }
+    augmentable = 0
+    for a in xrange( len( mate ) ):
+        b = mate[a]
+        if b < a or first[a] < 0 or first[b] < 0:
+            continue
+        if first[a] == first[b] and second[a] < 0 and second[b] < 0:
+            continue
+        augmentable += 1
+        for v in (a, b):
+            for w in (mate[v], first[v], second[v]):
+                if w >= 0:
+                    pairs.append( (index.setdefault( v, len( index ) ),
+                                   index.setdefault( w, len( index ) )) )
+        initial[index[a]] = index[b]
+        initial[index[b]] = index[a]
+    if augmentable == 0:
+        return 0, 0
+
+    # Match the subgraph of the recorded edges, starting from mate
+    vertices = [ None ] * len( index )
+    for v, i in index.iteritems():
+        vertices[i] = v
+    subMate = max_cardinality_matching(compileEdges( pairs, len( index ) ), output='dict',
+                                       dense=False, initial=initial)
+    for i, j in subMate.iteritems():
+        mate[vertices[i]] = vertices[j]
+    return augmentable, ( len( subMate ) - len( initial ) ) / 2
+
+def compileEdges( pairs, n ):
+    """ Build a CompactGraph of n vertices from a list of edges.
+
+    :param pairs - the list of (u, v) edges, repeats allowed
+    :param n - the number of vertices
+    :return graph - the compact graph
+    """
+
+    rows = [ set() for _ in xrange( n ) ]
+    for u, v in pairs:
+        rows[u].add( v )
+        rows[v].add( u )
+    offsets = array.array( 'l', [0] ) * (n + 1)
+    targets = array.array( 'l' )
+    for v in xrange( n ):
+        targets.extend( rows[v] )
+        offsets[v + 1] = len( targets )
+    return structures.CompactGraph(offsets, targets, None, len( targets ) / 2)
+
+#end
\ No newline at end of file
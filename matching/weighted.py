@@ -0,0 +1,586 @@
+#!/usr/bin/env python
+
+"""
+Maximum weight matching by cost scaling.
+
+This module implements max_weight_matching, an exact primal-dual algorithm
+for matchings of maximum total weight in general graphs with integer edge
+weights. It follows the scaling scheme of Gabow: the weights are revealed
+one bit at a time, from the most significant down, and each scale starts
+from the optimal dual solution of the previous one, doubled. Within a
+scale the dual solution is close to optimal, so only a few primal-dual
+stages are needed to restore optimality.
+
+A stage is built around the Micali-Vazirani engine of the matching module.
+The edges that are tight under the current dual solution, with the current
+blossoms shrunk to single nodes, form the equality graph of the stage, and
+max_cardinality_matching augments the matching in it along as many
+shortest augmenting paths per phase as it can. The Gallai-Edmonds
+decomposition of the equality graph then tells which dual variables to
+move: the even nodes are merged into new blossoms, the dual solution is
+changed until another edge becomes tight or a blossom must be expanded,
+and the next stage begins. The matching inside a blossom is rotated to a
+new base with the same engine, warm started from the old matching.
+
+To allow vertices to stay unmatched, the graph is doubled: every vertex v
+gets a twin v' joined to it by an edge of weight 0, and the twins carry a
+copy of the graph. A maximum weight perfect matching of the doubled graph
+restricted to the original vertices is a maximum weight matching of G, and
+perfect matchings let every scale start from an empty matching.
+
+The module also implements approximate_weight_matching, which returns a
+matching of at least 1 - epsilon times the maximum weight. The weights are
+rounded down to multiples of a unit small enough to cost at most half of
+the error allowed, which cuts the number of scales, and the scaling ends
+as soon as the dual solution proves that the current matching is good
+enough, often well before the last scale.
+
+:filename weighted.py
+"""
+
+__all__ = [ 'max_weight_matching', 'approximate_weight_matching' ]
+
+# Necessary imports
+import array
+
+import structures
+from matching import max_cardinality_matching
+
+# Labels of the nodes of the equality graph in the Gallai-Edmonds decomposition
+UNREACHED = 0 # Matched by every maximum matching, neither even nor odd
+EVEN = 1
+ODD = 2
+
+def max_weight_matching( G, maxcardinality=False, weight='weight', report=None ):
+    """Compute a maximum weight matching of G.
+
+    :param G - the NetworkX graph given
+        Each edge must have an integer weight, 1 if its weight attribute is
+        missing. The graph is not modified.
+
+    :param maxcardinality - whether to restrict to maximum cardinality
+        matchings (default False)
+        If True, the result has maximum weight among the matchings of
+        maximum cardinality, as for the NetworkX routine of the same name.
+
+    :param weight - the edge attribute holding the weight (default 'weight')
+
+    :param report - a dictionary to fill in (default None)
+        If given, report['scales'] and report['stages'] are set to the
+        number of scales and of primal-dual stages run.
+
+    :return mate - dictionary
+        The matching is returned as a dictionary such that
+        mate[v] == w if node v is matched to node w. Unmatched nodes do not
+        occur as a key in mate.
+    """
+
+    labels = list( G.nodes_iter() )
+    index = dict( (v, i) for i, v in enumerate( labels ) )
+    n = len( labels )
+
+    # Collect the edges with their integer weights
+    edges = [ ]
+    for u, v, data in G.edges_iter( data=True ):
+        if u == v:
+            continue
+        w = data.get( weight, 1 )
+        if int( w ) != w:
+            raise ValueError("edge weights must be integers")
+        edges.append( (index[u], index[v], int( w )) )
+
+    # Favor larger matchings by a shift no difference in weight can offset,
+    # otherwise leave out the edges no maximum weight matching needs
+    if maxcardinality and edges:
+        low = min( w for u, v, w in edges )
+        spread = max( w for u, v, w in edges ) - low + 1
+        shift = (n / 2 + 1) * spread + 1 - low
+        edges = [ (u, v, w + shift) for u, v, w in edges ]
+    else:
+        edges = [ e for e in edges if e[2] > 0 ]
+
+    mate, bound = scalingMatching( n, edges, report )
+    return dict( (labels[v], labels[w]) for v, w in enumerate( mate ) if w >= 0 )
+
+def approximate_weight_matching( G, epsilon=0.1, weight='weight', report=None ):
+    """Compute a matching of G of nearly maximum weight.
+
+    :param G - the NetworkX graph given
+        The weights may be any non-negative numbers, 1 if the weight
+        attribute is missing. The graph is not modified.
+
+    :param epsilon - the allowed relative error (default 0.1)
+        The weight of the matching is at least 1 - epsilon times the
+        maximum weight. It must lie strictly between 0 and 1.
+
+    :param weight - the edge attribute holding the weight (default 'weight')
+
+    :param report - a dictionary to fill in (default None)
+        If given, report['scales'] and report['stages'] are set as for
+        max_weight_matching, report['weight'] to the weight of the matching
+        and report['bound'] to the upper bound on the maximum weight that
+        certifies it.
+
+    :return mate - dictionary
+        The matching is returned as a dictionary such that
+        mate[v] == w if node v is matched to node w. Unmatched nodes do not
+        occur as a key in mate.
+    """
+
+    if not 0 < epsilon < 1:
+        raise ValueError("epsilon must lie strictly between 0 and 1")
+    labels = list( G.nodes_iter() )
+    index = dict( (v, i) for i, v in enumerate( labels ) )
+    n = len( labels )
+    edges = [ (index[u], index[v], data.get( weight, 1 ))
+              for u, v, data in G.edges_iter( data=True ) if u != v ]
+    edges = [ e for e in edges if e[2] > 0 ]
+
+    # A matching has at most n / 2 edges, each losing less than one unit to
+    # the rounding, and the heaviest edge bounds the maximum weight below
+    unit, tolerance, loss = 1, epsilon, 0
+    heaviest = max( w for u, v, w in edges ) if edges else 0
+    if epsilon * heaviest > n or any( int( w ) != w for u, v, w in edges ):
+        unit, tolerance, loss = epsilon * heaviest / n, epsilon / 2, n / 2.0
+    rounded = [ (u, v, int( w // unit )) for u, v, w in edges ]
+    mate, bound = scalingMatching( n, [ e for e in rounded if e[2] > 0 ], report, tolerance )
+
+    # Add the edges left between unmatched vertices, heaviest first
+    for u, v, w in sorted( edges, key=lambda e: -e[2] ):
+        if mate[u] < 0 and mate[v] < 0:
+            mate[u], mate[v] = v, u
+
+    if report is not None:
+        report['weight'] = sum( w for u, v, w in edges if mate[u] == v )
+        report['bound'] = unit * (bound + loss) if edges else 0
+    return dict( (labels[v], labels[w]) for v, w in enumerate( mate ) if w >= 0 )
+
+def scalingMatching( n, edges, report, epsilon=None ):
+    """ Compute a maximum weight matching of positive integer weights.
+
+    :param n - the number of vertices
+    :param edges - the list of (u, v, w) edges, w > 0
+    :param report - the dictionary to fill in, or None
+    :param epsilon - the allowed relative error (default None, exact)
+        If given, the scaling stops as soon as the duals certify that the
+        matching found has at least 1 - epsilon times the maximum weight.
+    :return (mate, bound) - the mate of each vertex or -1, and an upper
+        bound on the maximum weight, None unless epsilon is given
+    """
+
+    # Build the doubled graph
+    N = 2 * n
+    m = len( edges )
+    edgeU = array.array( 'l', [ u for u, v, w in edges ] + [ u + n for u, v, w in edges ] +
+                              range( n ) )
+    edgeV = array.array( 'l', [ v for u, v, w in edges ] + [ v + n for u, v, w in edges ] +
+                              range( n, N ) )
+    weights = [ w for u, v, w in edges ] * 2 + [ 0 ] * n
+    incident = [ [ ] for v in xrange( N ) ]
+    for e in xrange( len( edgeU ) ):
+        incident[edgeU[e]].append( e )
+        incident[edgeV[e]].append( e )
+
+    def halfWeights(mate):
+        """ Return the weights of the matching in the graph and in its twin. """
+        halves = [ 0, 0 ]
+        for e in xrange( 2 * m ):
+            if mate[edgeU[e]] == edgeV[e]:
+                halves[e >= m] += weights[e]
+        return halves
+
+    certificate = { }
+    def certified(mate, bound, shift):
+        """ Check the matching against the bound of the duals at a scale.
+
+        A weight of this scale stands for at most 2^shift times itself plus
+        2^shift - 1, and a perfect matching of the doubled graph has n
+        edges, so half of the dual bound of the scale bounds the maximum
+        weight of the graph as below.
+        """
+
+        limit = ( float( bound << shift ) / 2 + ((1 << shift) - 1) * n ) / 2
+        if max( halfWeights( mate ) ) < (1 - epsilon) * limit:
+            return False
+        certificate['bound'] = limit
+        return True
+
+    bits = max( weights ).bit_length() if edges else 0
+    dual = [ 0 ] * N # Optimal for the weights of scale 0, which are all 0
+    mate = range( n, N ) + range( n ) # Every vertex matched to its twin
+    stages = 0
+    for scale in xrange( 1, bits + 1 ):
+        shift = bits - scale
+        scaled = [ w >> shift for w in weights ]
+        stop = None
+        if epsilon is not None:
+            stop = lambda mate, bound: certified( mate, bound, shift )
+        mate, stageCount, dual = scaleMatching( N, edgeU, edgeV, scaled, incident, dual, stop )
+        stages += stageCount
+        if dual is None:
+            break
+
+    if report is not None:
+        report['scales'] = scale if bits else 0
+        report['stages'] = stages
+
+    # Keep the heavier of the matchings of the graph and of its twin
+    first = 0
+    if epsilon is not None:
+        halves = halfWeights( mate )
+        first = n if halves[1] > halves[0] else 0
+    result = [ -1 ] * n
+    for v in xrange( n ):
+        w = mate[v + first] - first
+        if 0 <= w < n:
+            result[v] = w
+    return result, certificate.get( 'bound', 0 if epsilon is not None else None )
+
+def scaleMatching( N, edgeU, edgeV, weights, incident, previous, stop=None ):
+    """ Compute a maximum weight perfect matching from the previous duals.
+
+    The dual values are in units of half a weight: the slack of an edge
+    (u, v) of weight w is y[u] + y[v] - 2 w plus twice the dual values of
+    the blossoms holding both u and v. Doubling the previous solution with
+    its blossom values pushed down to the vertices and adding 1 to each
+    vertex gives a feasible solution for the weights of this scale.
+
+    :param N - the number of vertices of the doubled graph
+    :param edgeU, edgeV - the end points of each edge
+    :param weights - the weight of each edge at this scale
+    :param incident - the list of edges at each vertex
+    :param previous - the optimal vertex duals of the previous scale, with
+        the blossom values pushed down
+    :param stop - function called with the matching and the dual bound
+        after each augmentation, which ends the scale early by returning
+        True (default None)
+    :return (mate, stages, dual) - the perfect matching, the number of
+        stages and the optimal vertex duals with the blossom values pushed
+        down; dual is None if stop ended the scale
+    """
+
+    y = [ 2 * d + 1 for d in previous ]
+    twice = [ 2 * w for w in weights ]
+    mate = [ -1 ] * N
+
+    # Blossoms are numbered from N on; for the vertices the entries are unused
+    blossomParent = [ -1 ] * N
+    blossomChildren = [ None ] * N
+    blossomDual = [ 0 ] * N
+    blossomBase = range( N )
+    blossomSize = [ 1 ] * N
+    top = range( N ) # Outermost blossom holding each vertex, or the vertex
+
+    def leaves(b):
+        """ Return the list of vertices inside blossom or vertex b. """
+        if b < N:
+            return [ b ]
+        result, stack = [ ], [ b ]
+        while stack:
+            x = stack.pop()
+            if x < N:
+                result.append( x )
+            else:
+                stack.extend( blossomChildren[x] )
+        return result
+
+    def attachment(t):
+        """ Return the vertex of outermost node t matched outside of it. """
+        return blossomBase[t]
+
+    def rotate(b, v):
+        """ Rematch the inside of blossom b so that vertex v is its base.
+
+        The children of b that are not matched to each other are found
+        with max_cardinality_matching on the tight edges between them,
+        starting from the current matching, and the children are then
+        rotated to their new bases in turn.
+        """
+
+        if blossomBase[b] == v:
+            return
+        kids = blossomChildren[b]
+        kidOf = { }
+        for k, kid in enumerate( kids ):
+            for leaf in leaves( kid ):
+                kidOf[leaf] = k
+
+        # The blossoms holding two different children are b and its ancestors
+        zsum, x = 0, b
+        while x >= 0:
+            zsum += blossomDual[x]
+            x = blossomParent[x]
+
+        # Tight edges between the children, and their current matching
+        pairs = { }
+        current = { }
+        for u, k in kidOf.iteritems():
+            for e in incident[u]:
+                x = edgeV[e] if edgeU[e] == u else edgeU[e]
+                l = kidOf.get( x, k )
+                if l != k and (k, l) not in pairs and y[u] + y[x] - twice[e] + 2 * zsum == 0:
+                    pairs[(k, l)] = (u, x)
+                    pairs[(l, k)] = (x, u)
+            x = mate[u]
+            l = kidOf.get( x, k )
+            if l != k and mate[x] == u:
+                current[k] = l
+
+        # Match every child but the one holding v
+        skip = kidOf[v]
+        graph = compileGraph( len( kids ), pairs )
+        keep = [ k != skip for k in xrange( len( kids ) ) ]
+        initial = dict( (k, l) for k, l in current.iteritems() if skip not in (k, l) )
+        kidMate = max_cardinality_matching( graph, output='array', initial=initial,
+                                            vertex_mask=keep )
+
+        for u, k in kidOf.iteritems():
+            if kidOf.get( mate[u], k ) != k:
+                mate[u] = -1
+        targets = { skip : v }
+        for k, l in enumerate( kidMate ):
+            if k == skip:
+                continue
+            if l < 0:
+                raise RuntimeError("blossom %d has no perfect matching" % b)
+            u, x = pairs[(k, l)]
+            mate[u] = x
+            targets[k] = u
+        for k, kid in enumerate( kids ):
+            if kid >= N:
+                rotate( kid, targets[k] )
+        blossomBase[b] = v
+
+    stages = 0
+    while True:
+        stages += 1
+
+        # Number the outermost nodes and collect the tight edges between them
+        tops = sorted( set( top ) )
+        nodeIndex = dict( (t, i) for i, t in enumerate( tops ) )
+        pairs = { }
+        for e in xrange( len( edgeU ) ):
+            u, v = edgeU[e], edgeV[e]
+            if y[u] + y[v] == twice[e]:
+                a, b = nodeIndex[top[u]], nodeIndex[top[v]]
+                if a != b:
+                    pairs.setdefault( (a, b), (u, v) )
+                    pairs.setdefault( (b, a), (v, u) )
+        oldMate = { }
+        for t in tops:
+            x = attachment( t )
+            if mate[x] >= 0 and top[mate[x]] != t:
+                oldMate[nodeIndex[t]] = nodeIndex[top[mate[x]]]
+
+        # Augment the matching of the equality graph
+        graph = compileGraph( len( tops ), pairs )
+        nodeMate = max_cardinality_matching( graph, output='array', initial=oldMate )
+        changed = [ a for a in xrange( len( tops ) ) if nodeMate[a] != oldMate.get( a, -1 ) ]
+        for a in changed:
+            x = attachment( tops[a] )
+            if mate[x] >= 0 and top[mate[x]] != tops[a]:
+                mate[x] = -1
+        for a in changed:
+            u, v = pairs[(a, nodeMate[a])]
+            mate[u] = v
+        for a in changed:
+            t = tops[a]
+            u = pairs[(a, nodeMate[a])][0]
+            if t >= N:
+                rotate( t, u )
+            else:
+                blossomBase[t] = u
+
+        if stop is not None:
+            # Every perfect matching has at most (size - 1) / 2 edges inside
+            # a blossom, so the duals bound twice its weight as below
+            bound = sum( y ) + sum( blossomDual[b] * (blossomSize[b] - 1)
+                                    for b in xrange( N, len( blossomDual ) ) )
+            if stop( mate, bound ):
+                return mate, stages, None
+        if all( b >= 0 for b in nodeMate ):
+            break
+
+        # Classify the nodes by the Gallai-Edmonds decomposition
+        adjacency = [ [ ] for t in tops ]
+        for a, b in pairs:
+            adjacency[a].append( b )
+        label = evenOddLabels( adjacency, nodeMate )
+        vertexLabel = bytearray( N )
+        for a, t in enumerate( tops ):
+            if label[a] != UNREACHED:
+                for v in leaves( t ):
+                    vertexLabel[v] = label[a]
+
+        # Merge the components of even nodes into new blossoms
+        seen = bytearray( len( tops ) )
+        for a in xrange( len( tops ) ):
+            if label[a] != EVEN or seen[a]:
+                continue
+            component, stack = [ ], [ a ]
+            seen[a] = 1
+            while stack:
+                c = stack.pop()
+                component.append( c )
+                for d in adjacency[c]:
+                    if label[d] == EVEN and not seen[d]:
+                        seen[d] = 1
+                        stack.append( d )
+            if len( component ) == 1:
+                continue
+            inside = set( component )
+            outer = [ c for c in component if nodeMate[c] not in inside ]
+            b = len( blossomParent )
+            blossomParent.append( -1 )
+            blossomChildren.append( [ tops[c] for c in component ] )
+            blossomDual.append( 0 )
+            blossomSize.append( sum( blossomSize[tops[c]] for c in component ) )
+            blossomBase.append( attachment( tops[outer[0]] ) )
+            for c in component:
+                blossomParent[tops[c]] = b
+                for v in leaves( tops[c] ):
+                    top[v] = b
+
+        # Find the largest dual change that keeps the solution feasible
+        delta = None
+        for e in xrange( len( edgeU ) ):
+            u, v = edgeU[e], edgeV[e]
+            lu, lv = vertexLabel[u], vertexLabel[v]
+            if lu != EVEN and lv != EVEN or top[u] == top[v]:
+                continue
+            slack = y[u] + y[v] - twice[e]
+            if lu == EVEN and lv == EVEN:
+                slack /= 2
+            elif lu == ODD or lv == ODD:
+                continue
+            if delta is None or slack < delta:
+                delta = slack
+        outer = set( top )
+        for t in outer:
+            if t >= N and vertexLabel[blossomBase[t]] == ODD:
+                if delta is None or blossomDual[t] < delta:
+                    delta = blossomDual[t]
+        if delta is None:
+            raise RuntimeError("graph has no perfect matching")
+
+        # Change the duals and expand the odd blossoms left without a value
+        for v in xrange( N ):
+            if vertexLabel[v] == EVEN:
+                y[v] -= delta
+            elif vertexLabel[v] == ODD:
+                y[v] += delta
+        for t in outer:
+            if t < N:
+                continue
+            if vertexLabel[blossomBase[t]] == EVEN:
+                blossomDual[t] += delta
+            elif vertexLabel[blossomBase[t]] == ODD:
+                blossomDual[t] -= delta
+                if blossomDual[t] == 0:
+                    for kid in blossomChildren[t]:
+                        blossomParent[kid] = -1
+                        for v in leaves( kid ):
+                            top[v] = kid
+
+    # Push the blossom values down to the vertices
+    dual = list( y )
+    for b in xrange( N, len( blossomParent ) ):
+        if blossomDual[b]:
+            for v in leaves( b ):
+                dual[v] += blossomDual[b]
+    return mate, stages, dual
+
+def compileGraph( n, pairs ):
+    """ Return the CompactGraph of n vertices with the edges in pairs.
+
+    :param n - the number of vertices
+    :param pairs - the collection of (a, b) vertex pairs, both directions
+    :return graph - the compact graph
+    """
+
+    rows = [ [ ] for a in xrange( n ) ]
+    for a, b in pairs:
+        rows[a].append( b )
+    offsets = array.array( 'l', [ 0 ] )
+    targets = array.array( 'l' )
+    for row in rows:
+        targets.extend( row )
+        offsets.append( len( targets ) )
+    return structures.CompactGraph( offsets, targets, None, len( targets ) / 2 )
+
+def evenOddLabels( adjacency, mate ):
+    """ Label the vertices of a graph by the Gallai-Edmonds decomposition.
+
+    The alternating forest grown from the unmatched vertices is searched
+    once, shrinking the blossoms met with a union-find structure.
+
+    :param adjacency - the list of neighbors of each vertex
+    :param mate - the mate of each vertex, or -1; a maximum matching
+    :return label - EVEN for the vertices some maximum matching leaves
+        unmatched, ODD for their other neighbors and UNREACHED for the rest
+    """
+
+    k = len( adjacency )
+    label = bytearray( k )
+    parent = [ -1 ] * k # The even vertex an odd vertex was reached from
+    base = range( k )
+    stamp = [ 0 ] * k # Marks the bases visited by each search for a blossom base
+    search = 0
+
+    def find(x):
+        root = x
+        while base[root] != root:
+            root = base[root]
+        while base[x] != root:
+            base[x], x = root, base[x]
+        return root
+
+    def climb(b):
+        """ Return the base above base b in the forest, or -1 at a root. """
+        return find( parent[mate[b]] ) if mate[b] >= 0 else -1
+
+    queue = [ v for v in xrange( k ) if mate[v] < 0 ]
+    for v in queue:
+        label[v] = EVEN
+    i = 0
+    while i < len( queue ):
+        v = queue[i]
+        i += 1
+        for u in adjacency[v]:
+            if label[u] == ODD or find( u ) == find( v ):
+                continue
+            if label[u] == UNREACHED:
+                if mate[u] < 0:
+                    raise RuntimeError("matching is not maximum")
+                label[u] = ODD
+                parent[u] = v
+                label[mate[u]] = EVEN
+                queue.append( mate[u] )
+                continue
+
+            # Two even vertices: find the base of the blossom they close
+            search += 1
+            a, b = find( v ), find( u )
+            while True:
+                if a >= 0:
+                    if stamp[a] == search:
+                        break
+                    stamp[a] = search
+                    a = climb( a )
+                elif b < 0:
+                    raise RuntimeError("matching is not maximum")
+                a, b = b, a
+            lca = a
+
+            # Shrink the blossom, making its odd vertices even
+            for x in (v, u):
+                x = find( x )
+                while x != lca:
+                    m = mate[x]
+                    label[m] = EVEN
+                    queue.append( m )
+                    base[x] = base[m] = lca
+                    x = find( parent[m] )
+    return label
+
+#end
\ No newline at end of file
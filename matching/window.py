@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+
+"""
+Matching of a time-ordered edge stream over a sliding window.
+
+This module implements WindowMatching, which maintains a matching of the
+edges that arrived within the last window units of time. The edges come
+as (u, v, t) events with non-decreasing times t, and an edge expires once
+the time advances window units past its latest arrival.
+
+Every update keeps the matching maximal at a cost bounded by the degrees
+of the vertices involved: a new edge between two exposed vertices is
+matched, and when a matched edge expires each of its end points is
+matched to an exposed neighbor if it has one. A maximal matching has at
+least half the maximum size. Every period updates the matching is
+improved by max_cardinality_matching, warm started from it and limited to
+augmenting paths of at most max_length edges, which raises the guarantee
+to (k + 1) / (k + 3) for k the odd max_length until the next update.
+
+:filename window.py
+"""
+
+__all__ = [ 'WindowMatching', 'PERIOD', 'MAX_LENGTH' ]
+
+# Necessary imports
+import array
+import collections
+
+import structures
+from matching import max_cardinality_matching
+
+# Default number of updates between two augmentations
+PERIOD = 1024
+
+# Default length of the longest augmenting path the augmentations search
+MAX_LENGTH = 7
+
+class WindowMatching(object):
+    """ Matching of the edges of a stream that arrived within a window.
+
+    The matching is kept as a mate dictionary of the vertices of the
+    window, in which unmatched vertices do not occur. A vertex leaves the
+    window with its last edge.
+    """
+
+    __slots__ = [ 'window', 'period', 'max_length', 'time', 'adjacency', 'events',
+                  'mate', 'updates', 'augmented' ]
+
+    def __init__(self, window, period=PERIOD, max_length=MAX_LENGTH):
+        """ Create an empty matching over a sliding window.
+
+        :param window - the time an edge stays in the window
+        :param period - the number of updates between two augmentations
+            (default PERIOD), None to augment only when augment is called
+        :param max_length - the longest augmenting path an augmentation
+            searches for (default MAX_LENGTH)
+        """
+
+        if window <= 0:
+            raise ValueError("window must be positive")
+        if period is not None and period < 1:
+            raise ValueError("period must be at least 1")
+        if max_length < 1:
+            raise ValueError("max_length must be at least 1")
+        self.window = window
+        self.period = period
+        self.max_length = max_length
+        self.time = None
+        self.adjacency = { }
+        self.events = collections.deque()
+        self.mate = { }
+        self.updates = 0
+        self.augmented = True
+
+    def __len__(self):
+        return len( self.adjacency )
+
+    def number_of_edges(self):
+        """ Return the number of distinct edges in the window. """
+        return sum( len( row ) for row in self.adjacency.itervalues() ) / 2
+
+    def matching(self):
+        """ Return a copy of the current mate dictionary. """
+        return dict( self.mate )
+
+    def cardinality(self):
+        """ Return the number of matched edges. """
+        return len( self.mate ) / 2
+
+    def guarantee(self):
+        """ Return the fraction of the maximum size the matching is known to have.
+
+        :return ratio - (k + 1) / (k + 3) for k the odd max_length if no
+            update came since the last augmentation, 1/2 otherwise
+        """
+
+        if not self.augmented:
+            return 0.5
+        k = self.max_length - 1 + self.max_length % 2
+        return float( k + 1 ) / (k + 3)
+
+    def add(self, u, v, t):
+        """ Add the edge (u, v) arriving at time t.
+
+        The edges that the time t expires leave the window first. An edge
+        added again stays in the window until its latest arrival expires.
+
+        :param u - the first end point
+        :param v - the second end point
+        :param t - the time of arrival, not earlier than the previous one
+        :return Nothing
+        """
+
+        self.advance( t )
+        if u == v:
+            return
+        adjacency = self.adjacency
+        if u not in adjacency:
+            adjacency[u] = { }
+        if v not in adjacency:
+            adjacency[v] = { }
+        adjacency[u][v] = t
+        adjacency[v][u] = t
+        self.events.append( (t, u, v) )
+
+        # Keep the matching maximal
+        if u not in self.mate and v not in self.mate:
+            self.mate[u] = v
+            self.mate[v] = u
+        self.updated()
+
+    def extend(self, events):
+        """ Add the edges of an iterable of (u, v, t) events in order. """
+        for u, v, t in events:
+            self.add( u, v, t )
+
+    def advance(self, t):
+        """ Advance the time to t and remove the edges that expire.
+
+        :param t - the new time, not earlier than the previous one
+        :return Nothing
+        """
+
+        if self.time is not None and t < self.time:
+            raise ValueError("time %r is earlier than %r" % (t, self.time))
+        self.time = t
+        events = self.events
+        adjacency = self.adjacency
+        while events and events[0][0] <= t - self.window:
+            s, u, v = events.popleft()
+
+            # Only the latest arrival of an edge removes it
+            if adjacency.get( u, { } ).get( v ) != s:
+                continue
+            del adjacency[u][v]
+            del adjacency[v][u]
+            if self.mate.get( u ) == v:
+                del self.mate[u]
+                del self.mate[v]
+                self.rematch( u )
+                self.rematch( v )
+            for x in (u, v):
+                if not adjacency[x]:
+                    del adjacency[x]
+            self.updated()
+
+    def augment(self):
+        """ Augment the matching along augmenting paths of at most max_length edges.
+
+        :return gained - the number of edges the matching gained
+        """
+
+        # Compile the window into a compact graph of vertex IDs
+        labels = list( self.adjacency )
+        index = dict( (v, i) for i, v in enumerate( labels ) )
+        offsets = array.array( 'l', [0] )
+        targets = array.array( 'l' )
+        for v in labels:
+            targets.extend( [ index[u] for u in self.adjacency[v] ] )
+            offsets.append( len( targets ) )
+        G = structures.CompactGraph(offsets, targets, labels, len( targets ) / 2)
+
+        initial = dict( (index[v], index[w]) for v, w in self.mate.iteritems() )
+        before = len( self.mate )
+        self.mate = max_cardinality_matching(G, dense=False, initial=initial,
+                                             max_length=self.max_length)
+        self.updates = 0
+        self.augmented = True
+        return ( len( self.mate ) - before ) / 2
+
+    def rematch(self, v):
+        """ Match v to an exposed neighbor if it has one. """
+
+        for u in self.adjacency[v]:
+            if u not in self.mate:
+                self.mate[u] = v
+                self.mate[v] = u
+                return
+
+    def updated(self):
+        """ Count an update and augment when the period is over. """
+
+        self.augmented = False
+        self.updates += 1
+        if self.period is not None and self.updates >= self.period:
+            self.augment()
+
+#end
\ No newline at end of file
@@ -1,5 +1,9 @@
 #!/usr/bin/env python
 
-__all__ = [ 'ordered_set' ]
+__all__ = [ 'ordered_set', 'compact_graph', 'mate_array', 'vertex_order', 'implicit_graph' ]
 
-from ordered_set import OrderedSet
\ No newline at end of file
+from ordered_set import OrderedSet
+from compact_graph import CompactGraph, save_graph, load_graph
+from mate_array import MateArray
+from vertex_order import vertex_order, ORDERINGS
+from implicit_graph import ImplicitGraph
\ No newline at end of file
@@ -0,0 +1,420 @@
+#!/usr/bin/env python
+
+"""
+Compact array representation of an undirected graph.
+
+This module implements a compressed sparse row (CSR) graph together with a
+binary on-disk format for it. The vertices of a compact graph are the
+integers 0..n-1 and the neighbors of vertex v are stored in
+targets[offsets[v] : offsets[v + 1]], so every undirected edge appears once
+in the row of each of its end points. An optional label table maps each
+vertex back to the node it was compiled from.
+
+The file written by save_graph consists of a fixed size header, the offsets
+array, the targets array and an optional pickled label table. All arrays are
+little-endian and 8-byte aligned, so load_graph can map the file and hand out
+NumPy views into the mapping without reading or copying the arrays. Startup
+time is therefore independent of the size of the graph, and processes that
+load the same file share its pages through the operating system.
+
+:filename compact_graph.py
+"""
+
+__all__ = [ 'CompactGraph', 'save_graph', 'load_graph' ]
+
+# Necessary imports
+import array
+import cPickle as pickle
+import mmap
+import os
+import struct
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+# File format information
+MAGIC = '\x93MVGRAPH'
+VERSION = 1
+HEADER = struct.Struct('<8sIIqqqq') # magic, version, itemsize, n, m, nnz, labels
+
+# Array type codes for the fallback loader, indexed by item size. On LP64
+# platforms an 'l' array holds 8-byte integers.
+TYPECODES = { 4 : 'i', 8 : 'l' }
+
+class CompactGraph(object):
+    """ Compressed sparse row representation of an undirected graph.
+
+    The class provides the read-only part of the NetworkX graph interface
+    that max_cardinality_matching uses (len, nodes, nodes_iter and
+    neighbors_iter), so a compact graph can be matched directly.
+    """
+
+    __slots__ = [ 'offsets', 'targets', 'labels', 'm', 'path', 'buffer' ]
+
+    def __init__(self, offsets, targets, labels=None, m=None):
+        """ Create a compact graph from its offsets and targets arrays.
+
+        :param offsets - array of n + 1 row offsets into targets
+        :param targets - array of neighbor vertices, one row per vertex
+        :param labels - the original node of each vertex (default None)
+        :param m - the number of undirected edges (default computed)
+        """
+
+        self.offsets = offsets
+        self.targets = targets
+        self.labels = labels
+        self.path = None # Set if the arrays are views of a mapped file
+        self.buffer = None # Keeps the mapping alive
+
+        # Self-loops appear once in their row, all other edges twice
+        if m is None:
+            loops = sum( 1 for v in xrange( len( self ) )
+                         if v in self.neighbors_iter( v ) )
+            m = ( len( targets ) + loops ) / 2
+        self.m = m
+
+    @classmethod
+    def from_networkx(cls, G):
+        """ Compile a NetworkX graph into a compact graph.
+
+        The nodes of G are numbered in the order of G.nodes() and the
+        labels attribute of the result maps each number back to its node.
+
+        :param G - the NetworkX graph given
+        :return graph - the compact graph
+        """
+
+        labels = G.nodes()
+        index = dict( (v, i) for i, v in enumerate( labels ) )
+
+        offsets = array.array( 'l', [0] )
+        targets = array.array( 'l' )
+        for v in labels:
+            targets.extend( index[u] for u in G.neighbors_iter( v ) )
+            offsets.append( len( targets ) )
+
+        return cls(offsets, targets, labels, G.number_of_edges())
+
+    @classmethod
+    def from_scipy_sparse(cls, A):
+        """ Wrap a symmetric SciPy sparse matrix in a compact graph.
+
+        Only the structure of A is used: vertex v is adjacent to the column
+        indices stored in row v. The indptr and indices arrays of a CSR
+        matrix become the offsets and targets of the graph without a copy;
+        other sparse formats are converted to CSR first. A matrix with
+        repeated entries is copied with the repeats summed, and one with
+        diagonal entries is copied with its self-loops dropped, since
+        every row must hold each neighbor once.
+
+        :param A - the symmetric n by n sparse adjacency matrix
+        :return graph - the compact graph
+        """
+
+        A = A.tocsr()
+        if A.shape[0] != A.shape[1]:
+            raise ValueError("adjacency matrix must be square")
+        if not A.has_canonical_format:
+            A = A.copy()
+            A.sum_duplicates()
+        rows = numpy.repeat( numpy.arange( A.shape[0] ), numpy.diff( A.indptr ) )
+        loops = A.indices == rows
+        if loops.any():
+            keep = ~loops
+            indptr = numpy.zeros( A.shape[0] + 1, A.indptr.dtype )
+            numpy.cumsum( numpy.bincount( rows[keep], minlength=A.shape[0] ), out=indptr[1:] )
+            A = scipy.sparse.csr_matrix( (A.data[keep], A.indices[keep], indptr), shape=A.shape )
+
+        # Compare the structure only, the values of the entries are ignored
+        pattern = scipy.sparse.csr_matrix( (numpy.ones( A.nnz, numpy.int8 ), A.indices, A.indptr),
+                                           shape=A.shape )
+        if (pattern != pattern.T).nnz:
+            raise ValueError("adjacency matrix must be symmetric")
+        return cls(A.indptr, A.indices, None, A.nnz / 2)
+
+    @classmethod
+    def from_edge_array(cls, edges, n=None):
+        """ Build a compact graph from an (m, 2) NumPy array of edges.
+
+        The rows are sorted into CSR order with vectorized NumPy
+        operations. Self-loops and repeated edges are dropped.
+
+        :param edges - the (m, 2) array of end points
+        :param n - the number of vertices (default largest end point + 1)
+            It must exceed every end point.
+        :return graph - the compact graph
+        """
+
+        edges = numpy.asarray( edges )
+        if edges.ndim != 2 or edges.shape[1] != 2:
+            raise ValueError("edge array must have shape (m, 2)")
+        largest = int( edges.max() ) if len( edges ) else -1
+        if len( edges ) and int( edges.min() ) < 0:
+            raise ValueError("end points must not be negative")
+        if n is None:
+            n = largest + 1
+        elif n <= largest:
+            raise ValueError("end point %d is not below n = %d" % (largest, n))
+
+        # Normalize each edge to (low, high) and drop loops and repeats
+        edges = numpy.sort(edges, axis=1)
+        edges = edges[ edges[:, 0] != edges[:, 1] ]
+        if len( edges ):
+            edges = numpy.unique(edges, axis=0)
+
+        # Store each edge in the rows of both of its end points
+        sources = numpy.concatenate( (edges[:, 0], edges[:, 1]) )
+        targets = numpy.concatenate( (edges[:, 1], edges[:, 0]) )
+        order = numpy.argsort(sources, kind='mergesort')
+
+        offsets = numpy.zeros(n + 1, numpy.int64)
+        numpy.cumsum(numpy.bincount(sources, minlength=n), out=offsets[1:])
+        return cls(offsets, targets[order], None, len( edges ))
+
+    @classmethod
+    def from_array(cls, A):
+        """ Wrap a SciPy sparse matrix or a NumPy edge array.
+
+        :param A - the sparse adjacency matrix or (m, 2) edge array
+        :return graph - the compact graph
+        """
+
+        if scipy is not None and scipy.sparse.issparse( A ):
+            return cls.from_scipy_sparse( A )
+        if numpy is not None and isinstance(A, numpy.ndarray):
+            return cls.from_edge_array( A )
+        raise TypeError("unsupported graph type %s" % type( A ).__name__)
+
+    def __len__(self):
+        return len( self.offsets ) - 1
+
+    def __reduce__(self):
+        # A graph loaded from a file is pickled by its path, so worker
+        # processes map the same file instead of receiving a copy.
+        if self.path is not None:
+            return ( load_graph, (self.path,) )
+        return ( CompactGraph, (self.offsets, self.targets, self.labels, self.m) )
+
+    def number_of_nodes(self):
+        return len( self )
+
+    def number_of_edges(self):
+        return self.m
+
+    def nodes(self):
+        return xrange( len( self ) )
+
+    def nodes_iter(self):
+        return iter( xrange( len( self ) ) )
+
+    def neighbors(self, v):
+        return self.targets[ self.offsets[v] : self.offsets[v + 1] ].tolist()
+
+    def neighbors_iter(self, v):
+        return iter( self.neighbors( v ) )
+
+    def degree(self, v):
+        return int( self.offsets[v + 1] - self.offsets[v] )
+
+    def label(self, v):
+        """ Return the original node of vertex v. """
+        return v if self.labels is None else self.labels[v]
+
+    def dense_adjacency(self):
+        """ Return the adjacency matrix of the graph.
+
+        The rows are filled one at a time, so no index array as long as
+        the targets is built next to the matrix.
+
+        :return matrix - n by n boolean NumPy array
+        """
+
+        n = len( self )
+        offsets = self.offsets
+        targets = numpyArray( self.targets )
+        matrix = numpy.zeros( (n, n), bool )
+        for v in xrange( n ):
+            matrix[v, targets[ offsets[v] : offsets[v + 1] ]] = True
+        return matrix
+
+    def permuted(self, order):
+        """ Return a copy of the graph with its vertices renumbered.
+
+        Vertex order[i] of this graph becomes vertex i of the copy. With
+        NumPy the rows are gathered by vectorized operations, otherwise
+        they are copied row by row. The labels of the copy still map each
+        vertex to its original node; without a label table the caller
+        maps the vertices back through order.
+
+        :param order - sequence of the n vertices, see vertex_order
+        :return graph - the renumbered compact graph
+        """
+
+        n = len( self )
+        if len( order ) != n:
+            raise ValueError("order must list each of the %d vertices once" % n)
+        labels = None
+        if self.labels is not None:
+            labels = [ self.labels[v] for v in order ]
+
+        if numpy is not None:
+            order = numpyArray( order )
+            rank = numpy.full( n, -1, numpy.int64 )
+            rank[order] = numpy.arange( n )
+            if n and rank.min() < 0:
+                raise ValueError("order must list each of the %d vertices once" % n)
+
+            # Row i of the copy is row order[i], its targets renumbered
+            offsets = numpyArray( self.offsets )
+            degree = numpy.diff( offsets )[order]
+            newOffsets = numpy.zeros( n + 1, numpy.int64 )
+            numpy.cumsum( degree, out=newOffsets[1:] )
+            gather = numpy.arange( newOffsets[-1] ) + numpy.repeat( offsets[:-1][order] - newOffsets[:-1], degree )
+            targets = rank[ numpyArray( self.targets )[gather] ]
+            return CompactGraph(newOffsets, targets, labels, self.m)
+
+        rank = [ -1 ] * n
+        for i, v in enumerate( order ):
+            rank[v] = i
+        if -1 in rank:
+            raise ValueError("order must list each of the %d vertices once" % n)
+        offsets = array.array( 'l', [0] )
+        targets = array.array( 'l' )
+        for v in order:
+            targets.extend( rank[u] for u in self.neighbors( v ) )
+            offsets.append( len( targets ) )
+        return CompactGraph(offsets, targets, labels, self.m)
+
+def save_graph(G, path):
+    """ Write a graph to a file in the compact binary format.
+
+    :param G - the NetworkX or compact graph given
+    :param path - the name of the file to write
+    """
+
+    if not isinstance(G, CompactGraph):
+        G = CompactGraph.from_networkx( G )
+
+    n = len( G )
+    nnz = len( G.targets )
+    itemsize = 4 if n < 2**31 else 8 # Narrow targets whenever possible
+
+    with open(path, 'wb') as f:
+
+        # Reserve the header, it is rewritten once the label offset is known
+        f.write( '\0' * HEADER.size )
+        writeArray(f, G.offsets, 8)
+        writeArray(f, G.targets, itemsize)
+
+        # Pad the targets to keep the file 8-byte aligned
+        f.write( '\0' * (-f.tell() % 8) )
+
+        labelsOffset = 0
+        if G.labels is not None:
+            labelsOffset = f.tell()
+            pickle.dump(list( G.labels ), f, pickle.HIGHEST_PROTOCOL)
+
+        f.seek(0)
+        f.write( HEADER.pack(MAGIC, VERSION, itemsize, n, G.m, nnz, labelsOffset) )
+
+def load_graph(path, mapped=True):
+    """ Read a graph written by save_graph.
+
+    If mapped, the file is mapped read-only and the offsets and targets of
+    the result are NumPy views into the mapping, so no array data is read
+    until the matcher touches it. Otherwise, or if NumPy is not available,
+    the arrays are read into memory.
+
+    :param path - the name of the file to read
+    :param mapped - map the file instead of reading it (default True)
+    :return graph - the compact graph
+    """
+
+    with open(path, 'rb') as f:
+
+        # Read and check the header
+        header = f.read( HEADER.size )
+        if len( header ) != HEADER.size:
+            raise ValueError("%s is not a compact graph file" % path)
+        magic, version, itemsize, n, m, nnz, labelsOffset = HEADER.unpack( header )
+        if magic != MAGIC:
+            raise ValueError("%s is not a compact graph file" % path)
+        if version != VERSION:
+            raise ValueError("%s has unsupported version %d" % (path, version))
+
+        # Read the label table
+        labels = None
+        if labelsOffset:
+            f.seek( labelsOffset )
+            labels = pickle.load( f )
+
+        if mapped and numpy is not None:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            offsets = numpy.frombuffer(buf, '<i8', n + 1, HEADER.size)
+            targets = numpy.frombuffer(buf, '<i%d' % itemsize, nnz,
+                                       HEADER.size + 8 * (n + 1))
+            G = CompactGraph(offsets, targets, labels, m)
+            G.path = os.path.abspath( path )
+            G.buffer = buf
+        else:
+            f.seek( HEADER.size )
+            offsets = readArray(f, n + 1, 8)
+            targets = readArray(f, nnz, itemsize)
+            G = CompactGraph(offsets, targets, labels, m)
+
+    return G
+
+def numpyArray(values):
+    """ Return an index sequence as a NumPy int64 array.
+
+    An array.array is viewed through its buffer instead of being converted
+    item by item.
+    """
+
+    if isinstance(values, array.array):
+        values = numpy.frombuffer(values, 'i%d' % values.itemsize)
+    return numpy.asarray(values, numpy.int64)
+
+def writeArray(f, values, itemsize):
+    """ Write integer values to a file as little-endian integers.
+
+    :param f - the file given
+    :param values - the integer values
+    :param itemsize - the size of each integer in bytes
+    """
+
+    if numpy is not None:
+        numpy.asarray(values, '<i%d' % itemsize).tofile( f )
+    else:
+        a = array.array( TYPECODES[itemsize], values )
+        if sys.byteorder == 'big':
+            a.byteswap()
+        a.tofile( f )
+
+def readArray(f, count, itemsize):
+    """ Read count little-endian integers of the given size from a file.
+
+    :param f - the file given
+    :param count - the number of integers
+    :param itemsize - the size of each integer in bytes
+    :return values - the integers read
+    """
+
+    if numpy is not None:
+        return numpy.fromfile(f, '<i%d' % itemsize, count)
+
+    a = array.array( TYPECODES[itemsize] )
+    a.fromfile(f, count)
+    if sys.byteorder == 'big':
+        a.byteswap()
+    return a
+
+#end
\ No newline at end of file
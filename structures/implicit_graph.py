@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+"""
+Implicit representation of an undirected graph.
+
+This module implements a graph that is given by its vertices and a rule
+returning the neighbors of a vertex, for example all the items within a
+compatibility threshold of an item, instead of by a list of its edges. The
+rule is only called for the vertices the matcher reaches, and the rows it
+returns are kept in a least recently used cache of a bounded number of
+vertices, so the edges are never materialized all at once.
+
+The vertices of an implicit graph are the integers 0..n-1 and the labels
+attribute maps each of them back to the vertex it was given as, in the
+same way as for a CompactGraph. The rule is called with and returns
+labels, and must be symmetric: u is a neighbor of v exactly if v is a
+neighbor of u.
+
+:filename implicit_graph.py
+"""
+
+__all__ = [ 'ImplicitGraph', 'CACHE_SIZE' ]
+
+# Necessary imports
+import array
+import collections
+
+# Default number of rows kept by the neighbor cache
+CACHE_SIZE = 65536
+
+class ImplicitGraph(object):
+    """ Undirected graph given by a neighbor rule.
+
+    The class provides the read-only part of the NetworkX graph interface
+    that max_cardinality_matching uses (len, nodes, nodes_iter and
+    neighbors_iter), so an implicit graph can be matched directly. Its
+    cache is written on every lookup, so an implicit graph must not be
+    shared between threads.
+    """
+
+    __slots__ = [ 'labels', 'index', 'rule', 'cache', 'cache_size', 'hits', 'misses' ]
+
+    def __init__(self, vertices, neighbors, cache_size=CACHE_SIZE):
+        """ Create an implicit graph from its vertices and neighbor rule.
+
+        :param vertices - the iterable of vertices, each hashable
+        :param neighbors - function returning an iterable of the neighbors
+            of a vertex, for example a generator function
+        :param cache_size - the number of rows to cache (default CACHE_SIZE)
+            0 disables the cache and None makes it unbounded
+        """
+
+        self.labels = list( vertices )
+        self.index = dict( (v, i) for i, v in enumerate( self.labels ) )
+        if len( self.index ) != len( self.labels ):
+            raise ValueError("vertices must be distinct")
+        self.rule = neighbors
+        self.cache = collections.OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len( self.labels )
+
+    def number_of_nodes(self):
+        return len( self )
+
+    def nodes(self):
+        return xrange( len( self ) )
+
+    def nodes_iter(self):
+        return iter( xrange( len( self ) ) )
+
+    def neighbors(self, v):
+        """ Return the list of neighbors of vertex v, from the cache if kept. """
+
+        row = self.cache.pop( v, None )
+        if row is None:
+            self.misses += 1
+            index = self.index
+            row = array.array( 'l', ( index[u] for u in self.rule( self.labels[v] ) ) )
+            if self.cache_size == 0:
+                return row.tolist()
+        else:
+            self.hits += 1
+
+        # Keep the row as the most recently used, evicting the oldest ones
+        self.cache[v] = row
+        if self.cache_size is not None:
+            while len( self.cache ) > self.cache_size:
+                self.cache.popitem( last=False )
+        return row.tolist()
+
+    def neighbors_iter(self, v):
+        return iter( self.neighbors( v ) )
+
+    def degree(self, v):
+        return len( self.neighbors( v ) )
+
+    def label(self, v):
+        """ Return the original vertex of vertex v. """
+        return self.labels[v]
+
+#end
\ No newline at end of file
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+"""
+Compact array representation of a matching.
+
+This module implements MateArray, the result of max_cardinality_matching
+with output='compact'. A matching of a graph with n vertices is stored as a
+single integer array of length n, indexed by compiled vertex ID, instead of
+a dictionary holding both directions of every matched pair. The label table
+of the compiled graph is kept alongside, so the original nodes can still be
+recovered without building a dictionary.
+
+:filename mate_array.py
+"""
+
+__all__ = [ 'MateArray' ]
+
+# Necessary imports
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Value of mate[v] for an exposed vertex v
+EXPOSED = -1
+
+class MateArray(object):
+    """ A matching stored as an array of mates.
+
+    mate[v] == w if vertex v is matched to vertex w, and mate[v] == -1 if
+    vertex v is exposed. The mate array is a NumPy int64 array if NumPy is
+    available and an array('l') otherwise. labels[v] is the original node
+    of vertex v, or labels is None if the vertices are their own labels.
+    """
+
+    __slots__ = [ 'mate', 'labels' ]
+
+    def __init__(self, mate, labels=None):
+        self.mate = mate
+        self.labels = labels
+
+    @classmethod
+    def from_dict(cls, mate, n, labels=None):
+        """ Create a mate array from a mate dictionary of vertex IDs.
+
+        :param mate - the dictionary of matched vertices
+        :param n - the number of vertices
+        :param labels - the original node of each vertex (default None)
+        :return mateArray - the mate array
+        """
+
+        if numpy is not None:
+            a = numpy.empty(n, numpy.int64)
+            a.fill( EXPOSED )
+            if mate:
+                a[ mate.keys() ] = mate.values()
+        else:
+            a = array.array( 'l', [EXPOSED] ) * n
+            for v, w in mate.iteritems():
+                a[v] = w
+        return cls(a, labels)
+
+    def __len__(self):
+        return len( self.mate )
+
+    def __getitem__(self, v):
+        return self.mate[v]
+
+    def __reduce__(self):
+        return ( MateArray, (self.mate, self.labels) )
+
+    def cardinality(self):
+        """ Return the number of matched edges. """
+        if numpy is not None and isinstance(self.mate, numpy.ndarray):
+            return int( numpy.count_nonzero( self.mate != EXPOSED ) ) / 2
+        return ( len( self.mate ) - self.mate.count( EXPOSED ) ) / 2
+
+    def label(self, v):
+        """ Return the original node of vertex v. """
+        return v if self.labels is None else self.labels[v]
+
+    def edges(self):
+        """ Return the matched edges as an array of vertex ID pairs.
+
+        Each matched edge (v, w) appears once, with v < w, in increasing
+        order of v. The result is a (k, 2) NumPy array if the mate array
+        is a NumPy array, otherwise a list of k (v, w) tuples, so both
+        forms are indexed and iterated by pair alike.
+
+        :return edges - the matched edges
+        """
+
+        if numpy is not None and isinstance(self.mate, numpy.ndarray):
+            v = numpy.flatnonzero( self.mate > numpy.arange( len( self.mate ) ) )
+            return numpy.column_stack( (v, self.mate[v]) )
+
+        return [ (v, w) for v, w in enumerate( self.mate ) if w > v ]
+
+    def to_dict(self):
+        """ Return the matching as a mate dictionary of original nodes.
+
+        :return mate - the dictionary returned by max_cardinality_matching
+        """
+
+        mate = { }
+        for v, w in enumerate( self.mate ):
+            if w != EXPOSED:
+                mate[ self.label( v ) ] = self.label( int( w ) )
+        return mate
+
+#end
\ No newline at end of file
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+
+"""
+Vertex orderings for cache locality.
+
+The matching phases scan the rows of a compact graph and the per-vertex
+state of the neighbors found there. When the vertices of a large sparse
+graph are numbered arbitrarily, neighboring vertices are far apart in
+memory and most of these accesses miss the cache. Renumbering the
+vertices so that neighbors receive nearby numbers keeps each row and the
+state it touches close together. The orderings computed here are:
+
+    'bfs'    - breadth first from the lowest vertex of each component
+    'rcm'    - reverse Cuthill-McKee, breadth first from a vertex of
+               minimum degree with neighbors visited by increasing degree
+    'degree' - by decreasing degree, so the hubs share the first pages
+
+An order is a list of vertices, order[i] being the old vertex that is
+renumbered to i. CompactGraph.permuted applies it.
+
+:filename vertex_order.py
+"""
+
+__all__ = [ 'vertex_order', 'ORDERINGS' ]
+
+# Necessary imports
+import array
+
+# The orderings vertex_order computes
+ORDERINGS = [ 'bfs', 'rcm', 'degree' ]
+
+def vertex_order( G, method ):
+    """ Compute a renumbering of the vertices of a compact graph.
+
+    :param G - the compact graph given
+    :param method - the ordering, one of ORDERINGS
+    :return order - array of the n vertices of G, order[i] is the vertex
+        numbered i after the renumbering
+    """
+
+    if method == 'bfs':
+        return breadthFirstOrder( G, xrange( len( G ) ), None )
+    if method == 'rcm':
+        return cuthillMcKeeOrder( G )
+    if method == 'degree':
+        n = len( G )
+        return array.array( 'l', sorted( xrange( n ), key=lambda v: -G.degree( v ) ) )
+    raise ValueError("unknown vertex order %r" % (method,))
+
+def breadthFirstOrder( G, roots, key ):
+    """ Number the vertices breadth first, component by component.
+
+    :param G - the compact graph given
+    :param roots - the vertices to start a component from, in order
+    :param key - function sorting the neighbors of each vertex, or None
+    :return order - array of the vertices in the order visited
+    """
+
+    seen = [ False ] * len( G )
+    order = array.array( 'l' )
+    for root in roots:
+        if seen[root]: continue
+
+        seen[root] = True
+        start = len( order )
+        order.append( root )
+        while start < len( order ):
+            v = order[start]
+            start += 1
+            neighbors = G.neighbors( v )
+            if key is not None:
+                neighbors.sort( key=key )
+            for u in neighbors:
+                if not seen[u]:
+                    seen[u] = True
+                    order.append( u )
+    return order
+
+def cuthillMcKeeOrder( G ):
+    """ Number the vertices in reverse Cuthill-McKee order. """
+
+    degree = [ G.degree( v ) for v in xrange( len( G ) ) ]
+    roots = sorted( xrange( len( G ) ), key=degree.__getitem__ )
+    order = breadthFirstOrder( G, roots, degree.__getitem__ )
+    order.reverse()
+    return order
+
+#end
\ No newline at end of file
@@ -1,3 +1,10 @@
 #!/usr/bin/env python
 
-__all__ = [ 'test_driver', 'test_matching_simple' ]
\ No newline at end of file
+__all__ = [ 'test_driver', 'benchmark_driver', 'test_matching_simple', 'test_compact_graph',
+            'test_mate_array', 'test_matching_dense', 'test_matching_selector',
+            'test_closed_form', 'test_matching_threads',
+            'test_implicit_graph', 'test_geometric',
+            'test_matching_weighted', 'test_streaming',
+            'test_window', 'test_decomposition', 'test_enumeration',
+            'test_algebraic', 'test_estimation', 'test_cache',
+            'test_offload' ]
\ No newline at end of file
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+
+"""
+Driver module for the matching benchmarks.
+
+This module times the engines of maximum_matching on graph families of
+growing size and suggests values for THRESHOLDS from the measurements.
+Each engine is forced on by its threshold, so the timings include the
+selection overhead that maximum_matching adds in practice. Run this module
+directly to print the timing tables and the suggested thresholds, followed
+by the effect of each vertex ordering on large sparse graphs, the cost of
+each validation level, the weighted matcher against NetworkX and the
+algebraic engine against max_cardinality_matching on dense graphs.
+
+:filename benchmark_driver.py
+"""
+
+# Necessary imports
+import matching as mv
+import structures
+
+import networkx as nx
+import random
+import sys
+import time
+
+# Component sizes measured and the number of runs per measurement
+SIZES = [ 8, 16, 32, 64, 128, 256, 512 ]
+REPEAT = 3
+
+# Sizes of the large sparse graphs the vertex orderings are measured on
+LARGE_SIZES = [ 4096, 16384, 65536 ]
+
+# Sizes of the weighted graphs and the largest random weight
+WEIGHTED_SIZES = [ 250, 500, 1000, 2000 ]
+MAX_WEIGHT = 1000
+
+# Relative error allowed to the approximate weighted matcher
+APPROXIMATION = 0.1
+
+# Sizes of the dense graphs the algebraic engine is measured on
+DENSE_SIZES = [ 250, 500, 1000 ]
+
+# Threshold values that force an engine on or off
+ALWAYS = 0
+NEVER = sys.maxint
+
+def bipartiteGraph(n):
+    """ Random bipartite graph with n nodes and average degree about 6. """
+    g = nx.bipartite.random_graph(n / 2, n - n / 2, min(1.0, 12.0 / n), seed=n)
+    return nx.Graph( g )
+
+def generalGraph(n):
+    """ Random graph with n nodes and average degree about 6. """
+    return nx.gnp_random_graph(n, min(1.0, 6.0 / n), seed=n)
+
+def weightedGraph(n):
+    """ Random graph as generalGraph, with integer weights up to MAX_WEIGHT. """
+    g = generalGraph(n)
+    rnd = random.Random( n )
+    for u, v in g.edges_iter():
+        g[u][v]['weight'] = rnd.randint(1, MAX_WEIGHT)
+    return g
+
+def scrambledGrid(n):
+    """ Square grid with about n vertices, numbered in random order.
+
+    The grid has a natural numbering with neighbors close together, so the
+    random numbering shows what a locality ordering can recover.
+    """
+
+    side = int( n ** 0.5 )
+    g = nx.convert_node_labels_to_integers( nx.grid_2d_graph(side, side) )
+    numbers = range( len( g ) )
+    random.Random( n ).shuffle( numbers )
+    g = structures.CompactGraph.from_networkx( nx.relabel_nodes(g, dict( enumerate( numbers ) )) )
+    return structures.CompactGraph(g.offsets, g.targets, None, g.m)
+
+def timeMatching(run, repeat=REPEAT):
+    """ Time a matching run.
+
+    :param run - the function making the run, called without arguments
+    :param repeat - the number of runs (default REPEAT)
+    :return seconds - the best time of all runs
+    """
+
+    best = None
+    for _ in range( repeat ):
+        start = time.time()
+        run()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def crossover(family, sizes, fast, slow):
+    """ Find the size from which an engine is never slower than another.
+
+    :param family - function returning the graph of a given size
+    :param sizes - the sizes measured, in increasing order
+    :param fast - the thresholds forcing the engine tested
+    :param slow - the thresholds forcing the engine compared against
+    :return (rows, threshold) - the (size, fast time, slow time) rows and
+        the smallest size from which the fast engine wins at every size
+        measured, or NEVER if it loses at the largest size
+    """
+
+    rows = [ ]
+    for n in sizes:
+        G = family(n)
+        rows.append( (n, timeMatching( lambda: mv.maximum_matching(G, thresholds=fast) ),
+                         timeMatching( lambda: mv.maximum_matching(G, thresholds=slow) )) )
+
+    threshold = NEVER
+    for n, fastTime, slowTime in reversed( rows ):
+        if fastTime > slowTime:
+            break
+        threshold = n
+    return rows, threshold
+
+def suggestThresholds(sizes=SIZES, verbose=False):
+    """ Measure the engines and suggest values for THRESHOLDS.
+
+    :param sizes - the sizes measured (default SIZES)
+    :param verbose - print the timing tables (default False)
+    :return thresholds - dictionary with the keys of THRESHOLDS
+    """
+
+    measurements = [
+        ('hopcroft_karp_min_nodes', bipartiteGraph,
+         { 'hopcroft_karp_min_nodes' : ALWAYS, 'greedy_min_nodes' : NEVER },
+         { 'hopcroft_karp_min_nodes' : NEVER, 'greedy_min_nodes' : NEVER }),
+        ('greedy_min_nodes', generalGraph,
+         { 'greedy_min_nodes' : ALWAYS },
+         { 'greedy_min_nodes' : NEVER }),
+    ]
+
+    thresholds = { }
+    for key, family, fast, slow in measurements:
+        rows, thresholds[key] = crossover(family, sizes, fast, slow)
+        if verbose:
+            print "%s (%s)" % (key, family.__name__)
+            print "%8s %12s %12s" % ("nodes", "engine", "mv")
+            for n, fastTime, slowTime in rows:
+                print "%8d %12.6f %12.6f" % (n, fastTime, slowTime)
+            print
+    return thresholds
+
+def orderingEffect(sizes=LARGE_SIZES, repeat=REPEAT, verbose=False):
+    """ Time max_cardinality_matching with each vertex ordering.
+
+    The time of a renumbered run includes computing the order and
+    renumbering the graph.
+
+    :param sizes - the sizes of the scrambled grids (default LARGE_SIZES)
+    :param repeat - the number of runs per measurement (default REPEAT)
+    :param verbose - print the timing table (default False)
+    :return rows - list of (size, times) pairs, times mapping each ordering
+        and None, for the original numbering, to the best time of all runs
+    """
+
+    orderings = [ None ] + structures.ORDERINGS
+    rows = [ ]
+    for n in sizes:
+        G = scrambledGrid(n)
+        times = { }
+        for reorder in orderings:
+            run = lambda: mv.max_cardinality_matching(G, output='array', dense=False, reorder=reorder)
+            times[reorder] = timeMatching( run, repeat )
+        rows.append( (len( G ), times) )
+
+    if verbose:
+        print "vertex orderings (scrambledGrid)"
+        print "%8s" % "nodes" + "".join( "%12s" % (r or "none") for r in orderings )
+        for n, times in rows:
+            print "%8d" % n + "".join( "%12.6f" % times[r] for r in orderings )
+        print
+    return rows
+
+def validationCost(sizes=LARGE_SIZES, repeat=REPEAT, verbose=False):
+    """ Time max_cardinality_matching at each validation level.
+
+    :param sizes - the sizes of the random graphs (default LARGE_SIZES)
+    :param repeat - the number of runs per measurement (default REPEAT)
+    :param verbose - print the timing table (default False)
+    :return rows - list of (size, times) pairs, times mapping each
+        validation level to the best time of all runs
+    """
+
+    levels = mv.VALIDATION_LEVELS
+    rows = [ ]
+    for n in sizes:
+        G = structures.CompactGraph.from_networkx( generalGraph(n) )
+        times = { }
+        for level in levels:
+            run = lambda: mv.max_cardinality_matching(G, dense=False, validate=level)
+            times[level] = timeMatching( run, repeat )
+        rows.append( (n, times) )
+
+    if verbose:
+        print "validation levels (generalGraph)"
+        print "%8s" % "nodes" + "".join( "%12s" % level for level in levels )
+        for n, times in rows:
+            print "%8d" % n + "".join( "%12.6f" % times[level] for level in levels )
+        print
+    return rows
+
+def weightedCost(sizes=WEIGHTED_SIZES, repeat=1, verbose=False):
+    """ Time max_weight_matching against the NetworkX routine.
+
+    :param sizes - the sizes of the random graphs (default WEIGHTED_SIZES)
+    :param repeat - the number of runs per measurement (default 1)
+    :param verbose - print the timing table (default False)
+    :return rows - list of (size, times) pairs, times mapping 'scaling',
+        'approximate', with an error of APPROXIMATION, and 'networkx' to
+        the best time of all runs
+    """
+
+    engines = [ ('scaling', mv.max_weight_matching),
+                ('approximate', lambda G: mv.approximate_weight_matching(G, APPROXIMATION)),
+                ('networkx', nx.max_weight_matching) ]
+    rows = [ ]
+    for n in sizes:
+        G = weightedGraph(n)
+        times = { }
+        for name, engine in engines:
+            times[name] = timeMatching( lambda: engine(G), repeat )
+        rows.append( (n, times) )
+
+    if verbose:
+        print "maximum weight matching (weightedGraph)"
+        print "%8s" % "nodes" + "".join( "%12s" % name for name, engine in engines )
+        for n, times in rows:
+            print "%8d" % n + "".join( "%12.6f" % times[name] for name, engine in engines )
+        print
+    return rows
+
+def algebraicCost(sizes=DENSE_SIZES, repeat=1, verbose=False):
+    """ Time the algebraic matching number against max_cardinality_matching.
+
+    :param sizes - the sizes of the dense graphs (default DENSE_SIZES)
+    :param repeat - the number of runs per measurement (default 1)
+    :param verbose - print the timing table (default False)
+    :return rows - list of (family, size, times) triples, family either
+        'complete' or 'gnp(0.8)' and times mapping 'mv', 'rank' and
+        'recover' to the best time of all runs
+    """
+
+    engines = [ ('mv', lambda G: mv.max_cardinality_matching(G, output='array')),
+                ('rank', mv.matching_number),
+                ('recover', lambda G: mv.algebraic_matching(G, output='array')) ]
+    families = [ ('complete', nx.complete_graph),
+                 ('gnp(0.8)', lambda n: nx.gnp_random_graph(n, 0.8, seed=n)) ]
+    rows = [ ]
+    for family, build in families:
+        for n in sizes:
+            G = structures.CompactGraph.from_networkx( build(n) )
+            times = { }
+            for name, engine in engines:
+                times[name] = timeMatching( lambda: engine(G), repeat )
+            rows.append( (family, n, times) )
+
+    if verbose:
+        print "maximum matching size of dense graphs"
+        print "%10s%8s" % ("family", "nodes") + "".join( "%12s" % name for name, engine in engines )
+        for family, n, times in rows:
+            print "%10s%8d" % (family, n) + "".join( "%12.6f" % times[name] for name, engine in engines )
+        print
+    return rows
+
+# Main function
+if __name__ == "__main__":
+
+    thresholds = suggestThresholds( verbose=True )
+    print "Suggested THRESHOLDS:"
+    for key in sorted( thresholds ):
+        print "    %r : %r," % (key, thresholds[key])
+    print
+
+    orderingEffect( verbose=True )
+    validationCost( verbose=True )
+    weightedCost( verbose=True )
+    algebraicCost( verbose=True )
+
+#end
\ No newline at end of file
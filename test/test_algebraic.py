@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the algebraic matching engine.
+
+This module implements a series of unit tests for matching_number,
+has_perfect_matching and algebraic_matching. The sizes and matchings are
+compared against the maximum matching NetworkX finds for the same graph.
+
+:filename test_algebraic.py
+"""
+
+# Necessary imports
+import matching as mv
+import structures
+
+import networkx as nx
+import numpy
+import random
+import unittest
+
+class AlgebraicTests( unittest.TestCase ):
+    """
+    Unit tests for the algebraic matching engine.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def assertMatching(self, g, mate):
+        """ Check that mate is a matching of g. """
+        for v, w in mate.iteritems():
+            self.assertTrue( g.has_edge(v, w) and v != w )
+            self.assertEqual( mate[w], v )
+
+    def test010_random_graphs(self):
+        """ Sizes and recovered matchings of sparse and dense random graphs. """
+        for seed in range(60):
+            rnd = random.Random(seed)
+            g = nx.gnp_random_graph(rnd.randint(0, 90), rnd.choice([0.03, 0.1, 0.3, 0.8]), seed=seed)
+            if len( g ) and seed % 5 == 0:
+                g.add_edge( 0, 0 )
+            size = len( nx.max_weight_matching(g, True) ) / 2
+            self.assertEqual( mv.matching_number(g, seed=seed), size )
+            self.assertEqual( mv.matching_number(g, seed=seed, exact=True), size )
+            mate = mv.algebraic_matching(g, seed=seed)
+            self.assertMatching( g, mate )
+            self.assertEqual( len( mate ) / 2, size )
+            self.assertEqual( mv.has_perfect_matching(g, seed=seed), 2 * size == len( g ) )
+
+    def test020_dense_families(self):
+        """ Complete graphs and dense random graphs take a single trial. """
+        for g in [ nx.complete_graph(200), nx.complete_graph(201),
+                   nx.gnp_random_graph(200, 0.8, seed=1) ]:
+            report = { }
+            self.assertEqual( mv.matching_number(g, report=report), len( g ) / 2 )
+            self.assertEqual( report, {'trials': 1, 'certain': True} )
+        self.assertTrue( mv.has_perfect_matching(nx.complete_graph(200)) )
+        self.assertFalse( mv.has_perfect_matching(nx.complete_graph(201)) )
+        self.assertFalse( mv.has_perfect_matching(nx.star_graph(3)) )
+
+    def test030_trials_and_exact(self):
+        """ Deficient graphs take several trials unless made exact. """
+        g = nx.star_graph(20)
+        g.add_edges_from( (v, v + 1) for v in range(30, 60, 2) )
+        report = { }
+        self.assertEqual( mv.matching_number(g, error=1e-12, seed=1, report=report), 16 )
+        self.assertTrue( report['trials'] > 1 )
+        self.assertFalse( report['certain'] )
+        self.assertEqual( mv.matching_number(g, seed=1, exact=True, report=report), 16 )
+        self.assertTrue( report['certain'] )
+
+    def test040_output_and_errors(self):
+        """ Array and compact forms, compact graphs and bad arguments. """
+        g = nx.relabel_nodes( nx.path_graph(6), dict( enumerate( 'abcdef' ) ) )
+        mate = mv.algebraic_matching(g, seed=2)
+        self.assertEqual( mate, {'a': 'b', 'b': 'a', 'c': 'd', 'd': 'c', 'e': 'f', 'f': 'e'} )
+        compact = structures.CompactGraph.from_networkx( g )
+        self.assertEqual( mv.algebraic_matching(compact, output='compact').to_dict(), mate )
+        array = mv.algebraic_matching(compact, output='array')
+        self.assertEqual( sorted( array ), sorted( mv.max_cardinality_matching(compact, output='array') ) )
+        self.assertEqual( mv.matching_number(nx.Graph()), 0 )
+        self.assertRaises( ValueError, mv.matching_number, g, 0 )
+        self.assertRaises( ValueError, mv.algebraic_matching, g, output='list' )
+
+    def test050_field_arithmetic(self):
+        """ Inverses of random matrices over the field are exact. """
+        algebraic = mv.algebraic
+        for n in [1, 5, 64, 65, 150]:
+            A = numpy.random.RandomState(n).randint(0, algebraic.PRIME, size=(n, n)).astype(float)
+            X = algebraic.inverse( A )
+            self.assertTrue( numpy.array_equal( algebraic.product( A, X ), numpy.eye( n ) ) )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from AlgebraicTests.
+    """
+
+    tests = ['test010_random_graphs', 'test020_dense_families']
+    return unittest.TestSuite( map(AlgebraicTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from AlgebraicTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( AlgebraicTests )
+
+#end
\ No newline at end of file
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the fingerprint-keyed matching cache.
+
+This module implements a series of unit tests for graph_fingerprint,
+EdgeFingerprint, is_matching and MatchingCache. The disk tier is kept in a
+temporary directory, and the matchings served by each tier are compared
+against the NetworkX matching.
+
+:filename test_cache.py
+"""
+
+# Necessary imports
+import matching as mv
+import test_driver as td
+import structures
+from matching.cache import is_matching
+
+import networkx as nx
+import numpy as np
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+class MatchingCacheTests( unittest.TestCase ):
+    """
+    Unit tests for the fingerprint-keyed matching cache.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree( self.directory )
+
+    def test010_fingerprint(self):
+        """ Fingerprint ignores the order of vertices, edges and end points. """
+        rnd = random.Random(1)
+        for seed in range(20):
+            g = nx.gnp_random_graph(30, 0.2, seed=seed)
+            g.add_edge( 3, 3 )
+            if seed % 2:
+                g = nx.relabel_nodes( g, dict( (v, ('v', v)) for v in g ) )
+            nodes, edges = g.nodes(), g.edges()
+            rnd.shuffle( nodes )
+            rnd.shuffle( edges )
+            h = nx.Graph()
+            h.add_nodes_from( nodes )
+            h.add_edges_from( (v, u) for u, v in edges )
+            stream = mv.EdgeFingerprint()
+            for v in nodes:
+                stream.add_node( v )
+            for u, v in edges:
+                stream.add_edge( u, v )
+            key = mv.graph_fingerprint( g )
+            self.assertEqual( mv.graph_fingerprint( h ), key )
+            self.assertEqual( stream.hexdigest(), key )
+            h.remove_edge( *edges[0] )
+            self.assertNotEqual( mv.graph_fingerprint( h ), key )
+        G = structures.CompactGraph.from_networkx( nx.path_graph(5) )
+        self.assertEqual( mv.graph_fingerprint( structures.CompactGraph(G.offsets, G.targets) ),
+                          mv.graph_fingerprint( nx.path_graph(5) ) )
+
+    def test020_is_matching(self):
+        """ Validity check rejects asymmetric matchings and non-edges. """
+        G = structures.CompactGraph.from_networkx( nx.path_graph(4) )
+        self.assertTrue( is_matching( G, np.array( [1, 0, 3, 2] ) ) )
+        self.assertTrue( is_matching( G, np.array( [-1, 2, 1, -1] ) ) )
+        self.assertFalse( is_matching( G, np.array( [1, 0, 3] ) ) )
+        self.assertFalse( is_matching( G, np.array( [1, 2, 1, -1] ) ) )
+        self.assertFalse( is_matching( G, np.array( [3, -1, -1, 0] ) ) )
+        self.assertFalse( is_matching( G, np.array( [0, -1, -1, -1] ) ) )
+        self.assertFalse( is_matching( G, np.array( [1, 0, 4, -2] ) ) )
+
+    def test030_memory_tier(self):
+        """ Repeated graphs are served from memory, least recent evicted. """
+        cache = mv.MatchingCache(size=2)
+        graphs = [ nx.gnp_random_graph(40, 0.1, seed=seed) for seed in range(3) ]
+        report = { }
+        for g in graphs:
+            td.assertMaximum( self, g, cache.match(g, report=report) )
+            self.assertEqual( report['source'], 'matcher' )
+        self.assertEqual( len( cache ), 2 )
+        h = nx.Graph()
+        h.add_nodes_from( reversed( graphs[2].nodes() ) )
+        h.add_edges_from( graphs[2].edges() )
+        td.assertMaximum( self, h, cache.match(h, report=report) )
+        self.assertEqual( report['source'], 'memory' )
+        cache.match(graphs[0], report=report)
+        self.assertEqual( report['source'], 'matcher' )
+        self.assertEqual( (cache.hits, cache.misses), (1, 4) )
+
+    def test040_disk_tier(self):
+        """ Matchings spill to disk, are shared and evicted by size. """
+        cache = mv.MatchingCache(size=0, directory=self.directory)
+        g = nx.relabel_nodes( nx.barbell_graph(6, 3), lambda v: 'v%d' % v )
+        G = structures.CompactGraph.from_networkx( g )
+        mate = cache.match(G, output='array')
+        other = mv.MatchingCache(directory=self.directory)
+        report = { }
+        result = other.match(g, output='compact', report=report)
+        self.assertEqual( report['source'], 'disk' )
+        self.assertEqual( list( result.mate ), list( mate ) )
+        td.assertMaximum( self, g, result.to_dict() )
+
+        files = os.listdir( self.directory )
+        small = mv.MatchingCache(directory=self.directory,
+                                 disk_size=os.path.getsize( os.path.join( self.directory, files[0] ) ))
+        small.match( nx.path_graph(3) )
+        self.assertEqual( len( os.listdir( self.directory ) ), 1 )
+        self.assertNotEqual( os.listdir( self.directory ), files )
+
+    def test050_rejected_entries(self):
+        """ Cached matchings failing the check are dropped and recomputed. """
+        cache = mv.MatchingCache(directory=self.directory)
+        g = nx.petersen_graph()
+        cache.match( g )
+        key = mv.graph_fingerprint( g )
+        cache.memory[key].mate[:] = [ 5, 6, 7, 8, 9, 0, 1, 2, 3, 4 ][::-1]
+        report = { }
+        td.assertMaximum( self, g, cache.match(g, report=report) )
+        self.assertEqual( report['source'], 'matcher' )
+        self.assertEqual( cache.rejected, 1 )
+        with open( os.path.join( self.directory, key + '.mate' ), 'wb' ) as f:
+            f.write( 'garbage' )
+        other = mv.MatchingCache(directory=self.directory)
+        td.assertMaximum( self, g, other.match(g, report=report) )
+        self.assertEqual( report['source'], 'matcher' )
+        self.assertRaises( ValueError, cache.match, g, 'array' )
+        self.assertRaises( ValueError, mv.MatchingCache, -1 )
+
+    def test060_results_not_aliased(self):
+        """ Modifying a returned matching leaves the cached one intact. """
+        cache = mv.MatchingCache(directory=self.directory)
+        G = structures.CompactGraph.from_networkx( nx.petersen_graph() )
+        cache.match(G, output='array')[:] = -1
+        mate = cache.match(G, output='array')
+        self.assertTrue( is_matching( G, mate ) )
+        self.assertEqual( sum( 1 for w in mate if w >= 0 ), 10 )
+        cache.match(G, output='compact').mate[:] = -1
+        self.assertEqual( list( cache.match(G, output='array') ), list( mate ) )
+        self.assertEqual( (cache.hits, cache.rejected), (3, 0) )
+
+        # Writes track the disk size instead of listing the directory
+        listdir, os.listdir = os.listdir, None
+        try:
+            cache.match( nx.path_graph(4) )
+        finally:
+            os.listdir = listdir
+        self.assertEqual( cache.disk_used, sum( os.path.getsize( os.path.join( self.directory, name ) )
+                                                for name in os.listdir( self.directory ) ) )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from MatchingCacheTests.
+    """
+
+    tests = ['test010_fingerprint', 'test030_memory_tier']
+    return unittest.TestSuite( map(MatchingCacheTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from MatchingCacheTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( MatchingCacheTests )
+
+#end
\ No newline at end of file
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the closed-form matchings of structured graphs.
+
+This module implements a series of unit tests for closed_form_matching and
+for the closed-form engine of maximum_matching. Each family is recognized
+on the graphs generated by NetworkX, and the matchings are compared against
+the NetworkX matching.
+
+:filename test_closed_form.py
+"""
+
+# Necessary imports
+import matching as mv
+
+import networkx as nx
+import unittest
+
+class ClosedFormTests( unittest.TestCase ):
+    """
+    Unit tests for the closed-form matchings of structured graphs.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def assertFamily(self, g, family):
+        """ Check that g is matched in closed form as the family given. """
+        report = { }
+        mate1 = mv.maximum_matching(g, report=report)
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( report['families'], {family: 1} )
+        self.assertEqual( len(mate1), len(mate2) )
+        for v, w in mate1.iteritems():
+            self.assertTrue( g.has_edge(v, w) )
+            self.assertEqual( mate1[w], v )
+
+    def test010_trees(self):
+        """ Paths, stars and trees. """
+        for n in range(1, 12):
+            self.assertFamily( nx.path_graph(n), 'tree' )
+            self.assertFamily( nx.star_graph(n), 'tree' )
+        for h in range(1, 6):
+            self.assertFamily( nx.balanced_tree(3, h), 'tree' )
+
+    def test020_complete_graphs(self):
+        """ Complete graphs of even and odd order. """
+        for n in range(3, 15):
+            self.assertFamily( nx.complete_graph(n), 'complete' )
+
+    def test030_complete_bipartite_graphs(self):
+        """ Complete bipartite graphs with unequal sides. """
+        for a in range(2, 6):
+            for b in range(2, 8):
+                self.assertFamily( nx.complete_bipartite_graph(a, b), 'complete_bipartite' )
+
+    def test040_cycles(self):
+        """ Cycles of even and odd length. """
+        for n in range(5, 15):
+            self.assertFamily( nx.cycle_graph(n), 'cycle' )
+
+    def test050_wheels(self):
+        """ Wheels with even and odd rims. """
+        for n in range(5, 15):
+            self.assertFamily( nx.wheel_graph(n), 'wheel' )
+
+    def test060_ladders(self):
+        """ Ladders. """
+        for n in range(3, 12):
+            self.assertFamily( nx.ladder_graph(n), 'ladder' )
+
+    def test070_hypercubes(self):
+        """ Hypercubes. """
+        for d in range(3, 8):
+            self.assertFamily( nx.hypercube_graph(d), 'hypercube' )
+
+    def test080_forest(self):
+        """ Forest of several families. """
+        g = nx.disjoint_union_all([nx.path_graph(5), nx.cycle_graph(7),
+                                   nx.wheel_graph(9), nx.star_graph(4)])
+        mate1 = mv.closed_form_matching( g )
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+
+    def test090_unrecognized(self):
+        """ Graphs resembling a family are not matched in closed form. """
+        for g in [nx.petersen_graph(), nx.circular_ladder_graph(5),
+                  nx.disjoint_union(nx.path_graph(3), nx.barbell_graph(4, 1))]:
+            self.assertTrue( mv.closed_form_matching( g ) is None )
+
+    def test100_lookalike_wheel(self):
+        """ Hub over two rims has the degrees of a wheel. """
+        g = nx.disjoint_union(nx.cycle_graph(5), nx.cycle_graph(5))
+        g.add_edges_from( (10, v) for v in range(10) )
+        report = { }
+        mate1 = mv.maximum_matching(g, report=report)
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+        self.assertFalse( 'wheel' in report['families'] )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from ClosedFormTests.
+    """
+
+    tests = ['test060_ladders', 'test070_hypercubes']
+    return unittest.TestSuite( map(ClosedFormTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from ClosedFormTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( ClosedFormTests )
+
+#end
\ No newline at end of file
@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the compact graph representation and its file format.
+
+This module implements a series of unit tests for CompactGraph, save_graph
+and load_graph. The graphs are written to a temporary directory, loaded
+back with and without memory mapping, and matched with
+max_cardinality_matching.
+
+:filename test_compact_graph.py
+"""
+
+# Necessary imports
+import matching as mv
+import structures
+
+import multiprocessing
+import networkx as nx
+import numpy as np
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+def matchingSize(G):
+    """ Return the size of a maximum matching of G, for worker processes. """
+    return len( mv.max_cardinality_matching( G ) ) / 2
+
+class CompactGraphTests( unittest.TestCase ):
+    """
+    Unit tests for the compact graph representation.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'graph.mvg')
+
+    def tearDown(self):
+        shutil.rmtree( self.directory )
+
+    def test010_from_networkx(self):
+        """ Compiled adjacency matches the NetworkX graph. """
+        g = nx.petersen_graph()
+        c = structures.CompactGraph.from_networkx( g )
+        self.assertEqual( len(c), len(g) )
+        self.assertEqual( c.number_of_edges(), g.number_of_edges() )
+        for v in c.nodes_iter():
+            self.assertEqual( sorted( c.label(u) for u in c.neighbors(v) ),
+                              sorted( g.neighbors( c.label(v) ) ) )
+
+    def test020_roundtrip(self):
+        """ Saved and loaded graph has the same arrays and labels. """
+        g = nx.grid_2d_graph(7, 9)
+        c = structures.CompactGraph.from_networkx( g )
+        structures.save_graph(c, self.path)
+        for mapped in (True, False):
+            l = structures.load_graph(self.path, mapped)
+            self.assertEqual( list(l.offsets), list(c.offsets) )
+            self.assertEqual( list(l.targets), list(c.targets) )
+            self.assertEqual( l.labels, c.labels )
+            self.assertEqual( l.number_of_edges(), g.number_of_edges() )
+
+    def test030_selfloops(self):
+        """ Self-loops are counted once and ignored by the matcher. """
+        g = nx.path_graph(5)
+        g.add_edges_from([(0,0),(3,3)])
+        structures.save_graph(g, self.path)
+        l = structures.load_graph( self.path )
+        self.assertEqual( l.number_of_edges(), g.number_of_edges() )
+        self.assertEqual( len( mv.max_cardinality_matching( l ) ), 4 )
+
+    def test040_empty(self):
+        """ Empty graph. """
+        structures.save_graph(nx.Graph(), self.path)
+        l = structures.load_graph( self.path )
+        self.assertEqual( len(l), 0 )
+        self.assertEqual( mv.max_cardinality_matching( l ), { } )
+
+    def test050_matching_labels(self):
+        """ Matching a loaded graph returns a mate keyed by the labels. """
+        g = nx.barbell_graph(9, 2)
+        structures.save_graph(g, self.path)
+        l = structures.load_graph( self.path )
+        mate1 = mv.max_cardinality_matching( l )
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+        for v, w in mate1.iteritems():
+            self.assertTrue( g.has_edge(v, w) )
+            self.assertEqual( mate1[w], v )
+
+    def test060_graph_unmodified(self):
+        """ The matcher does not write into the input graph. """
+        g = nx.petersen_graph()
+        mv.max_cardinality_matching( g )
+        for u, v, d in g.edges_iter( data=True ):
+            self.assertEqual( d, { } )
+
+    def test070_pickle_by_path(self):
+        """ A mapped graph is pickled by its path and remapped. """
+        structures.save_graph(nx.cycle_graph(11), self.path)
+        l = structures.load_graph( self.path )
+        data = pickle.dumps(l, pickle.HIGHEST_PROTOCOL)
+        self.assertTrue( len(data) < 200 )
+        self.assertEqual( pickle.loads(data).path, l.path )
+
+    def test080_shared_workers(self):
+        """ Worker processes share one mapped file. """
+        structures.save_graph(nx.ladder_graph(50), self.path)
+        l = structures.load_graph( self.path )
+        pool = multiprocessing.Pool(2)
+        try:
+            sizes = pool.map(matchingSize, [l] * 4)
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual( sizes, [50] * 4 )
+
+    def test090_bad_file(self):
+        """ Files in another format are rejected. """
+        with open(self.path, 'wb') as f:
+            f.write( 'not a graph' * 10 )
+        self.assertRaises( ValueError, structures.load_graph, self.path )
+
+    def test100_scipy_sparse(self):
+        """ SciPy CSR matrix is matched through its own index arrays. """
+        g = nx.barbell_graph(9, 2)
+        a = nx.to_scipy_sparse_matrix(g, format='csr')
+        c = structures.CompactGraph.from_scipy_sparse( a )
+        self.assertTrue( c.targets is a.indices )
+        self.assertEqual( c.number_of_edges(), g.number_of_edges() )
+        mate1 = mv.max_cardinality_matching( a )
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+
+    def test105_scipy_sparse_checks(self):
+        """ Repeated entries and loops are dropped, asymmetric matrices rejected. """
+        import scipy.sparse
+        rows, cols = [0, 1, 1, 2, 0, 2, 2], [1, 0, 2, 1, 1, 2, 0]
+        a = scipy.sparse.csr_matrix( (np.ones(7), (rows, cols)), shape=(3, 3) )
+        self.assertRaises( ValueError, structures.CompactGraph.from_scipy_sparse, a )
+        a = scipy.sparse.coo_matrix( (np.ones(6), (rows[:-1], cols[:-1])), shape=(3, 3) )
+        c = structures.CompactGraph.from_scipy_sparse( a )
+        self.assertEqual( [ sorted( c.neighbors(v) ) for v in c.nodes_iter() ], [[1], [0, 2], [1]] )
+        self.assertEqual( c.number_of_edges(), 2 )
+        self.assertEqual( len( mv.max_cardinality_matching( c ) ), 2 )
+
+    def test110_edge_array(self):
+        """ NumPy edge array with repeated edges and self-loops. """
+        g = nx.gnp_random_graph(40, 0.1)
+        edges = np.array( g.edges() + g.edges()[:5] + [(3,3)], np.int64 )
+        c = structures.CompactGraph.from_edge_array(edges, 40)
+        self.assertEqual( len(c), 40 )
+        self.assertEqual( c.number_of_edges(), g.number_of_edges() )
+        for v in c.nodes_iter():
+            self.assertEqual( sorted( c.neighbors(v) ), sorted( g.neighbors(v) ) )
+        mate1 = mv.max_cardinality_matching( edges )
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+        self.assertRaises( ValueError, structures.CompactGraph.from_edge_array, edges, 39 )
+        self.assertRaises( ValueError, structures.CompactGraph.from_edge_array, -edges, 40 )
+
+    def test120_array_output(self):
+        """ Mate array output with -1 for exposed vertices. """
+        g = nx.lollipop_graph(7, 4)
+        edges = np.array( g.edges() )
+        mate = mv.max_cardinality_matching(edges, output='array')
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate), len(g) )
+        self.assertEqual( np.count_nonzero(mate >= 0), len(mate2) )
+        for v, w in enumerate(mate):
+            if w >= 0:
+                self.assertEqual( mate[w], v )
+                self.assertTrue( g.has_edge(v, w) )
+
+    def test130_array_output_networkx(self):
+        """ Mate array output is refused for NetworkX graphs. """
+        self.assertRaises( ValueError, mv.max_cardinality_matching,
+                           nx.path_graph(4), 'array' )
+        self.assertRaises( TypeError, mv.max_cardinality_matching, [(0,1)] )
+
+    def test140_vertex_orders(self):
+        """ Each ordering renumbers every vertex and keeps the edges. """
+        g = nx.disjoint_union(nx.grid_2d_graph(5, 6), nx.star_graph(4))
+        c = structures.CompactGraph.from_networkx( g )
+        for method in structures.ORDERINGS:
+            order = structures.vertex_order(c, method)
+            self.assertEqual( sorted( order ), range( len(g) ) )
+            p = c.permuted( order )
+            self.assertEqual( p.number_of_edges(), g.number_of_edges() )
+            for v in p.nodes():
+                self.assertEqual( sorted( p.label(u) for u in p.neighbors(v) ),
+                                  sorted( g.neighbors( p.label(v) ) ) )
+        self.assertRaises( ValueError, structures.vertex_order, c, 'random' )
+        self.assertRaises( ValueError, c.permuted, [0] * len(g) )
+
+    def test150_reordered_matching(self):
+        """ Matching of a renumbered graph is mapped back to its vertices. """
+        g = nx.gnp_random_graph(60, 0.05, seed=33)
+        c = structures.CompactGraph.from_edge_array( np.array( g.edges() ), len(g) )
+        mate2 = nx.max_weight_matching( g, True )
+        for method in structures.ORDERINGS:
+            mate = mv.max_cardinality_matching(c, output='array', reorder=method)
+            self.assertEqual( np.count_nonzero(mate >= 0), len(mate2) )
+            for v, w in enumerate(mate):
+                if w >= 0:
+                    self.assertEqual( mate[w], v )
+                    self.assertTrue( g.has_edge(v, w) )
+            mate1 = mv.max_cardinality_matching(g, reorder=method, initial={0: mate2[0], mate2[0]: 0})
+            self.assertEqual( len(mate1), len(mate2) )
+        self.assertRaises( ValueError, mv.max_cardinality_matching, g, reorder='random' )
+
+    def test160_vertex_mask(self):
+        """ Matching of an induced subgraph selected by a vertex mask. """
+        g = nx.gnp_random_graph(50, 0.08, seed=38)
+        c = structures.CompactGraph.from_networkx( g )
+        for k in range(3):
+            mask = np.arange(50) % 3 != k
+            h = g.subgraph( [v for v in g.nodes() if mask[v]] )
+            for dense in (False, True):
+                mate1 = mv.max_cardinality_matching(c, dense=dense, vertex_mask=mask)
+                mate2 = nx.max_weight_matching( h, True )
+                self.assertEqual( len(mate1), len(mate2) )
+                for v, w in mate1.iteritems():
+                    self.assertTrue( h.has_edge(v, w) )
+
+    def test170_edge_mask_warm_start(self):
+        """ Edge mask with the matching of the whole graph as a warm start. """
+        g = nx.grid_2d_graph(6, 7)
+        c = structures.CompactGraph.from_networkx( g )
+        rows = np.repeat( np.arange(len(c)), np.diff(c.offsets) )
+        mask = np.array( [ sum( c.label(u) ) * sum( c.label(v) ) % 5 != 0
+                           for u, v in zip(rows, c.targets) ] )
+        h = nx.Graph( [ (c.label(u), c.label(v)) for u, v, keep in zip(rows, c.targets, mask) if keep ] )
+        base = mv.max_cardinality_matching(c, output='compact')
+        mate2 = nx.max_weight_matching( h, True )
+        for initial in (base, base.mate):
+            mate1 = mv.max_cardinality_matching(c, edge_mask=mask, initial=initial)
+            self.assertEqual( len(mate1), len(mate2) )
+            for v, w in mate1.iteritems():
+                self.assertTrue( h.has_edge(v, w) )
+
+    def test180_mask_errors(self):
+        """ Masks of the wrong size or on NetworkX graphs are refused. """
+        g = nx.petersen_graph()
+        c = structures.CompactGraph.from_networkx( g )
+        self.assertRaises( ValueError, mv.max_cardinality_matching, c, vertex_mask=[True] )
+        self.assertRaises( ValueError, mv.max_cardinality_matching, c, edge_mask=[True] * 10 )
+        self.assertRaises( ValueError, mv.max_cardinality_matching, g, vertex_mask=[True] * 10 )
+        self.assertRaises( ValueError, mv.max_cardinality_matching, c,
+                           vertex_mask=[True] * 10, reorder='bfs' )
+
+    def test190_sibling_blooms(self):
+        """ Paths through sibling blooms and across the sides of a bloom. """
+        rows = [ [[10], [8], [9], [6], [7, 6], [8, 10, 20, 7], [4, 3], [5, 9, 4], [5, 1], [7, 2],
+                  [5, 0], [32, 17, 13], [22, 33], [27, 11], [26, 33], [18, 20], [33, 25],
+                  [11, 24, 20], [30, 15], [28, 21, 25], [15, 5, 28, 17], [31, 19], [12, 32],
+                  [26, 29], [17], [19, 16], [28, 14, 23], [13, 31], [26, 20, 19], [30, 33, 23],
+                  [29, 18], [21, 27], [11, 22], [16, 29, 14, 12]],
+                 [[9, 5], [12, 11, 3, 7], [5, 4], [11, 1], [2, 6], [2, 0], [4], [14, 1], [11, 9],
+                  [14, 0, 8], [14, 13], [1, 8, 3], [1, 15], [10], [15, 10, 7, 9], [12, 14]],
+                 [[17, 16], [18, 23], [21, 9], [8, 11], [12, 23], [20, 15, 17], [14, 13], [11, 22],
+                  [3, 10], [15, 2], [16, 8], [3, 7], [4, 21], [6, 23], [19, 6], [9, 19, 5],
+                  [10, 18, 0], [0, 5], [1, 19, 16], [18, 15, 14], [5], [2, 12], [7], [4, 13, 1]] ]
+        initials = [ {}, {0: 5, 5: 0, 10: 14, 14: 10}, {} ]
+        for row, initial in zip( rows, initials ):
+            offsets = np.cumsum( [0] + map(len, row) )
+            c = structures.CompactGraph( offsets, np.concatenate( row ) )
+            g = nx.Graph( (v, u) for v in range(len(row)) for u in row[v] )
+            mate1 = mv.max_cardinality_matching( c, initial=initial, validate='full' )
+            mate2 = nx.max_weight_matching( g, True )
+            self.assertEqual( len(mate1), len(mate2) )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from CompactGraphTests.
+    """
+
+    tests = ['test020_roundtrip', 'test050_matching_labels']
+    return unittest.TestSuite( map(CompactGraphTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from CompactGraphTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( CompactGraphTests )
+
+#end
\ No newline at end of file
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the classification of vertices and edges by maximum matchings.
+
+This module implements a series of unit tests for matching_decomposition.
+The class of every vertex and edge is checked against the size of the
+maximum matchings NetworkX finds once the vertex, the edge or both its end
+points are removed.
+
+:filename test_decomposition.py
+"""
+
+# Necessary imports
+import matching as mv
+import structures
+
+import networkx as nx
+import random
+import unittest
+
+class DecompositionTests( unittest.TestCase ):
+    """
+    Unit tests for the classification of vertices and edges by maximum matchings.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def size(self, g):
+        """ Return the size of a maximum matching of g. """
+        return len( nx.max_weight_matching(g, True) ) / 2
+
+    def assertClasses(self, g, decomposition):
+        """ Check every class and what-if answer against removals from g. """
+        size = self.size( g )
+        self.assertEqual( decomposition.size, size )
+        for v in g:
+            h = g.copy()
+            h.remove_node( v )
+            smaller = self.size( h ) < size
+            self.assertEqual( decomposition.size_without_vertex(v), self.size( h ) )
+            expected = 'every' if smaller else 'some' if any( u != v for u in g[v] ) else 'none'
+            self.assertEqual( decomposition.vertex_class(v), expected )
+        for u, v in g.edges_iter():
+            h = g.copy()
+            h.remove_edge( u, v )
+            self.assertEqual( decomposition.size_without_edge(u, v), self.size( h ) )
+            if u == v:
+                expected = 'none'
+            elif self.size( h ) < size:
+                expected = 'every'
+            else:
+                h.remove_nodes_from( [u, v] )
+                expected = 'some' if self.size( h ) == size - 1 else 'none'
+            self.assertEqual( decomposition.edge_class(u, v), expected )
+            self.assertEqual( decomposition.edge_class(v, u), expected )
+
+    def test010_random_graphs(self):
+        """ Random general and bipartite graphs against removals. """
+        for seed in range(150):
+            rnd = random.Random(seed)
+            n = rnd.randint(1, 16)
+            g = nx.gnp_random_graph(n, rnd.choice([0.15, 0.3, 0.5]), seed=seed)
+            if seed % 3 == 0:
+                g.remove_edges_from( [ (u, v) for u, v in g.edges() if (u + v) % 2 == 0 ] )
+            if seed % 5 == 0:
+                g.add_edge( 0, 0 )
+            self.assertClasses( g, mv.matching_decomposition(g) )
+
+    def test020_gallai_edmonds(self):
+        """ The decomposition of a path, a triangle and a star. """
+        g = nx.path_graph(4)
+        g.add_edges_from( [ (4, 5), (5, 6), (6, 4), (7, 8), (7, 9), (7, 10) ] )
+        g.add_node( 11 )
+        decomposition = mv.matching_decomposition(g)
+        self.assertEqual( decomposition.gallai_edmonds(),
+                          (set([4, 5, 6, 8, 9, 10, 11]), set([7]), set([0, 1, 2, 3])) )
+        self.assertEqual( decomposition.size, 4 )
+        classes = decomposition.edge_classes()
+        self.assertEqual( [ classes[e] for e in [ (0, 1), (1, 2), (2, 3), (4, 5), (7, 8) ] ],
+                          [ 'every', 'none', 'every', 'some', 'some' ] )
+        self.assertEqual( [ decomposition.vertex_class(v) for v in [ 0, 4, 7, 8, 11 ] ],
+                          [ 'every', 'some', 'every', 'some', 'none' ] )
+        self.assertEqual( decomposition.size_without_vertex(7), 3 )
+        self.assertEqual( decomposition.size_without_vertex(8), 4 )
+        self.assertEqual( decomposition.size_without_edge(1, 2), 4 )
+
+    def test030_larger_graphs(self):
+        """ Larger graphs with a perfect matching, steered and searched. """
+        for g in [ nx.gnp_random_graph(40, 0.15, seed=1), nx.complete_graph(12),
+                   nx.random_regular_graph(3, 30, seed=2), nx.ladder_graph(10) ]:
+            self.assertClasses( g, mv.matching_decomposition(g) )
+
+    def test040_inputs(self):
+        """ Compact graphs, given matchings, vertices only and bad matchings. """
+        g = nx.relabel_nodes( nx.cycle_graph(5), dict( enumerate( 'abcde' ) ) )
+        g.add_edge( 'e', 'f' )
+        mate = mv.max_cardinality_matching(g)
+        decomposition = mv.matching_decomposition(g, mate)
+        self.assertEqual( decomposition.mate, mate )
+        self.assertClasses( g, decomposition )
+
+        compact = structures.CompactGraph.from_networkx( g )
+        self.assertEqual( mv.matching_decomposition(compact).edge_classes(),
+                          decomposition.edge_classes() )
+        vertices = mv.matching_decomposition(g, edges=False)
+        self.assertEqual( vertices.vertex_classes(), decomposition.vertex_classes() )
+        self.assertRaises( KeyError, vertices.edge_class, 'a', 'b' )
+
+        self.assertRaises( ValueError, mv.matching_decomposition, g, {'a': 'b', 'b': 'a'} )
+        self.assertRaises( ValueError, mv.matching_decomposition, g, {'a': 'c', 'c': 'a'} )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from DecompositionTests.
+    """
+
+    tests = ['test010_random_graphs', 'test020_gallai_edmonds']
+    return unittest.TestSuite( map(DecompositionTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from DecompositionTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( DecompositionTests )
+
+#end
\ No newline at end of file
@@ -13,6 +13,23 @@ the entire set of tests in the /test directory.
 import test_matching_simple
 import test_matching_compound
 import test_matching_random
+import test_compact_graph
+import test_mate_array
+import test_matching_dense
+import test_matching_selector
+import test_closed_form
+import test_matching_threads
+import test_implicit_graph
+import test_geometric
+import test_matching_weighted
+import test_streaming
+import test_window
+import test_decomposition
+import test_enumeration
+import test_algebraic
+import test_estimation
+import test_cache
+import test_offload
 
 import matplotlib.pyplot as plt
 import networkx as nx
@@ -43,6 +60,21 @@ def showGraph(G, mate, label=""):
     plt.axis('off')
     plt.show()
 
+def assertMaximum(test, g, mate1):
+    """ Check that mate1 is a maximum matching of g.
+    
+    :param test - the unittest.TestCase making the check
+    :param g - the NetworkX graph given
+    :param mate1 - the dictionary of matched edges
+    :return Nothing
+    """
+    
+    mate2 = nx.max_weight_matching( g, True )
+    test.assertEqual( len(mate1), len(mate2) )
+    for v, w in mate1.iteritems():
+        test.assertTrue( g.has_edge(v, w) )
+        test.assertEqual( mate1[w], v )
+
 # Main function
 if __name__ == "__main__":
     
@@ -51,6 +83,23 @@ if __name__ == "__main__":
         matchingSimpleSuite = test_matching_simple.suiteCase()
         matchingCompoundSuite = test_matching_compound.suiteFull()
         matchingRandomSuite = test_matching_random.suiteCase()
+        compactGraphSuite = test_compact_graph.suiteCase()
+        mateArraySuite = test_mate_array.suiteCase()
+        matchingDenseSuite = test_matching_dense.suiteCase()
+        matchingSelectorSuite = test_matching_selector.suiteCase()
+        closedFormSuite = test_closed_form.suiteCase()
+        matchingThreadsSuite = test_matching_threads.suiteCase()
+        implicitGraphSuite = test_implicit_graph.suiteCase()
+        geometricSuite = test_geometric.suiteCase()
+        matchingWeightedSuite = test_matching_weighted.suiteCase()
+        streamingSuite = test_streaming.suiteCase()
+        windowSuite = test_window.suiteCase()
+        decompositionSuite = test_decomposition.suiteCase()
+        enumerationSuite = test_enumeration.suiteCase()
+        algebraicSuite = test_algebraic.suiteCase()
+        estimationSuite = test_estimation.suiteCase()
+        cacheSuite = test_cache.suiteCase()
+        offloadSuite = test_offload.suiteCase()
         fullSuite = unittest.TestSuite( [matchingSimpleSuite] )
         unittest.TextTestRunner( verbosity=2 ).run( fullSuite )
         
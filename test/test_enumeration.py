@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the enumeration of maximum matchings.
+
+This module implements a series of unit tests for iter_max_matchings. The
+matchings generated for small graphs are compared against all maximum
+matchings found by trying every set of edges.
+
+:filename test_enumeration.py
+"""
+
+# Necessary imports
+import matching as mv
+import structures
+
+import itertools
+import networkx as nx
+import random
+import unittest
+
+class EnumerationTests( unittest.TestCase ):
+    """
+    Unit tests for the enumeration of maximum matchings.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def maximumMatchings(self, g):
+        """ Return the set of maximum matchings of g, each a frozenset of edges. """
+        edges = [ frozenset( e ) for e in g.edges_iter() if e[0] != e[1] ]
+        for size in range(len( g ) / 2, -1, -1):
+            found = set( frozenset( pairs ) for pairs in itertools.combinations( edges, size )
+                         if len( frozenset.union( frozenset(), *pairs ) ) == 2 * size )
+            if found:
+                return found
+
+    def asEdges(self, mate):
+        """ Return the edges of a mate dictionary as a frozenset. """
+        return frozenset( frozenset( (v, w) ) for v, w in mate.iteritems() )
+
+    def test010_random_graphs(self):
+        """ Every maximum matching of small random graphs exactly once. """
+        for seed in range(120):
+            rnd = random.Random(seed)
+            g = nx.gnp_random_graph(rnd.randint(0, 9), rnd.choice([0.2, 0.35, 0.5]), seed=seed)
+            if len( g ) and seed % 5 == 0:
+                g.add_edge( 0, 0 )
+            found = [ ]
+            for mate in mv.iter_max_matchings(g):
+                for v, w in mate.iteritems():
+                    self.assertTrue( g.has_edge(v, w) and v != w )
+                    self.assertEqual( mate[w], v )
+                found.append( self.asEdges( mate ) )
+            self.assertEqual( len( found ), len( set( found ) ) )
+            self.assertEqual( set( found ), self.maximumMatchings( g ) )
+
+    def test020_known_counts(self):
+        """ Complete graphs, cycles, stars and paths with known counts. """
+        count = lambda g: sum( 1 for mate in mv.iter_max_matchings(g) )
+        self.assertEqual( count( nx.complete_graph(6) ), 15 )
+        self.assertEqual( count( nx.complete_graph(5) ), 15 )
+        self.assertEqual( count( nx.cycle_graph(8) ), 2 )
+        self.assertEqual( count( nx.cycle_graph(7) ), 7 )
+        self.assertEqual( count( nx.star_graph(4) ), 4 )
+        self.assertEqual( count( nx.path_graph(10) ), 1 )
+        self.assertEqual( count( nx.Graph() ), 1 )
+
+    def test030_lazy_and_output(self):
+        """ The first matching is the one max_cardinality_matching finds. """
+        g = nx.gnp_random_graph(300, 0.03, seed=3)
+        first = itertools.islice( mv.iter_max_matchings(g), 50 )
+        found = [ self.asEdges( mate ) for mate in first ]
+        self.assertEqual( len( set( found ) ), 50 )
+        self.assertEqual( found[0], self.asEdges( mv.max_cardinality_matching(g) ) )
+
+        g = nx.relabel_nodes( nx.cycle_graph(4), dict( enumerate( 'abcd' ) ) )
+        compact = structures.CompactGraph.from_networkx( g )
+        labels = compact.labels
+        arrays = set( self.asEdges( dict( (labels[v], labels[w]) for v, w in enumerate( mate ) ) )
+                      for mate in mv.iter_max_matchings(compact, output='array') )
+        self.assertEqual( arrays, set( [ self.asEdges( {'a': 'b', 'b': 'a', 'c': 'd', 'd': 'c'} ),
+                                         self.asEdges( {'a': 'd', 'd': 'a', 'b': 'c', 'c': 'b'} ) ] ) )
+        dicts = [ mate.to_dict() for mate in mv.iter_max_matchings(g, output='compact') ]
+        self.assertEqual( sorted( dicts ), sorted( mv.iter_max_matchings(g) ) )
+        self.assertRaises( ValueError, next, mv.iter_max_matchings(g, output='list') )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from EnumerationTests.
+    """
+
+    tests = ['test010_random_graphs', 'test020_known_counts']
+    return unittest.TestSuite( map(EnumerationTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from EnumerationTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( EnumerationTests )
+
+#end
\ No newline at end of file
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the sublinear matching size estimator.
+
+This module implements a series of unit tests for estimate_matching_size
+and its random greedy oracle. The oracle is compared against the greedy
+matching built from the same ranks, and the estimates against the
+maximum matching of the same graph.
+
+:filename test_estimation.py
+"""
+
+# Necessary imports
+import matching as mv
+import structures
+from matching.estimation import RandomGreedyOracle
+
+import math
+import networkx as nx
+import random
+import unittest
+
+class EstimationTests( unittest.TestCase ):
+    """
+    Unit tests for the sublinear matching size estimator.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test010_greedy_oracle(self):
+        """ Oracle answers agree with the greedy matching of its ranks. """
+        for seed in range(40):
+            rnd = random.Random(seed)
+            g = nx.gnp_random_graph(rnd.randint(1, 50), rnd.choice([0.05, 0.2, 0.6]), seed=seed)
+            g.add_edge( 0, 0 )
+            G = structures.CompactGraph.from_networkx( g )
+            oracle = RandomGreedyOracle(G, random.Random(seed))
+            mate = [ oracle.vertex( v ) for v in xrange( len( G ) ) ]
+            greedy = [ -1 ] * len( G )
+            for rank, key in sorted( (r, k) for k, r in oracle.ranks.iteritems() ):
+                u, v = key
+                if greedy[u] < 0 and greedy[v] < 0:
+                    greedy[u], greedy[v] = v, u
+            self.assertEqual( mate, greedy )
+
+    def test020_estimate(self):
+        """ Interval holds the greedy size and bounds the maximum one. """
+        G = structures.CompactGraph.from_networkx( nx.gnp_random_graph(2000, 0.003, seed=5) )
+        size = len( mv.max_cardinality_matching(G) ) / 2
+        report = { }
+        estimate, low, high = mv.estimate_matching_size(G, samples=2000, seed=5, report=report)
+        self.assertTrue( low <= estimate <= high )
+        self.assertTrue( high - low < 0.1 * len( G ) )
+        self.assertTrue( size / 2 <= high and low <= size )
+        self.assertTrue( report['bounds'][0] <= size <= report['bounds'][1] )
+        self.assertEqual( estimate, report['matched'] * 1000.0 / 2000 )
+
+    def test030_sublinear(self):
+        """ Rows read depend on the samples, not the size of the cycle. """
+        rule = lambda v: [ (v - 1) % 1000000, (v + 1) % 1000000 ]
+        report = { }
+        G = structures.ImplicitGraph(xrange(1000000), rule, cache_size=0)
+        estimate, low, high = mv.estimate_matching_size(G, samples=200, seed=1, report=report)
+        self.assertTrue( report['rows'] < 2000 )
+        self.assertTrue( G.misses == report['rows'] )
+        self.assertTrue( low <= 500000 * (1 - math.exp(-2)) <= high )
+
+    def test040_small_and_errors(self):
+        """ Empty graphs, perfect estimates and bad arguments. """
+        self.assertEqual( mv.estimate_matching_size(nx.Graph()), (0.0, 0.0, 0.0) )
+        estimate, low, high = mv.estimate_matching_size(nx.complete_graph(2), samples=50)
+        self.assertEqual( estimate, 1.0 )
+        self.assertEqual( high, 1.0 )
+        g = nx.path_graph(4)
+        self.assertRaises( ValueError, mv.estimate_matching_size, g, 0 )
+        self.assertRaises( ValueError, mv.estimate_matching_size, g, confidence=1 )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from EstimationTests.
+    """
+
+    tests = ['test010_greedy_oracle', 'test020_estimate']
+    return unittest.TestSuite( map(EstimationTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from EstimationTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( EstimationTests )
+
+#end
\ No newline at end of file
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the matching of points within a radius.
+
+This module implements a series of unit tests for close_pairs and
+match_points. The pairs found through each spatial index are compared
+against a brute force search, and the matchings against the NetworkX
+matching of the proximity graph built from all pairs.
+
+:filename test_geometric.py
+"""
+
+# Necessary imports
+import matching as mv
+import test_driver as td
+
+import itertools
+import networkx as nx
+import numpy
+import unittest
+
+def proximityGraph(coords, radius):
+    """ Return the graph of the point pairs within radius, testing all pairs. """
+    g = nx.Graph()
+    g.add_nodes_from( range(len(coords)) )
+    for i, j in itertools.combinations( range(len(coords)), 2 ):
+        if ((coords[i] - coords[j]) ** 2).sum() <= radius * radius:
+            g.add_edge(i, j)
+    return g
+
+class GeometricTests( unittest.TestCase ):
+    """
+    Unit tests for the matching of points within a radius.
+    """
+
+    def setUp(self):
+        self.random = numpy.random.RandomState(40)
+
+    def tearDown(self):
+        pass
+
+    def test010_close_pairs(self):
+        """ Pairs found by each index, in one to three dimensions. """
+        for d in (1, 2, 3):
+            coords = self.random.rand(120, d)
+            for radius in (0.02, 0.1, 0.5):
+                edges = sorted( proximityGraph(coords, radius).edges() )
+                for index in mv.geometric.INDEXES:
+                    pairs = mv.close_pairs(coords, radius, index)
+                    self.assertEqual( sorted( map(tuple, pairs.tolist()) ), edges )
+
+    def test020_boundary_and_repeats(self):
+        """ Pairs at exactly the radius and repeated points are found. """
+        coords = numpy.array([[0, 0], [1, 0], [1, 0], [3, 0], [3, 1], [9, 9]])
+        for index in mv.geometric.INDEXES:
+            pairs = mv.close_pairs(coords, 1.0, index)
+            self.assertEqual( sorted( map(tuple, pairs.tolist()) ),
+                              [(0, 1), (0, 2), (1, 2), (3, 4)] )
+            pairs = mv.close_pairs(coords, 0.0, index)
+            self.assertEqual( pairs.tolist(), [[1, 2]] )
+
+    def test030_match_points(self):
+        """ Random points matched through each index and lazily. """
+        for seed in range(5):
+            coords = self.random.rand(150, 2)
+            g = proximityGraph(coords, 0.08)
+            for index in mv.geometric.INDEXES:
+                td.assertMaximum( self, g, mv.match_points(coords, 0.08, index=index) )
+            td.assertMaximum( self, g, mv.match_points(coords, 0.08, lazy=True) )
+
+    def test040_output_and_errors(self):
+        """ Array output, empty input and bad arguments. """
+        coords = numpy.array([[0.0], [0.5], [2.0], [2.25]])
+        self.assertEqual( list( mv.match_points(coords, 0.5, output='array') ), [1, 0, 3, 2] )
+        self.assertEqual( mv.match_points(numpy.zeros((0, 2)), 1.0), {} )
+        self.assertRaises( ValueError, mv.match_points, coords, -1.0 )
+        self.assertRaises( ValueError, mv.match_points, coords, 1.0, index='octree' )
+        self.assertRaises( ValueError, mv.match_points, coords, 1.0, index='grid', lazy=True )
+        self.assertRaises( ValueError, mv.close_pairs, numpy.zeros((2, 2, 2)), 1.0 )
+
+    def test050_far_spread_grid(self):
+        """ Grid pairs of points spread beyond the range of int64 keys. """
+        coords = numpy.array([[0, 0], [0.5, 0], [1e12, 0], [1e12 + 0.5, 0], [0, 1e12], [3e18, 3e18]])
+        pairs = mv.close_pairs(coords, 1.0, 'grid')
+        self.assertEqual( sorted( map(tuple, pairs.tolist()) ), [(0, 1), (2, 3)] )
+        coords = numpy.arange(10.0).reshape(10, 1) * 3 * numpy.ones((1, 20))
+        self.assertRaises( ValueError, mv.close_pairs, coords, 1.0, 'grid' )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from GeometricTests.
+    """
+
+    tests = ['test010_close_pairs', 'test030_match_points']
+    return unittest.TestSuite( map(GeometricTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from GeometricTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( GeometricTests )
+
+#end
\ No newline at end of file
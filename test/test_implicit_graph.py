@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for implicit graphs and their matching.
+
+This module implements a series of unit tests for ImplicitGraph and
+implicit_matching. The graphs are given by neighbor rules, and the
+matchings are compared against the NetworkX matching of the same graphs
+built explicitly.
+
+:filename test_implicit_graph.py
+"""
+
+# Necessary imports
+import matching as mv
+import test_driver as td
+import structures
+
+import networkx as nx
+import random
+import unittest
+
+class ImplicitGraphTests( unittest.TestCase ):
+    """
+    Unit tests for implicit graphs and their matching.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test010_neighbor_cache(self):
+        """ Rows are memoized and the least recently used one is evicted. """
+        calls = [ ]
+        def rule(v):
+            calls.append( v )
+            return [ (v + 1) % 10, (v - 1) % 10 ]
+        g = structures.ImplicitGraph(range(10), rule, cache_size=2)
+        self.assertEqual( sorted( g.neighbors(3) ), [2, 4] )
+        g.neighbors(4)
+        g.neighbors(3)
+        g.neighbors(5) # Evicts the row of 4
+        g.neighbors(4)
+        self.assertEqual( calls, [3, 4, 5, 4] )
+        self.assertEqual( (g.hits, g.misses), (1, 4) )
+        self.assertEqual( len(g.cache), 2 )
+
+    def test020_random_graphs(self):
+        """ Random graphs matched through their neighbor rule. """
+        for seed in range(10):
+            g = nx.gnp_random_graph(40, 0.08, seed=seed)
+            for cache_size in (0, 8, None):
+                mate1 = mv.implicit_matching(g.nodes(), g.neighbors_iter, cache_size)
+                td.assertMaximum( self, g, mate1 )
+
+    def test030_threshold_rule(self):
+        """ Items compatible within a threshold, given by a generator. """
+        rnd = random.Random(39)
+        items = [ round(rnd.uniform(0, 10), 3) for _ in range(60) ]
+        def compatible(x):
+            for y in items:
+                if y != x and abs(x - y) < 0.2:
+                    yield y
+        g = nx.Graph()
+        g.add_nodes_from( items )
+        g.add_edges_from( (x, y) for x in items for y in compatible(x) )
+        report = { }
+        mate1 = mv.implicit_matching(items, compatible, report=report)
+        td.assertMaximum( self, g, mate1 )
+        self.assertEqual( report['misses'], len(set(items)) )
+
+    def test040_initial_and_array(self):
+        """ Initial matching of vertices and array output by position. """
+        g = nx.ladder_graph(12)
+        labels = [ 'v%d' % v for v in g.nodes() ]
+        rule = lambda v: [ 'v%d' % u for u in g.neighbors( int(v[1:]) ) ]
+        mate = mv.implicit_matching(labels, rule, initial={'v0': 'v12', 'v12': 'v0'},
+                                    output='array')
+        self.assertEqual( sum(1 for w in mate if w >= 0), 24 )
+        for v, w in enumerate(mate):
+            self.assertTrue( g.has_edge(v, w) )
+
+    def test045_rows_reached(self):
+        """ Rows are generated only for the vertices a search reaches. """
+        g = nx.cycle_graph(20)
+        initial = dict( (v, v ^ 1) for v in range(20) )
+        report = { }
+        mate1 = mv.implicit_matching(g.nodes(), g.neighbors_iter, initial=initial, report=report)
+        self.assertEqual( mate1, initial )
+        self.assertEqual( report['misses'], 0 )
+        del initial[18], initial[19]
+        mv.implicit_matching(g.nodes(), g.neighbors_iter, initial=initial, report=report)
+        self.assertTrue( report['misses'] < 20 )
+
+    def test050_errors(self):
+        """ Repeated vertices, dense and reordered matching are refused. """
+        self.assertRaises( ValueError, structures.ImplicitGraph, [1, 2, 1], lambda v: [] )
+        g = structures.ImplicitGraph(range(4), lambda v: [ v ^ 1 ])
+        self.assertRaises( ValueError, mv.max_cardinality_matching, g, dense=True )
+        self.assertRaises( ValueError, mv.max_cardinality_matching, g, reorder='bfs' )
+        self.assertEqual( mv.max_cardinality_matching(g), {0: 1, 1: 0, 2: 3, 3: 2} )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from ImplicitGraphTests.
+    """
+
+    tests = ['test010_neighbor_cache', 'test030_threshold_rule']
+    return unittest.TestSuite( map(ImplicitGraphTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from ImplicitGraphTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( ImplicitGraphTests )
+
+#end
\ No newline at end of file
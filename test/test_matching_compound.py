@@ -334,6 +334,25 @@ class MatchingCompoundTests( unittest.TestCase ):
         mate1 = mv.max_cardinality_matching( g )
         mate2 = nx.max_weight_matching( g, True )
         self.assertEqual( len(mate1), len(mate2) )
+    
+    def test190_disjoint_components(self):
+        """ Components finished at different phases. """
+        g = nx.disjoint_union_all([nx.petersen_graph(), nx.star_graph(6), nx.path_graph(9),
+                                   nx.barbell_graph(5, 3), nx.empty_graph(4),
+                                   nx.gnp_random_graph(60, 0.05, seed=2)])
+        mate1 = mv.max_cardinality_matching( g )
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+    
+    def test191_finished_components(self):
+        """ Components already matched by the initial matching. """
+        g = nx.disjoint_union_all([nx.cycle_graph(6), nx.cycle_graph(7), nx.lollipop_graph(6, 5)])
+        initial = {0: 1, 1: 0, 2: 3, 3: 2, 4: 5, 5: 4, 6: 7, 7: 6, 8: 9, 9: 8, 10: 11, 11: 10}
+        mate1 = mv.max_cardinality_matching( g, initial=initial )
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+        for v in range(6):
+            self.assertEqual( mate1[v], initial[v] )
         
 def suiteCase():
     """
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+"""
+Dense backend unit tests for maximum matching function.
+
+This module implements a series of unit tests for max_cardinality_matching
+with the dense backend. The graphs tested are dense, or the backend is
+forced on, and the results are compared against the default backend and
+against the NetworkX matching.
+
+:filename test_matching_dense.py
+"""
+
+# Necessary imports
+import matching as mv
+import structures
+
+import networkx as nx
+import numpy as np
+import unittest
+
+class MatchingDenseTests( unittest.TestCase ):
+    """
+    Dense backend unit tests for the maximum matching function.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test010_is_dense(self):
+        """ Backend is chosen by edge density. """
+        self.assertTrue( mv.matching.isDense( nx.complete_graph(50) ) )
+        self.assertTrue( mv.matching.isDense( nx.gnp_random_graph(80, 0.8, seed=1) ) )
+        self.assertFalse( mv.matching.isDense( nx.cycle_graph(50) ) )
+        self.assertFalse( mv.matching.isDense( nx.Graph() ) )
+
+    def test015_dense_memory_bound(self):
+        """ The default choice bounds the bytes of the adjacency matrix. """
+        for n, dense in [ (8192, True), (8193, False) ]:
+            g = structures.CompactGraph( np.zeros(n + 1, np.int64), np.zeros(0, np.int64),
+                                         None, n * (n - 1) / 2 )
+            self.assertEqual( mv.matching.isDense( g ), dense )
+
+    def test020_complete_graph(self):
+        """ Complete graph of even order. """
+        g = nx.complete_graph(100)
+        mate1 = mv.max_cardinality_matching(g, dense=True)
+        self.assertEqual( len(mate1), 100 )
+
+    def test021_complete_graph(self):
+        """ Complete graph of odd order. """
+        g = nx.complete_graph(51)
+        mate1 = mv.max_cardinality_matching(g, dense=True)
+        self.assertEqual( len(mate1), 50 )
+
+    def test030_gnp_random_graph(self):
+        """ Dense random graph. """
+        g = nx.gnp_random_graph(60, 0.8, seed=7)
+        mate1 = mv.max_cardinality_matching(g, dense=True)
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+
+    def test040_forced_sparse_graphs(self):
+        """ Dense backend forced on sparse graphs with blooms. """
+        for g in [nx.petersen_graph(), nx.barbell_graph(9, 2),
+                  nx.lollipop_graph(13, 13), nx.ladder_graph(20)]:
+            mate1 = mv.max_cardinality_matching(g, dense=True)
+            mate2 = nx.max_weight_matching( g, True )
+            self.assertEqual( len(mate1), len(mate2) )
+
+    def test050_backends_agree(self):
+        """ Both backends find matchings of the same size. """
+        for seed in range(20):
+            g = nx.gnp_random_graph(30, 0.3, seed=seed)
+            mate1 = mv.max_cardinality_matching(g, dense=True)
+            mate2 = mv.max_cardinality_matching(g, dense=False)
+            self.assertEqual( len(mate1), len(mate2) )
+
+    def test060_labels(self):
+        """ Dense backend returns a mate keyed by the original nodes. """
+        g = nx.complete_bipartite_graph(6, 9)
+        g = nx.relabel_nodes(g, dict( (v, 'n%d' % v) for v in g ))
+        mate1 = mv.max_cardinality_matching(g, dense=True)
+        self.assertEqual( len(mate1), 12 )
+        for v, w in mate1.iteritems():
+            self.assertTrue( g.has_edge(v, w) )
+
+    def test070_dense_adjacency(self):
+        """ Adjacency matrix of a compact graph. """
+        g = nx.wheel_graph(8)
+        c = structures.CompactGraph.from_networkx( g )
+        a = c.dense_adjacency()
+        self.assertTrue( (a == a.T).all() )
+        self.assertEqual( a.sum(), 2 * g.number_of_edges() )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from MatchingDenseTests.
+    """
+
+    tests = ['test020_complete_graph', 'test030_gnp_random_graph']
+    return unittest.TestSuite( map(MatchingDenseTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from MatchingDenseTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( MatchingDenseTests )
+
+#end
\ No newline at end of file
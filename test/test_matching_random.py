@@ -479,6 +479,49 @@ class MatchingRandomTests( unittest.TestCase ):
         mate1 = mv.max_cardinality_matching( g )
         self.assertEqual( len(mate1), len(mate2) )
         
+    def test120_seeded_gnp_random_graph(self):
+        """ Random graph with a bloom nested in the bloom of a path. """
+        g = nx.gnp_random_graph(40, 0.1, seed=150)
+        mate1 = mv.max_cardinality_matching( g, dense=False )
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+        
+    def test121_seeded_gnp_random_graph(self):
+        """ Random graph where the left search meets the right search. """
+        g = nx.gnp_random_graph(40, 0.1, seed=941)
+        mate1 = mv.max_cardinality_matching( g, dense=False )
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+        
+    def test130_full_validation(self):
+        """ Random graphs matched with every check enabled. """
+        for seed in range(30):
+            g = nx.gnp_random_graph(40, 0.08, seed=seed)
+            mate2 = nx.max_weight_matching( g, True )
+            for dense in (False, True):
+                for validate in mv.VALIDATION_LEVELS:
+                    mate1 = mv.max_cardinality_matching( g, dense=dense, validate=validate )
+                    self.assertEqual( len(mate1), len(mate2) )
+        self.assertRaises( ValueError, mv.max_cardinality_matching, g, validate='all' )
+        
+    def test140_max_length(self):
+        """ Random graphs matched along augmenting paths of bounded length. """
+        for seed in range(30):
+            g = nx.gnp_random_graph(50, 0.06, seed=seed)
+            size = len( nx.max_weight_matching( g, True ) ) / 2
+            for length in (1, 3, 5):
+                for dense in (False, True):
+                    mate1 = mv.max_cardinality_matching( g, dense=dense, max_length=length )
+                    self.assertTrue( len(mate1) / 2 * (length + 3) >= size * (length + 1) )
+        
+        # The only augmenting path of the path graph has 5 edges
+        g = nx.path_graph(6)
+        initial = {1: 2, 2: 1, 3: 4, 4: 3}
+        for length, size in ((3, 2), (4, 2), (5, 3), (None, 3)):
+            mate1 = mv.max_cardinality_matching( g, initial=initial, max_length=length )
+            self.assertEqual( len(mate1) / 2, size )
+        self.assertRaises( ValueError, mv.max_cardinality_matching, g, max_length=0 )
+        
 def suiteCase():
     """
     Creates a suite of the selected set of unit tests from MatchingRandomTests.
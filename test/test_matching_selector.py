@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the matching engine selector.
+
+This module implements a series of unit tests for maximum_matching and
+graph_statistics. The engines chosen by the selector are checked through
+its report, and the matchings found are compared against the NetworkX
+matching.
+
+:filename test_matching_selector.py
+"""
+
+# Necessary imports
+import matching as mv
+import test_driver as td
+import benchmark_driver as bd
+import structures
+
+import networkx as nx
+import unittest
+
+class MatchingSelectorTests( unittest.TestCase ):
+    """
+    Unit tests for the matching engine selector.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test010_graph_statistics(self):
+        """ Statistics of a graph with several components. """
+        g = nx.disjoint_union_all([nx.complete_graph(4), nx.path_graph(3),
+                                   nx.path_graph(2), nx.path_graph(2)])
+        stats = mv.graph_statistics( g )
+        self.assertEqual( stats['n'], 11 )
+        self.assertEqual( stats['m'], 10 )
+        self.assertEqual( stats['max_degree'], 3 )
+        self.assertFalse( stats['bipartite'] )
+        self.assertEqual( stats['component_sizes'], {4: 1, 3: 1, 2: 2} )
+
+    def test020_bipartite(self):
+        """ Bipartite graph is matched by Hopcroft-Karp. """
+        g = nx.Graph( nx.bipartite.random_graph(30, 40, 0.1, seed=3) )
+        report = { }
+        mate1 = mv.maximum_matching(g, report=report)
+        self.assertTrue( report['statistics']['bipartite'] )
+        self.assertTrue( 'hopcroft_karp' in report['engines'] )
+        td.assertMaximum( self, g, mate1 )
+
+    def test030_mixed_components(self):
+        """ Each component is matched by its own engine. """
+        g = nx.disjoint_union_all([nx.path_graph(2), nx.grid_2d_graph(3, 4),
+                                   nx.petersen_graph(), nx.bull_graph()])
+        report = { }
+        mate1 = mv.maximum_matching(g, report=report)
+        self.assertEqual( report['engines'], {'closed_form': 1, 'hopcroft_karp': 1,
+                                              'greedy': 1, 'mv': 1} )
+        self.assertEqual( sorted( report['time'] ), sorted( report['engines'] ) )
+        td.assertMaximum( self, g, mate1 )
+
+    def test040_thresholds(self):
+        """ Thresholds override the engine selection. """
+        g = nx.grid_2d_graph(6, 6)
+        report = { }
+        thresholds = {'hopcroft_karp_min_nodes': 100, 'greedy_min_nodes': 100}
+        mate1 = mv.maximum_matching(g, thresholds=thresholds, report=report)
+        self.assertEqual( report['engines'], {'mv': 1} )
+        td.assertMaximum( self, g, mate1 )
+
+    def test050_compact_output(self):
+        """ Compact result keeps the labels of the graph. """
+        g = nx.barbell_graph(7, 4)
+        result = mv.maximum_matching(g, output='compact')
+        self.assertEqual( sorted( result.labels ), sorted( g.nodes() ) )
+        td.assertMaximum( self, g, result.to_dict() )
+
+    def test055_array_output(self):
+        """ Array result of a compact graph, rejected for a NetworkX graph. """
+        g = nx.barbell_graph(7, 4)
+        mate1 = mv.maximum_matching(structures.CompactGraph.from_networkx( g ), output='array')
+        self.assertEqual( sum( 1 for w in mate1 if w >= 0 ), len( mv.maximum_matching( g ) ) )
+        self.assertRaises( ValueError, mv.maximum_matching, g, output='array' )
+        self.assertRaises( ValueError, mv.closed_form_matching, g, output='array' )
+        mate2 = mv.closed_form_matching(structures.CompactGraph.from_networkx( nx.path_graph(6) ), output='array')
+        self.assertEqual( list( mate2 ), [1, 0, 3, 2, 5, 4] )
+
+    def test060_initial_matching(self):
+        """ Matching started from a given matching. """
+        g = nx.petersen_graph()
+        mate1 = mv.max_cardinality_matching(g, initial={0: 1, 1: 0})
+        td.assertMaximum( self, g, mate1 )
+        self.assertRaises( ValueError, mv.max_cardinality_matching, g, initial={0: 1} )
+
+    def test070_random_graphs(self):
+        """ Random graphs matched with every engine. """
+        for seed in range(20):
+            g = nx.disjoint_union_all([nx.gnp_random_graph(20, 0.15, seed=seed),
+                                       nx.Graph( nx.bipartite.random_graph(10, 12, 0.2, seed=seed) ),
+                                       nx.gnp_random_graph(40, 0.08, seed=seed + 100)])
+            td.assertMaximum( self, g, mv.maximum_matching( g ) )
+
+    def test080_benchmark(self):
+        """ Benchmark suggests a value for each threshold. """
+        thresholds = bd.suggestThresholds(sizes=[8, 16])
+        self.assertEqual( sorted( thresholds ), sorted( mv.THRESHOLDS ) )
+
+    def test090_ordering_benchmark(self):
+        """ Benchmark times every vertex ordering. """
+        rows = bd.orderingEffect(sizes=[64, 100], repeat=1)
+        self.assertEqual( [n for n, times in rows], [64, 100] )
+        for n, times in rows:
+            self.assertEqual( sorted( times ), sorted( [None] + structures.ORDERINGS ) )
+
+    def test100_validation_benchmark(self):
+        """ Benchmark times every validation level. """
+        rows = bd.validationCost(sizes=[64], repeat=1)
+        self.assertEqual( sorted( rows[0][1] ), sorted( mv.VALIDATION_LEVELS ) )
+
+    def test110_weighted_benchmark(self):
+        """ Benchmark times the weighted matchers and NetworkX. """
+        rows = bd.weightedCost(sizes=[40])
+        self.assertEqual( sorted( rows[0][1] ), ['approximate', 'networkx', 'scaling'] )
+
+    def test120_algebraic_benchmark(self):
+        """ Benchmark times the algebraic engine and the search on dense graphs. """
+        rows = bd.algebraicCost(sizes=[30])
+        self.assertEqual( [ (family, n) for family, n, times in rows ],
+                          [ ('complete', 30), ('gnp(0.8)', 30) ] )
+        self.assertEqual( sorted( rows[0][2] ), ['mv', 'rank', 'recover'] )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from MatchingSelectorTests.
+    """
+
+    tests = ['test020_bipartite', 'test030_mixed_components']
+    return unittest.TestSuite( map(MatchingSelectorTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from MatchingSelectorTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( MatchingSelectorTests )
+
+#end
\ No newline at end of file
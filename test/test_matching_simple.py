@@ -420,6 +420,48 @@ class MatchingSimpleTests( unittest.TestCase ):
         mate2 = nx.max_weight_matching( g, True )
         td.showGraph(g, mate1, "test280_pentagon_graph")
         self.assertEqual( len(mate1), len(mate2) )
+    
+    def test290_augment_then_bloom(self):
+        """ Augmenting path followed by a bloom at the same level. """
+        g = nx.Graph()
+        g.add_nodes_from(range(8))
+        g.add_edges_from([(0,4),(0,5),(0,6),(1,2),(1,4),(1,6),(2,3),(2,7),(3,4),(4,5)])
+        
+        mate1 = mv.max_cardinality_matching( g )
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+    
+    def test291_bloom_base_taken(self):
+        """ Path search meeting a bloom whose base is on the other path. """
+        g = nx.Graph()
+        g.add_nodes_from(range(10))
+        g.add_edges_from([(0,5),(0,7),(1,4),(1,7),(1,9),(2,3),(2,4),(2,6),(2,7),(2,9),
+                          (3,4),(3,5),(5,8),(6,7),(7,9)])
+        
+        mate1 = mv.max_cardinality_matching( g )
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+    
+    def test292_bridge_in_bloom(self):
+        """ Bridge with an end inside a bloom. """
+        g = nx.Graph()
+        g.add_nodes_from(range(5))
+        g.add_edges_from([(0,1),(0,3),(1,2),(1,3),(2,4),(3,4)])
+        
+        mate1 = mv.max_cardinality_matching( g )
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
+    
+    def test293_nested_bloom_marks(self):
+        """ Path search through blooms marked by earlier searches. """
+        g = nx.Graph()
+        g.add_nodes_from(range(12))
+        g.add_edges_from([(0,2),(0,3),(0,5),(0,6),(1,6),(1,10),(2,5),(2,8),(3,4),(3,11),
+                          (5,10),(5,11),(6,8),(7,11),(9,10)])
+        
+        mate1 = mv.max_cardinality_matching( g )
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(mate1), len(mate2) )
         
 def suiteCase():
     """
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for concurrent matching on shared graphs.
+
+This module implements a series of unit tests for the thread safety of
+max_cardinality_matching and maximum_matching. Many calls are run from a
+thread pool against one shared graph, with the interpreter switching
+threads as often as possible, and every result is checked against the
+NetworkX matching. The shared graph must be left exactly as it was.
+
+:filename test_matching_threads.py
+"""
+
+# Necessary imports
+import matching as mv
+import test_driver as td
+import structures
+
+import multiprocessing.pool
+import networkx as nx
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Number of worker threads and of calls made through them
+THREADS = 8
+CALLS = 32
+
+def snapshot(G):
+    """ Return a copy of the nodes, edges and attributes of G. """
+    return ( sorted( G.nodes( data=True ) ), sorted( G.edges( data=True ) ), dict( G.graph ) )
+
+class MatchingThreadsTests( unittest.TestCase ):
+    """
+    Unit tests for concurrent matching on shared graphs.
+    """
+
+    def setUp(self):
+        self.interval = sys.getcheckinterval()
+        sys.setcheckinterval( 1 ) # Switch threads as often as possible
+        self.pool = multiprocessing.pool.ThreadPool( THREADS )
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.pool.close()
+        self.pool.join()
+        sys.setcheckinterval( self.interval )
+        shutil.rmtree( self.directory )
+
+    def test010_shared_graph(self):
+        """ Concurrent calls on one graph with edge attributes. """
+        g = nx.gnp_random_graph(60, 0.08, seed=37)
+        for u, v in g.edges_iter():
+            g[u][v]['weight'] = u + v
+        before = snapshot( g )
+        options = [ {'dense': False}, {'dense': True}, {'reorder': 'rcm'},
+                    {'validate': 'full'} ]
+        results = self.pool.map( lambda k: mv.max_cardinality_matching( g, **options[k % 4] ),
+                                 range( CALLS ) )
+        for mate in results:
+            td.assertMaximum( self, g, mate )
+        self.assertEqual( snapshot( g ), before )
+
+    def test020_shared_subgraphs(self):
+        """ Subgraphs sharing the attribute dictionaries of one graph. """
+        g = nx.disjoint_union_all([nx.petersen_graph(), nx.barbell_graph(5, 3),
+                                   nx.gnp_random_graph(30, 0.15, seed=5)])
+        before = snapshot( g )
+        parts = [ g.subgraph( nodes ) for nodes in nx.connected_components( g ) ] * 4
+        results = self.pool.map( mv.max_cardinality_matching, parts )
+        for part, mate in zip( parts, results ):
+            td.assertMaximum( self, part, mate )
+        self.assertEqual( snapshot( g ), before )
+
+    def test030_shared_mapped_graph(self):
+        """ Concurrent calls on one memory mapped compact graph. """
+        g = nx.grid_2d_graph(9, 11)
+        path = os.path.join(self.directory, 'graph.mvg')
+        structures.save_graph(g, path)
+        l = structures.load_graph( path )
+        results = self.pool.map( lambda k: mv.max_cardinality_matching(l, output='compact'),
+                                 range( CALLS ) )
+        for result in results:
+            td.assertMaximum( self, g, result.to_dict() )
+
+    def test040_shared_initial_matching(self):
+        """ The initial matching shared by the calls is not modified. """
+        g = nx.ladder_graph(20)
+        initial = {0: 1, 1: 0, 20: 21, 21: 20}
+        results = self.pool.map( lambda k: mv.max_cardinality_matching(g, initial=initial),
+                                 range( CALLS ) )
+        for mate in results:
+            td.assertMaximum( self, g, mate )
+        self.assertEqual( initial, {0: 1, 1: 0, 20: 21, 21: 20} )
+
+    def test050_selector(self):
+        """ Concurrent engine selection, each call with its own report. """
+        g = nx.disjoint_union_all([nx.path_graph(6), nx.grid_2d_graph(3, 4),
+                                   nx.petersen_graph(), nx.bull_graph()])
+        before = snapshot( g )
+        def call(k):
+            report = { }
+            return mv.maximum_matching(g, report=report), report
+        for mate, report in self.pool.map( call, range( CALLS ) ):
+            td.assertMaximum( self, g, mate )
+            self.assertEqual( sum( report['engines'].values() ), 4 )
+        self.assertEqual( snapshot( g ), before )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from MatchingThreadsTests.
+    """
+
+    tests = ['test010_shared_graph', 'test020_shared_subgraphs']
+    return unittest.TestSuite( map(MatchingThreadsTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from MatchingThreadsTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( MatchingThreadsTests )
+
+#end
\ No newline at end of file
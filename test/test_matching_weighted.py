@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the maximum weight matching by cost scaling.
+
+This module implements a series of unit tests for max_weight_matching and
+approximate_weight_matching. The weight of each matching is compared
+against the weight of the matching the NetworkX routine finds for the same
+graph.
+
+:filename test_matching_weighted.py
+"""
+
+# Necessary imports
+import matching as mv
+
+import networkx as nx
+import random
+import unittest
+
+def matchingWeight(g, mate):
+    """ Return the total weight of the edges of matching mate in g. """
+    return sum( g[v][w].get('weight', 1) for v, w in mate.iteritems() ) / 2
+
+class MatchingWeightedTests( unittest.TestCase ):
+    """
+    Unit tests for the maximum weight matching by cost scaling.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def assertOptimal(self, g, mate1, maxcardinality=False):
+        """ Check that mate1 is a maximum weight matching of g. """
+        mate2 = nx.max_weight_matching( g, maxcardinality )
+        for v, w in mate1.iteritems():
+            self.assertTrue( g.has_edge(v, w) )
+            self.assertEqual( mate1[w], v )
+        self.assertEqual( matchingWeight(g, mate1), matchingWeight(g, mate2) )
+        if maxcardinality:
+            self.assertEqual( len(mate1), len(mate2) )
+
+    def test010_small_graphs(self):
+        """ Triangle, path and blossom with a heavy stem. """
+        g = nx.Graph()
+        g.add_weighted_edges_from([(1, 2, 4), (2, 3, 5), (1, 3, 6)])
+        self.assertEqual( mv.max_weight_matching(g), {1: 3, 3: 1} )
+        g = nx.path_graph(4)
+        g[1][2]['weight'] = 3
+        self.assertEqual( mv.max_weight_matching(g), {1: 2, 2: 1} )
+        self.assertEqual( mv.max_weight_matching(g, maxcardinality=True),
+                          {0: 1, 1: 0, 2: 3, 3: 2} )
+        g = nx.cycle_graph(5)
+        g.add_edge(0, 5, weight=7)
+        self.assertOptimal( g, mv.max_weight_matching(g) )
+
+    def test020_random_graphs(self):
+        """ Random graphs with weights of every magnitude. """
+        for seed in range(40):
+            rnd = random.Random(seed)
+            g = nx.gnp_random_graph(rnd.randint(2, 30), rnd.choice([0.1, 0.3, 0.6]), seed=seed)
+            top = rnd.choice([1, 5, 100, 10 ** 6])
+            for u, v in g.edges_iter():
+                g[u][v]['weight'] = rnd.randint(1, top)
+            self.assertOptimal( g, mv.max_weight_matching(g) )
+
+    def test030_max_cardinality(self):
+        """ Maximum cardinality first, with negative and zero weights. """
+        for seed in range(20):
+            rnd = random.Random(seed)
+            g = nx.gnp_random_graph(rnd.randint(2, 25), 0.25, seed=seed)
+            for u, v in g.edges_iter():
+                g[u][v]['weight'] = rnd.randint(-5, 20)
+            self.assertOptimal( g, mv.max_weight_matching(g), False )
+            self.assertOptimal( g, mv.max_weight_matching(g, True), True )
+
+    def test040_labels_and_report(self):
+        """ Node labels, the weight attribute and the report. """
+        g = nx.Graph()
+        g.add_edge('a', 'b', cost=2)
+        g.add_edge('b', 'c', cost=9)
+        g.add_edge('c', 'd', cost=2)
+        g.add_node('e')
+        report = { }
+        mate = mv.max_weight_matching(g, weight='cost', report=report)
+        self.assertEqual( mate, {'b': 'c', 'c': 'b'} )
+        self.assertEqual( report['scales'], 4 )
+        self.assertTrue( report['stages'] >= 1 )
+        self.assertEqual( mv.max_weight_matching(nx.empty_graph(3)), {} )
+
+    def test050_errors(self):
+        """ Weights that are not integers are refused. """
+        g = nx.Graph()
+        g.add_edge(0, 1, weight=1.5)
+        self.assertRaises( ValueError, mv.max_weight_matching, g )
+        g[0][1]['weight'] = 2.0
+        self.assertEqual( mv.max_weight_matching(g), {0: 1, 1: 0} )
+
+    def test060_rotated_blossoms(self):
+        """ Blossoms rotated to a new base through several tight edges. """
+        g = nx.Graph()
+        g.add_weighted_edges_from([(0, 8, 7), (0, 7, 10), (1, 12, 8), (1, 11, 2), (1, 4, 3),
+                                   (1, 7, 5), (2, 10, 4), (2, 11, 10), (3, 10, 8), (3, 12, 5),
+                                   (3, 5, 4), (4, 8, 3), (4, 11, 7), (4, 7, 10), (5, 8, 2),
+                                   (5, 7, 5), (6, 11, 4), (6, 12, 7), (6, 7, 3), (9, 11, 1)])
+        self.assertOptimal( g, mv.max_weight_matching(g, True), True )
+
+    def test070_approximate(self):
+        """ Approximate matchings within the error allowed, with a valid bound. """
+        for seed in range(30):
+            rnd = random.Random(seed)
+            g = nx.gnp_random_graph(rnd.randint(2, 40), rnd.choice([0.1, 0.3]), seed=seed)
+            for u, v in g.edges_iter():
+                g[u][v]['weight'] = rnd.choice([rnd.randint(1, 1000), rnd.uniform(0, 50)])
+            optimum = matchingWeight( g, nx.max_weight_matching(g) )
+            for epsilon in [0.5, 0.1, 0.01]:
+                report = { }
+                mate = mv.approximate_weight_matching(g, epsilon, report=report)
+                for v, w in mate.iteritems():
+                    self.assertTrue( g.has_edge(v, w) )
+                    self.assertEqual( mate[w], v )
+                self.assertTrue( matchingWeight(g, mate) >= (1 - epsilon) * optimum - 1e-9 )
+                self.assertAlmostEqual( report['weight'], matchingWeight(g, mate) )
+                self.assertTrue( report['bound'] >= optimum - 1e-9 )
+
+    def test080_approximate_errors(self):
+        """ The allowed error must lie strictly between 0 and 1. """
+        g = nx.path_graph(3)
+        for epsilon in [0, 1, -0.5, 2]:
+            self.assertRaises( ValueError, mv.approximate_weight_matching, g, epsilon )
+        self.assertEqual( mv.approximate_weight_matching(nx.empty_graph(3)), {} )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from MatchingWeightedTests.
+    """
+
+    tests = ['test010_small_graphs', 'test020_random_graphs']
+    return unittest.TestSuite( map(MatchingWeightedTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from MatchingWeightedTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( MatchingWeightedTests )
+
+#end
\ No newline at end of file
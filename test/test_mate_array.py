@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the compact matching result.
+
+This module implements a series of unit tests for MateArray and for
+max_cardinality_matching with output='compact'. Each test checks the mate
+array against the mate dictionary of the same graph.
+
+:filename test_mate_array.py
+"""
+
+# Necessary imports
+import matching as mv
+import structures
+
+import array
+import networkx as nx
+import numpy as np
+import pickle
+import unittest
+
+class MateArrayTests( unittest.TestCase ):
+    """
+    Unit tests for the compact matching result.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test010_compact_networkx(self):
+        """ Compact result of a NetworkX graph carries its labels. """
+        g = nx.grid_2d_graph(5, 7)
+        result = mv.max_cardinality_matching(g, output='compact')
+        mate2 = nx.max_weight_matching( g, True )
+        self.assertEqual( len(result), len(g) )
+        self.assertEqual( result.cardinality(), len(mate2) / 2 )
+        self.assertEqual( sorted( result.labels ), sorted( g.nodes() ) )
+        mate1 = result.to_dict()
+        self.assertEqual( len(mate1), len(mate2) )
+        for v, w in mate1.iteritems():
+            self.assertTrue( g.has_edge(v, w) )
+            self.assertEqual( mate1[w], v )
+
+    def test020_edges(self):
+        """ Matched edge array lists each matched pair once. """
+        g = nx.barbell_graph(6, 3)
+        result = mv.max_cardinality_matching(g, output='compact')
+        edges = result.edges()
+        self.assertEqual( edges.shape, (result.cardinality(), 2) )
+        for v, w in edges:
+            self.assertTrue( v < w )
+            self.assertEqual( result[v], w )
+            self.assertEqual( result[w], v )
+            self.assertTrue( g.has_edge( result.label(v), result.label(w) ) )
+
+    def test025_edges_without_numpy(self):
+        """ Matched edges have the same pairs without NumPy. """
+        g = nx.barbell_graph(6, 3)
+        result = mv.max_cardinality_matching(g, output='compact')
+        fallback = structures.MateArray( array.array( 'l', result.mate ), result.labels )
+        edges = fallback.edges()
+        self.assertEqual( len( edges ), result.cardinality() )
+        self.assertEqual( edges, [ tuple( e ) for e in result.edges().tolist() ] )
+        self.assertEqual( structures.MateArray( array.array( 'l' ) ).edges(), [ ] )
+
+    def test030_exposed(self):
+        """ Exposed vertices are marked -1. """
+        g = nx.star_graph(5)
+        result = mv.max_cardinality_matching(g, output='compact')
+        self.assertEqual( result.cardinality(), 1 )
+        self.assertEqual( np.count_nonzero(result.mate == -1), 4 )
+
+    def test040_empty(self):
+        """ Empty input graph. """
+        result = mv.max_cardinality_matching(nx.Graph(), output='compact')
+        self.assertEqual( len(result), 0 )
+        self.assertEqual( result.cardinality(), 0 )
+        self.assertEqual( result.to_dict(), { } )
+
+    def test050_compact_graph(self):
+        """ Compact result of an unlabeled compact graph. """
+        edges = np.array([(0,1),(1,2),(2,3),(3,4),(4,0),(4,5)])
+        c = structures.CompactGraph.from_edge_array( edges )
+        result = mv.max_cardinality_matching(c, output='compact')
+        self.assertTrue( result.labels is None )
+        self.assertEqual( result.cardinality(), 3 )
+        self.assertEqual( result.to_dict(), mv.max_cardinality_matching(c) )
+
+    def test060_pickle(self):
+        """ Mate array survives pickling. """
+        g = nx.cycle_graph(9)
+        result = mv.max_cardinality_matching(g, output='compact')
+        copy = pickle.loads( pickle.dumps(result, pickle.HIGHEST_PROTOCOL) )
+        self.assertEqual( list(copy.mate), list(result.mate) )
+        self.assertEqual( copy.labels, result.labels )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from MateArrayTests.
+    """
+
+    tests = ['test010_compact_networkx', 'test020_edges']
+    return unittest.TestSuite( map(MateArrayTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from MateArrayTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( MateArrayTests )
+
+#end
\ No newline at end of file
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for non-blocking matching through executors.
+
+This module implements a series of unit tests for amatch, MatchingExecutor
+and the cancel event of max_cardinality_matching. Matchings are run in
+thread and process pools, cancelled while waiting and while running, and
+the results are compared against the NetworkX matching.
+
+:filename test_offload.py
+"""
+
+# Necessary imports
+import matching as mv
+import test_driver as td
+import structures
+
+import multiprocessing
+import networkx as nx
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import unittest
+
+# Graph of the matchings cancelled while running, and the event its rule
+# sets once a search has started; worker processes inherit both
+SLOW = structures.CompactGraph.from_networkx( nx.gnp_random_graph(4000, 0.003, seed=1) )
+started = multiprocessing.Event()
+
+def slowRule(v):
+    """ Neighbor rule of the slow implicit graph, signalling its start. """
+    started.set()
+    return SLOW.neighbors( v )
+
+def slowGraph():
+    """ Return the slow implicit graph, with the start event cleared. """
+    started.clear()
+    return structures.ImplicitGraph(xrange( len( SLOW ) ), slowRule)
+
+def killWorker():
+    """ Kill the worker process that calls it. """
+    os.kill( os.getpid(), signal.SIGKILL )
+
+class FatalGraph(object):
+    """ Graph whose unpickling kills the worker process receiving it. """
+    def __reduce__(self):
+        return killWorker, ()
+
+class OffloadTests( unittest.TestCase ):
+    """
+    Unit tests for non-blocking matching through executors.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree( self.directory )
+
+    def test010_cancel_event(self):
+        """ A set cancel event stops the matching. """
+        g = nx.petersen_graph()
+        event = threading.Event()
+        td.assertMaximum( self, g, mv.max_cardinality_matching(g, cancel=event) )
+        event.set()
+        self.assertRaises( mv.MatchingCancelled, mv.max_cardinality_matching, g, cancel=event )
+        self.assertEqual( mv.max_cardinality_matching(nx.path_graph(1), cancel=event), {} )
+
+    def test020_thread_executor(self):
+        """ Requests beyond the concurrency wait, and all are matched. """
+        graphs = [ nx.gnp_random_graph(60, 0.08, seed=seed) for seed in range(12) ]
+        with mv.MatchingExecutor(workers=3, concurrency=2) as executor:
+            futures = [ executor.submit( g ) for g in graphs ]
+            self.assertTrue( sum( f.running() or f.done() for f in futures ) >= 2 )
+            self.assertTrue( sum( f.running() for f in futures ) <= 2 )
+            for g, future in zip( graphs, futures ):
+                td.assertMaximum( self, g, future.result() )
+            self.assertEqual( sorted( executor.free ), [0, 1] )
+
+    def test030_cancel_futures(self):
+        """ Waiting and running matchings are cancelled. """
+        with mv.MatchingExecutor(workers=1) as executor:
+            running = executor.submit(slowGraph(), output='array')
+            waiting = executor.submit(SLOW, output='array')
+            self.assertTrue( waiting.cancel() )
+            self.assertTrue( waiting.cancelled() )
+            self.assertTrue( started.wait( 10 ) )
+            self.assertTrue( running.cancel() )
+            self.assertRaises( mv.MatchingCancelled, running.result )
+            self.assertTrue( running.cancelled() )
+            self.assertFalse( running.cancel() )
+            finished = executor.submit( nx.path_graph(4) )
+            self.assertEqual( len( finished.result() ), 4 )
+            self.assertFalse( finished.cancelled() )
+
+    def test040_process_executor(self):
+        """ Process workers match mapped graphs and stop when cancelled. """
+        path = os.path.join(self.directory, 'graph.mvg')
+        structures.save_graph(SLOW, path)
+        G = structures.load_graph( path )
+        done = threading.Event()
+        with mv.MatchingExecutor(workers=2, kind='process') as executor:
+            future = mv.amatch(G, executor=executor, output='array')
+            future.add_done_callback( lambda f: done.set() )
+            other = executor.submit(slowGraph(), output='array')
+            self.assertTrue( started.wait( 10 ) )
+            self.assertTrue( other.cancel() )
+            self.assertEqual( len( future.result() ), len( G ) )
+            self.assertTrue( done.wait( 10 ) )
+            self.assertRaises( mv.MatchingCancelled, other.result )
+            self.assertRaises( ValueError, executor.submit( nx.path_graph(3), output='list' ).result )
+
+    def test050_default_executor(self):
+        """ amatch runs in a shared executor, and bad arguments raise. """
+        g = nx.barbell_graph(5, 2)
+        future = mv.amatch( g )
+        td.assertMaximum( self, g, future.result() )
+        self.assertTrue( mv.amatch( g ).executor is future.executor )
+        calls = [ ]
+        future.add_done_callback( calls.append )
+        self.assertEqual( calls, [ future ] )
+        self.assertRaises( ValueError, mv.amatch, g, cancel=threading.Event() )
+        self.assertRaises( ValueError, mv.MatchingExecutor, kind='fiber' )
+        self.assertRaises( ValueError, mv.MatchingExecutor, 1, 'thread', 0 )
+
+    def test060_failed_submissions(self):
+        """ Graphs that cannot reach a worker fail and free their slot. """
+        g = nx.petersen_graph()
+        g.graph['lock'] = threading.Lock()
+        with mv.MatchingExecutor(1, 'process', 1) as executor:
+            for _ in range(3):
+                self.assertRaises( TypeError, executor.submit( g ).result )
+            td.assertMaximum( self, g, executor.submit( nx.Graph( g.edges() ) ).result() )
+            self.assertEqual( executor.free, [0] )
+
+    def test070_dead_worker(self):
+        """ A matching whose worker process dies fails and frees its slot. """
+        with mv.MatchingExecutor(1, 'process', 1) as executor:
+            future = executor.submit(slowGraph(), output='array')
+            self.assertTrue( started.wait( 10 ) )
+            os.kill( executor.owners[future.slot], signal.SIGKILL )
+            self.assertRaises( multiprocessing.ProcessError, future.result )
+            self.assertEqual( len( executor.submit( nx.path_graph(4) ).result() ), 4 )
+
+    def test080_worker_killed_unpickling(self):
+        """ A matching whose worker dies before starting it fails and frees its slot. """
+        with mv.MatchingExecutor(1, 'process', 1) as executor:
+            future = executor.submit( FatalGraph() )
+            self.assertTrue( future.wait( 10 ) )
+            self.assertRaises( multiprocessing.ProcessError, future.result )
+            self.assertEqual( executor.free, [0] )
+            self.assertEqual( len( executor.submit( nx.path_graph(4) ).result() ), 4 )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from OffloadTests.
+    """
+
+    tests = ['test010_cancel_event', 'test020_thread_executor']
+    return unittest.TestSuite( map(OffloadTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from OffloadTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( OffloadTests )
+
+#end
\ No newline at end of file
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the semi-streaming matching.
+
+This module implements a series of unit tests for stream_matching. The
+matchings are read from edge files and edge functions, and their size and
+the bound reported are compared against the size of the maximum matching
+NetworkX finds for the same graph.
+
+:filename test_streaming.py
+"""
+
+# Necessary imports
+import matching as mv
+
+import networkx as nx
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+class StreamingTests( unittest.TestCase ):
+    """
+    Unit tests for the semi-streaming matching.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree( self.directory )
+
+    def assertMatching(self, g, mate):
+        """ Check that mate is a matching of g. """
+        for v, w in mate.iteritems():
+            self.assertTrue( g.has_edge(v, w) )
+            self.assertEqual( mate[w], v )
+
+    def test010_edge_file(self):
+        """ Random graphs read from edge files, within the bound reported. """
+        for seed in range(20):
+            rnd = random.Random(seed)
+            g = nx.gnp_random_graph(rnd.randint(2, 80), rnd.choice([0.03, 0.1, 0.3]), seed=seed)
+            edges = g.edges()
+            rnd.shuffle( edges )
+            path = os.path.join( self.directory, 'graph%d.txt' % seed )
+            with open(path, 'w') as f:
+                f.write( "# edges of graph %d\n" % seed )
+                for u, v in edges:
+                    f.write( "%d %d %d\n" % (u, v, rnd.randint(1, 9)) )
+            optimum = len( nx.max_weight_matching(g, True) ) / 2
+            report = { }
+            mate = mv.stream_matching(path, report=report)
+            self.assertMatching( g, mate )
+            self.assertEqual( report['edges'], len( edges ) )
+            self.assertTrue( report['bound'] >= optimum )
+            self.assertTrue( len(mate) / 2 >= report['guarantee'] * optimum )
+            self.assertTrue( report['guarantee'] >= 0.5 )
+
+    def test020_passes(self):
+        """ One pass matches maximally and further passes augment. """
+        edges = [ (1, 2), (0, 1), (2, 3) ]
+        report = { }
+        self.assertEqual( mv.stream_matching(lambda: edges, 1, report=report), {1: 2, 2: 1} )
+        self.assertEqual( (report['passes'], report['bound'], report['guarantee']), (1, 2, 0.5) )
+        mate = mv.stream_matching(lambda: edges, 3, report=report)
+        self.assertEqual( mate, {0: 1, 1: 0, 2: 3, 3: 2} )
+        self.assertEqual( (report['passes'], report['bound'], report['guarantee']), (2, 2, 1.0) )
+
+        g = nx.gnp_random_graph(60, 0.05, seed=20)
+        edges = g.edges()
+        mate = mv.stream_matching(lambda: edges, 1)
+        self.assertMatching( g, mate )
+        for u, v in edges:
+            self.assertTrue( u in mate or v in mate )
+        sizes = [ len( mv.stream_matching(lambda: edges, passes) ) for passes in range(1, 5) ]
+        self.assertEqual( sizes, sorted( sizes ) )
+
+    def test030_labels_and_output(self):
+        """ Vertex labels, node types and the array forms. """
+        edges = [ ('a', 'b'), ('b', 'c'), ('c', 'd'), ('d', 'd') ]
+        self.assertEqual( mv.stream_matching(lambda: edges),
+                          {'a': 'b', 'b': 'a', 'c': 'd', 'd': 'c'} )
+        compact = mv.stream_matching(lambda: edges, output='compact')
+        self.assertEqual( compact.to_dict(), {'a': 'b', 'b': 'a', 'c': 'd', 'd': 'c'} )
+        self.assertEqual( list( mv.stream_matching(lambda: edges, output='array') ), [1, 0, 3, 2] )
+
+        path = os.path.join( self.directory, 'labels.txt' )
+        with open(path, 'w') as f:
+            f.write( "x y\n\n y z # last edge\n" )
+        self.assertEqual( mv.stream_matching(path, nodetype=str), {'x': 'y', 'y': 'x'} )
+        self.assertEqual( mv.stream_matching(lambda: []), {} )
+
+    def test040_errors(self):
+        """ Passes, output forms, sources and edges changing between passes. """
+        edges = [ (0, 1), (1, 2) ]
+        self.assertRaises( ValueError, mv.stream_matching, lambda: edges, 0 )
+        self.assertRaises( ValueError, mv.stream_matching, lambda: edges, output='list' )
+        self.assertRaises( TypeError, mv.stream_matching, iter( edges ) )
+        streams = iter( [ [ (0, 1), (1, 2) ], [ (0, 1), (2, 3) ] ] )
+        self.assertRaises( ValueError, mv.stream_matching, lambda: next( streams ) )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from StreamingTests.
+    """
+
+    tests = ['test010_edge_file', 'test020_passes']
+    return unittest.TestSuite( map(StreamingTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from StreamingTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( StreamingTests )
+
+#end
\ No newline at end of file
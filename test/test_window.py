@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+"""
+Unit tests for the matching over a sliding window.
+
+This module implements a series of unit tests for WindowMatching. After
+every event the matching is checked against the graph of the edges still
+in the window, and its size against the size of the maximum matching
+NetworkX finds for that graph.
+
+:filename test_window.py
+"""
+
+# Necessary imports
+import matching as mv
+
+import networkx as nx
+import random
+import unittest
+
+class WindowTests( unittest.TestCase ):
+    """
+    Unit tests for the matching over a sliding window.
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def assertWindow(self, matcher, events, t):
+        """ Check the matching of the window of events at time t. """
+        g = nx.Graph()
+        g.add_edges_from( (u, v) for u, v, s in events if s > t - matcher.window and u != v )
+        mate = matcher.matching()
+        for v, w in mate.iteritems():
+            self.assertTrue( g.has_edge(v, w) )
+            self.assertEqual( mate[w], v )
+        for u, v in g.edges_iter():
+            self.assertTrue( u in mate or v in mate )
+        self.assertEqual( len(matcher), len(g) )
+        self.assertEqual( matcher.number_of_edges(), g.number_of_edges() )
+        size = len( nx.max_weight_matching(g, True) ) / 2
+        self.assertTrue( matcher.cardinality() >= matcher.guarantee() * size )
+
+    def test010_random_streams(self):
+        """ Random event streams with repeated edges and periodic augmentation. """
+        for seed in range(10):
+            rnd = random.Random(seed)
+            matcher = mv.WindowMatching(rnd.choice([5, 20]), rnd.choice([1, 10, None]))
+            events = [ ]
+            t = 0
+            for _ in range(150):
+                t += rnd.choice([0, 1, 2])
+                events.append( (rnd.randrange(20), rnd.randrange(20), t) )
+                matcher.add( *events[-1] )
+                self.assertWindow( matcher, events, t )
+
+    def test020_expiry_and_augment(self):
+        """ Edges expire after the window and augmentation restores the guarantee. """
+        matcher = mv.WindowMatching(10, period=None, max_length=3)
+        matcher.extend( [ (1, 2, 0), (0, 1, 1), (2, 3, 2) ] )
+        self.assertEqual( matcher.matching(), {1: 2, 2: 1} )
+        self.assertEqual( matcher.guarantee(), 0.5 )
+        self.assertEqual( matcher.augment(), 1 )
+        self.assertEqual( matcher.cardinality(), 2 )
+        self.assertEqual( matcher.guarantee(), 2.0 / 3 )
+
+        # The edge (1, 2) arrives again, so it outlives (2, 3) and 2 is
+        # matched to 1 again once (2, 3) expires
+        matcher.add( 1, 2, 5 )
+        matcher.advance( 11 )
+        self.assertEqual( matcher.matching(), {2: 3, 3: 2} )
+        self.assertEqual( matcher.number_of_edges(), 2 )
+        matcher.advance( 12 )
+        self.assertEqual( matcher.matching(), {1: 2, 2: 1} )
+        matcher.advance( 15 )
+        self.assertEqual( (len(matcher), matcher.cardinality()), (0, 0) )
+
+    def test030_errors(self):
+        """ Window, period, path length and times running backwards. """
+        self.assertRaises( ValueError, mv.WindowMatching, 0 )
+        self.assertRaises( ValueError, mv.WindowMatching, 5, period=0 )
+        self.assertRaises( ValueError, mv.WindowMatching, 5, max_length=0 )
+        matcher = mv.WindowMatching(5)
+        matcher.add( 0, 1, 3 )
+        self.assertRaises( ValueError, matcher.add, 1, 2, 2 )
+
+def suiteCase():
+    """
+    Creates a suite of the selected set of unit tests from WindowTests.
+    """
+
+    tests = ['test010_random_streams', 'test020_expiry_and_augment']
+    return unittest.TestSuite( map(WindowTests, tests) )
+
+def suiteFull():
+    """
+    Creates a suite of the full set of unit tests from WindowTests.
+    """
+
+    return unittest.TestLoader().loadTestsFromTestCase( WindowTests )
+
+#end
\ No newline at end of file